@@ -0,0 +1 @@
+"""Benchmark suite for the service layer and API endpoints (see runner.py)."""
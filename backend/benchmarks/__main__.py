@@ -0,0 +1,7 @@
+"""Entry point: ``python -m benchmarks`` (from backend/)."""
+
+import sys
+
+from .runner import main
+
+sys.exit(main())
@@ -0,0 +1,58 @@
+"""Deterministic stand-ins for external services used by the benchmarks."""
+
+import zlib
+from typing import Dict, Optional
+
+from domain.services import KrakenClient
+from shared.ohlc import OHLCSeries
+
+
+class FakeKrakenClient(KrakenClient):
+    """
+    KrakenClient returning generated OHLC data without network access.
+
+    Prices follow a fixed sawtooth per symbol (unknown symbols get a base
+    price derived from their name), so every run sees exactly the same data
+    and benchmark numbers only reflect our own code. Rows are shaped like
+    Kraken's (values as strings), so parsing is measured too.
+    """
+
+    INTERVAL = 360  # minutes (6 hours), matches KrakenClient.get_historical_ohlc
+
+    def __init__(self, base_prices: Optional[Dict[str, float]] = None):
+        self.base_prices = base_prices or {
+            "BTC": 40000.0,
+            "ETH": 2500.0,
+            "ADA": 0.45,
+            "SOL": 95.0,
+            "XRP": 0.55,
+        }
+        self.calls = 0
+
+    def get_historical_ohlc(
+        self, symbol: str, days: int = 30, interval: int = INTERVAL
+    ) -> Optional[OHLCSeries]:
+        self.calls += 1
+        symbol = symbol.upper()
+        base = self.base_prices.get(symbol)
+        if base is None:
+            base = 1.0 + zlib.crc32(symbol.encode()) % 10000
+
+        # Kraken returns at most the 720 most recent candles.
+        points = min(max(days * 1440 // interval, 1), 720)
+        rows = []
+        for i in range(points):
+            close = base * (1 + (i % 20) / 100)
+            rows.append(
+                [
+                    1_700_000_000 + i * interval * 60,
+                    f"{close * 0.99:.8f}",
+                    f"{close * 1.01:.8f}",
+                    f"{close * 0.98:.8f}",
+                    f"{close:.8f}",
+                    f"{close:.8f}",
+                    f"{100.0 + i:.8f}",
+                    10,
+                ]
+            )
+        return OHLCSeries(rows, self.OHLC_LAYOUT)
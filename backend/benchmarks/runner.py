@@ -0,0 +1,192 @@
+"""
+Benchmark runner.
+
+Usage (from backend/):
+    python -m benchmarks                                 # run, write latest.json
+    python -m benchmarks -k views                        # only matching names
+    python -m benchmarks --save-baseline                 # also store as baseline
+    python -m benchmarks --compare --threshold 0.25      # fail on >25% slowdown
+
+Every benchmark runs in its own rolled-back transaction on a throwaway test
+database, with the cache cleared and ``FakeKrakenClient`` substituted for the
+real Kraken client. API throttling is switched off so view benchmarks
+measure the views rather than 429s. Timings are per operation; the best
+of ``--repeat`` samples is compared against the baseline, as it is the
+least noisy figure.
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+from unittest import mock
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+LATEST_PATH = RESULTS_DIR / "latest.json"
+BASELINE_PATH = RESULTS_DIR / "baseline.json"
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _time_benchmark(bench, repeat: int) -> Dict[str, float]:
+    from django.core.cache import cache
+    from django.db import transaction
+
+    cache.clear()
+    try:
+        with transaction.atomic():
+            operation = bench.setup()
+            operation()  # warm-up (imports, first-hit caches)
+            samples = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                for _ in range(bench.number):
+                    operation()
+                samples.append((time.perf_counter() - started) / bench.number)
+            raise _Rollback
+    except _Rollback:
+        pass
+
+    best = min(samples)
+    return {
+        "number": bench.number,
+        "repeat": repeat,
+        "best_us": round(best * 1e6, 3),
+        "median_us": round(statistics.median(samples) * 1e6, 3),
+        "ops_per_sec": round(1 / best, 1) if best else None,
+    }
+
+
+def run(pattern: Optional[str] = None, repeat: int = 5) -> Dict[str, Dict]:
+    """Run the (matching) benchmarks and return results keyed by name."""
+    from django.test.utils import (
+        setup_databases,
+        setup_test_environment,
+        teardown_databases,
+        teardown_test_environment,
+    )
+    from rest_framework.views import APIView
+
+    from .fakes import FakeKrakenClient
+    from .suite import BENCHMARKS
+
+    selected = [b for name, b in BENCHMARKS.items() if not pattern or pattern in name]
+
+    setup_test_environment()
+    old_config = setup_databases(verbosity=0, interactive=False)
+    logging.disable(logging.WARNING)
+    results = {}
+    try:
+        with (
+            mock.patch("domain.services.KrakenClient", FakeKrakenClient),
+            mock.patch.object(APIView, "check_throttles", lambda self, request: None),
+        ):
+            for bench in selected:
+                results[bench.name] = _time_benchmark(bench, repeat)
+                print(f"{bench.name:<45} {results[bench.name]['best_us']:>12.1f} us/op")
+    finally:
+        logging.disable(logging.NOTSET)
+        teardown_databases(old_config, verbosity=0)
+        teardown_test_environment()
+    return results
+
+
+def compare(
+    results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float
+) -> List[str]:
+    """Names of benchmarks slower than baseline by more than ``threshold``."""
+    regressions = []
+    print(f"\n{'benchmark':<45} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            print(f"{name:<45} {'-':>12} {current['best_us']:>12.1f}      new")
+            continue
+        change = current["best_us"] / previous["best_us"] - 1
+        flag = "  REGRESSION" if change > threshold else ""
+        print(
+            f"{name:<45} {previous['best_us']:>12.1f} {current['best_us']:>12.1f} "
+            f"{change:>+8.1%}{flag}"
+        )
+        if change > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def _load(path: Path) -> Dict[str, Dict]:
+    with open(path) as fh:
+        return json.load(fh)["results"]
+
+
+def _save(path: Path, results: Dict[str, Dict]) -> None:
+    import django
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+    with open(path, "w") as fh:
+        json.dump(payload, fh, indent=2, sort_keys=True)
+        fh.write("\n")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the benchmark suite.")
+    parser.add_argument("-k", dest="pattern", help="only run names containing this")
+    parser.add_argument("--repeat", type=int, default=5, help="samples per benchmark")
+    parser.add_argument("--output", type=Path, default=LATEST_PATH)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="store results as baseline"
+    )
+    parser.add_argument(
+        "--compare", action="store_true", help="exit 1 on regressions vs baseline"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="allowed slowdown before failing (0.25 = 25%%)",
+    )
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    import django
+
+    django.setup()
+
+    results = run(args.pattern, args.repeat)
+    _save(args.output, results)
+    print(f"\nResults written to {args.output}")
+
+    if args.save_baseline:
+        _save(args.baseline, results)
+        print(f"Baseline written to {args.baseline}")
+
+    if args.compare:
+        if not args.baseline.exists():
+            print(f"No baseline at {args.baseline}; run with --save-baseline first")
+            return 1
+        regressions = compare(results, _load(args.baseline), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+            return 1
+        print("\nNo regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,263 @@
+"""
+Benchmark definitions.
+
+Each benchmark is a setup function registered with ``@benchmark``; it
+prepares data and returns the operation to time. Setups run against a
+fresh test database with an empty cache and ``FakeKrakenClient`` in place
+of the real client (see ``benchmarks.runner``).
+"""
+
+import itertools
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Callable, Dict
+
+from django.core.cache import cache
+from django.test import Client
+from domain.models import MarketPrice, PortfolioResult
+from domain.serializers import (
+    PortfolioResultFastSerializer,
+    PortfolioResultSerializer,
+)
+from domain.services import MarketDataService, PortfolioCalculator, PortfolioService
+from rest_framework.renderers import JSONRenderer
+from shared.renderers import FastJSONRenderer
+
+from .fakes import FakeKrakenClient
+
+
+@dataclass
+class Benchmark:
+    """A registered benchmark; ``number`` operations are timed per sample."""
+
+    name: str
+    setup: Callable[[], Callable[[], object]]
+    number: int
+
+
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+
+def benchmark(name: str, number: int = 100):
+    """Register a setup function as benchmark ``name``."""
+
+    def register(setup):
+        BENCHMARKS[name] = Benchmark(name, setup, number)
+        return setup
+
+    return register
+
+
+def _create_results(count: int) -> None:
+    PortfolioResult.objects.bulk_create(
+        PortfolioResult(
+            symbol=("BTC", "ETH", "ADA", "SOL", "XRP")[i % 5],
+            investment=Decimal(100 + i),
+            number_coins=Decimal("0.12345678"),
+            profit=Decimal(i % 300 - 100),
+            growth_factor=Decimal((i % 300 - 100) / 100),
+            lambos=Decimal("0"),
+        )
+        for i in range(count)
+    )
+
+
+def _fresh_symbols():
+    # Never-seen symbols force the cache/DB miss path on every operation.
+    return (f"B{n}" for n in itertools.count())
+
+
+def _prime_prices(symbol: str = "BTC") -> None:
+    cache.set(f"opening_avg:{symbol}", "40000", 3600)
+    cache.set(f"current_price:{symbol}", "50000", 3600)
+
+
+# -----------------------------------------------------------------------------
+# Service layer
+# -----------------------------------------------------------------------------
+
+
+@benchmark("calculator.calculate", number=10000)
+def calculator_calculate():
+    calculator = PortfolioCalculator()
+    return lambda: calculator.calculate(
+        Decimal("1000"), Decimal("40000"), Decimal("50000")
+    )
+
+
+@benchmark("calculator.calculate_batch_1000", number=10)
+def calculator_calculate_batch():
+    calculator = PortfolioCalculator()
+    inputs = [
+        (Decimal(100 + i), Decimal("40000"), Decimal(30000 + i * 10))
+        for i in range(1000)
+    ]
+    return lambda: [calculator.calculate(*args) for args in inputs]
+
+
+@benchmark("calculator.calculate_many_1000", number=10)
+def calculator_calculate_many():
+    calculator = PortfolioCalculator()
+    investments = [Decimal(100 + i) for i in range(1000)]
+    return lambda: calculator.calculate_many(
+        investments, Decimal("40000"), Decimal("50000")
+    )
+
+
+@benchmark("market_data.opening_average.hit", number=5000)
+def opening_average_hit():
+    service = MarketDataService(client=FakeKrakenClient())
+    service.get_opening_average("BTC")
+    return lambda: service.get_opening_average("BTC")
+
+
+@benchmark("market_data.opening_average.miss", number=200)
+def opening_average_miss():
+    service = MarketDataService(client=FakeKrakenClient())
+    symbols = _fresh_symbols()
+    return lambda: service.get_opening_average(next(symbols))
+
+
+@benchmark("market_data.current_price.hit", number=5000)
+def current_price_hit():
+    service = MarketDataService(client=FakeKrakenClient())
+    service.get_current_price("BTC")
+    return lambda: service.get_current_price("BTC")
+
+
+@benchmark("market_data.current_price.miss", number=200)
+def current_price_miss():
+    service = MarketDataService(client=FakeKrakenClient())
+    symbols = _fresh_symbols()
+    return lambda: service.get_current_price(next(symbols))
+
+
+@benchmark("market_data.price_history_100.buffered", number=1000)
+def price_history_buffered():
+    service = MarketDataService(client=FakeKrakenClient())
+    service.ingest_candles("BTC", service.client.get_historical_ohlc("BTC", days=25))
+    service.get_price_history("BTC", limit=100)
+    return lambda: service.get_price_history("BTC", limit=100)
+
+
+@benchmark("market_data.price_history_100.database", number=1000)
+def price_history_database():
+    service = MarketDataService(client=FakeKrakenClient())
+    service.ingest_candles("NOPE", service.client.get_historical_ohlc("NOPE", days=25))
+    return lambda: service.get_price_history("NOPE", limit=100)
+
+
+@benchmark("portfolio.process_request", number=200)
+def process_request():
+    service = PortfolioService(
+        market_service=MarketDataService(client=FakeKrakenClient())
+    )
+    _prime_prices()
+    return lambda: service.process_request("BTC", Decimal("1000"))
+
+
+@benchmark("portfolio.process_batch_1000", number=3)
+def process_batch():
+    service = PortfolioService(
+        market_service=MarketDataService(client=FakeKrakenClient())
+    )
+    _prime_prices("BTC")
+    _prime_prices("ETH")
+    configs = [
+        {"symbol": ("BTC", "ETH")[i % 2], "investment": 100 + i} for i in range(1000)
+    ]
+    return lambda: service.process_batch(configs)
+
+
+# -----------------------------------------------------------------------------
+# Serialization
+# -----------------------------------------------------------------------------
+
+
+@benchmark("serializers.portfolio_result.many_500", number=20)
+def portfolio_result_serializer():
+    _create_results(500)
+    results = list(PortfolioResult.objects.all()[:500])
+    return lambda: PortfolioResultSerializer(results, many=True).data
+
+
+@benchmark("serializers.portfolio_result.fast_500", number=20)
+def portfolio_result_fast_serializer():
+    _create_results(500)
+    rows = list(
+        PortfolioResult.objects.derived_values(*PortfolioResultFastSerializer.FIELDS)[
+            :500
+        ]
+    )
+    return lambda: PortfolioResultFastSerializer(rows).render()
+
+
+@benchmark("renderers.json.stock_500", number=50)
+def json_renderer():
+    _create_results(500)
+    data = PortfolioResultSerializer(PortfolioResult.objects.all(), many=True).data
+    renderer = JSONRenderer()
+    return lambda: renderer.render(data)
+
+
+@benchmark("renderers.json.fast_500", number=50)
+def fast_json_renderer():
+    _create_results(500)
+    data = PortfolioResultSerializer(PortfolioResult.objects.all(), many=True).data
+    renderer = FastJSONRenderer()
+    return lambda: renderer.render(data)
+
+
+# -----------------------------------------------------------------------------
+# Views (through the Django test client)
+# -----------------------------------------------------------------------------
+
+
+@benchmark("views.result_list", number=50)
+def view_result_list():
+    _create_results(100)
+    client = Client()
+    return lambda: client.get("/api/results/")
+
+
+@benchmark("views.result_detail", number=200)
+def view_result_detail():
+    _create_results(1)
+    url = f"/api/results/{PortfolioResult.objects.get().id}/"
+    client = Client()
+    return lambda: client.get(url)
+
+
+@benchmark("views.price_history", number=100)
+def view_price_history():
+    MarketPrice.objects.bulk_create(
+        MarketPrice(symbol="BTC", price=Decimal(50000 + i)) for i in range(100)
+    )
+    client = Client()
+    return lambda: client.get("/api/price/history/", {"symbol": "BTC"})
+
+
+@benchmark("views.current_price", number=200)
+def view_current_price():
+    _prime_prices()
+    client = Client()
+    return lambda: client.get("/api/price/current/", {"symbol": "BTC"})
+
+
+@benchmark("views.process_request", number=100)
+def view_process_request():
+    _prime_prices()
+    client = Client()
+    return lambda: client.post(
+        "/api/process_request/",
+        {"symbol": "BTC", "investment": 1000},
+        content_type="application/json",
+    )
+
+
+@benchmark("views.analytics_report", number=100)
+def view_analytics_report():
+    _create_results(200)
+    client = Client()
+    client.get("/api/analytics/report/")
+    return lambda: client.get("/api/analytics/report/")
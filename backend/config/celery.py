@@ -6,6 +6,7 @@ This module initializes Celery and configures it to work with Django.
 import os
 
 from celery import Celery
+from celery.signals import celeryd_init
 
 # Set the default Django settings module for the 'celery' program.
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
@@ -22,6 +23,24 @@ app.config_from_object("django.conf:settings", namespace="CELERY")
 app.autodiscover_tasks()
 
 
+@celeryd_init.connect
+def configure_worker_pool(conf=None, options=None, **kwargs):
+    """Apply CELERY_WORKER_POOLS to a worker consuming a single queue."""
+    from django.conf import settings
+
+    queues = (options or {}).get("queues") or []
+    if isinstance(queues, str):
+        queues = queues.split(",")
+    if len(queues) != 1 or queues[0] not in settings.CELERY_WORKER_POOLS:
+        return
+
+    pool = settings.CELERY_WORKER_POOLS[queues[0]]
+    if options.get("concurrency") is None:
+        conf.worker_concurrency = pool["concurrency"]
+    if options.get("prefetch_multiplier") is None:
+        conf.worker_prefetch_multiplier = pool["prefetch_multiplier"]
+
+
 @app.task(bind=True, ignore_result=True)
 def debug_task(self):
     """Debug task to test Celery is working correctly."""
@@ -16,6 +16,7 @@ from pathlib import Path
 
 import dj_database_url
 import environ
+from kombu import Exchange, Queue
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -79,6 +80,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django_prometheus.middleware.PrometheusBeforeMiddleware",
+    "shared.middleware.PerformanceMiddleware",  # Server-Timing + request metrics
+    "shared.profiling.ProfilingMiddleware",  # Opt-in sampling profiler
     # "django.middleware.security.SecurityMiddleware",  # Disabled for tests to prevent HTTPS redirects
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -185,14 +188,25 @@ if not DEBUG:
     SECURE_HSTS_INCLUDE_SUBDOMAINS = True
     SECURE_HSTS_PRELOAD = True
 
+# Fast JSON renderer/parser (orjson when installed, stock behaviour otherwise)
+FAST_JSON = env.bool("FAST_JSON", default=True)
+
 # REST Framework configuration
 REST_FRAMEWORK = {
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_RENDERER_CLASSES": [
-        "rest_framework.renderers.JSONRenderer",
+        (
+            "shared.renderers.FastJSONRenderer"
+            if FAST_JSON
+            else "rest_framework.renderers.JSONRenderer"
+        ),
     ],
     "DEFAULT_PARSER_CLASSES": [
-        "rest_framework.parsers.JSONParser",
+        (
+            "shared.parsers.FastJSONParser"
+            if FAST_JSON
+            else "rest_framework.parsers.JSONParser"
+        ),
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.AllowAny",  # Allow public access
@@ -203,11 +217,27 @@ REST_FRAMEWORK = {
     ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 20,
+    # Sliding-window counters in the "shared" cache (see shared/throttling.py)
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
+        "shared.throttling.AnonSlidingWindowThrottle",
+        "shared.throttling.UserSlidingWindowThrottle",
     ],
-    "DEFAULT_THROTTLE_RATES": {"anon": "100/hour", "user": "1000/hour"},
+    "DEFAULT_THROTTLE_RATES": {
+        "anon": env("THROTTLE_RATE_ANON", default="100/hour"),
+        "user": env("THROTTLE_RATE_USER", default="1000/hour"),
+        # Per-endpoint overrides: "<scope>.<url name>"
+        "anon.health-check": "60/minute",
+        "user.health-check": "60/minute",
+        "anon.process-request": env("THROTTLE_RATE_PROCESS", default="50/hour"),
+        "user.process-request": env("THROTTLE_RATE_PROCESS", default="50/hour"),
+        "anon.job-portfolio": env("THROTTLE_RATE_PROCESS", default="50/hour"),
+        "user.job-portfolio": env("THROTTLE_RATE_PROCESS", default="50/hour"),
+        "anon.job-batch": "10/hour",
+        "user.job-batch": "10/hour",
+        # Polling clients: a status read every second or two.
+        "anon.job-status": "120/minute",
+        "user.job-status": "120/minute",
+    },
 }
 
 # API Documentation
@@ -228,9 +258,101 @@ CACHES = {
         },
         "KEY_PREFIX": "app",
         "TIMEOUT": 300,
-    }
+    },
+    # State that must be shared by all workers (API throttling counters).
+    # Without SHARED_CACHE_URL each process falls back to its own memory.
+    "shared": (
+        {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": env("SHARED_CACHE_URL"),
+            "KEY_PREFIX": "app",
+            "TIMEOUT": 300,
+        }
+        if env("SHARED_CACHE_URL", default="")
+        else {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "shared",
+            "OPTIONS": {
+                "MAX_ENTRIES": 10000,
+            },
+            "KEY_PREFIX": "app",
+            "TIMEOUT": 300,
+        }
+    ),
 }
 
+# Kraken public API (override to point at loadtest.stub_kraken)
+KRAKEN_BASE_URL = env("KRAKEN_BASE_URL", default="https://api.kraken.com/0/public")
+
+# Tracked-symbol registry (domain.TrackedSymbol, edited in the admin).
+# TRACKED_SYMBOLS only seeds the registry when its table is created.
+TRACKED_SYMBOLS = env.list(
+    "TRACKED_SYMBOLS", default=["BTC", "ETH", "ADA", "SOL", "XRP"]
+)
+SYMBOL_REGISTRY_TTL = 60  # seconds a process reuses its registry snapshot
+# process_request calls within the window that add a symbol to the registry
+# and make a tracked one "hot" (refreshed every SYMBOL_HOT_REFRESH_INTERVAL).
+SYMBOL_PROMOTION_THRESHOLD = env.int("SYMBOL_PROMOTION_THRESHOLD", default=20)
+SYMBOL_PROMOTION_WINDOW = 3600
+SYMBOL_HOT_REFRESH_INTERVAL = 60
+# Upstream price fetches per domain.refresh_due_symbols run.
+SYMBOL_REFRESH_BUDGET = env.int("SYMBOL_REFRESH_BUDGET", default=30)
+# Recent snapshots per tracked symbol kept in each process's price history
+# ring buffer (~32 bytes each); larger history limits read the database.
+PRICE_BUFFER_SIZE = env.int("PRICE_BUFFER_SIZE", default=1000)
+
+# Daily rollups (domain.refresh_rollups): rows written this many seconds
+# before the previous refresh are folded in again, so rows whose
+# transaction committed after a higher id was processed are not lost.
+ROLLUP_REPROCESS_WINDOW = env.int("ROLLUP_REPROCESS_WINDOW", default=300)
+
+# Cache warm-up (manage.py warm_cache). With CACHE_WARMUP_ON_STARTUP each
+# web and Celery worker process warms its own cache in a background thread
+# at boot; CACHE_WARMUP_MAX_SECONDS caps the run either way.
+CACHE_WARMUP_ON_STARTUP = env.bool("CACHE_WARMUP_ON_STARTUP", default=False)
+CACHE_WARMUP_MAX_SECONDS = env.float("CACHE_WARMUP_MAX_SECONDS", default=10.0)
+CACHE_WARMUP_HOT_RESULTS = 100  # most recent results preloaded
+
+# Real-time price streaming (Server-Sent Events, requires an ASGI server).
+# Set BROADCAST_REDIS_URL so prices fetched in any process (web or Celery)
+# are relayed to clients connected to every web process.
+BROADCAST_REDIS_URL = env("BROADCAST_REDIS_URL", default="")
+PRICE_STREAM_HEARTBEAT = 15  # seconds between keep-alive comments
+PRICE_STREAM_MAX_SECONDS = 300  # clients reconnect (SSE retry) after this
+
+# On-demand profiling (shared.profiling). Collapsed stacks go to PROFILING_DIR.
+# Requests are profiled at PROFILING_SAMPLE_RATE or when they carry an
+# X-Profile-Token header signed with PROFILING_SECRET, generated with
+# shared.profiling.make_profile_token(). Tasks use PROFILING_TASK_SAMPLE_RATE.
+PROFILING_DIR = env("PROFILING_DIR", default=str(BASE_DIR / "profiles"))
+PROFILING_SAMPLE_RATE = env.float("PROFILING_SAMPLE_RATE", default=0.0)
+PROFILING_TASK_SAMPLE_RATE = env.float("PROFILING_TASK_SAMPLE_RATE", default=0.0)
+PROFILING_SECRET = env("PROFILING_SECRET", default="")
+PROFILING_TOKEN_MAX_AGE = 3600  # seconds a signed profile token stays valid
+PROFILING_INTERVAL_MS = 5
+PROFILING_MAX_SECONDS = 30  # stop sampling long requests/tasks after this
+PROFILING_MAX_CONCURRENT = 1  # per process
+
+# Query budgets (shared.query_budget): raise on overruns instead of logging.
+# Off outside tests: budgets decorate code running inside transactions, so a
+# raise would roll back work that succeeded. Tests opt in per block through
+# the query_budget fixture (or by setting this).
+QUERY_BUDGET_STRICT = env.bool("QUERY_BUDGET_STRICT", default=False)
+
+# Identical process_portfolio_async submissions within this many seconds
+# reuse the first task and its result (shared.task_dedup).
+TASK_DEDUP_WINDOW = env.int("TASK_DEDUP_WINDOW", default=300)
+
+# Job endpoints (/api/jobs/): status reads of running jobs are cached this
+# many seconds; finished jobs until CELERY_RESULT_EXPIRES.
+JOB_STATUS_CACHE_TTL = 2
+JOB_BATCH_MAX_ITEMS = 100_000
+
+# Batch portfolio processing (domain.batch_process_portfolios): batches
+# larger than PORTFOLIO_BATCH_TASK_SIZE fan out to parallel chunk tasks.
+PORTFOLIO_BATCH_TASK_SIZE = env.int("PORTFOLIO_BATCH_TASK_SIZE", default=10000)
+BATCH_PROGRESS_INTERVAL = 2.0  # seconds between PROGRESS state updates
+
 # Celery Configuration
 CELERY_BROKER_URL = env("REDIS_URL", default="redis://redis:6379/0")
 CELERY_RESULT_BACKEND = env("REDIS_URL", default="redis://redis:6379/0")
@@ -247,6 +369,51 @@ CELERY_WORKER_MAX_TASKS_PER_CHILD = (
     1000  # Restart worker after N tasks (prevent memory leaks)
 )
 
+# Task routing. Each queue is consumed by its own worker pool, so price
+# refreshes never wait behind a bulk job:
+#   realtime     price refreshes and user-facing calculations
+#   batch        bulk/backtest jobs
+#   maintenance  scheduled housekeeping and reports (default queue)
+CELERY_TASK_QUEUES = [
+    Queue(name, Exchange(name), routing_key=name)
+    for name in ("realtime", "batch", "maintenance")
+]
+CELERY_TASK_DEFAULT_QUEUE = "maintenance"
+# Priorities within a queue, in the Redis transport's order: 0 runs first.
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    "queue_order_strategy": "priority",
+    "priority_steps": list(range(10)),
+    "sep": ":",
+}
+CELERY_TASK_DEFAULT_PRIORITY = 5
+CELERY_TASK_ROUTES = {
+    "domain.fetch_market_prices": {"queue": "realtime", "priority": 0},
+    "domain.refresh_due_symbols": {"queue": "realtime", "priority": 0},
+    "domain.process_portfolio_async": {"queue": "realtime", "priority": 3},
+    # Merging ahead of new chunks lets started batches finish first.
+    "domain.merge_batch_results": {"queue": "batch", "priority": 3},
+    "domain.batch_process_portfolios": {"queue": "batch", "priority": 5},
+    "domain.process_portfolio_chunk": {"queue": "batch", "priority": 5},
+    "domain.update_opening_averages": {"queue": "maintenance", "priority": 3},
+    "domain.refresh_rollups": {"queue": "maintenance", "priority": 5},
+    "domain.generate_analytics_report": {"queue": "maintenance", "priority": 5},
+    "domain.analyze_covid_impact": {"queue": "maintenance", "priority": 5},
+    "domain.log_system_event": {"queue": "maintenance", "priority": 5},
+    "domain.cleanup_old_data": {"queue": "maintenance", "priority": 9},
+}
+# Pool defaults for a worker started on a single queue (-Q <name>); command
+# line --concurrency/--prefetch-multiplier still win. Prefetch 1 keeps one
+# slow task from holding queued messages other processes could run.
+CELERY_WORKER_POOLS = {
+    "realtime": {"concurrency": 4, "prefetch_multiplier": 1},
+    "batch": {"concurrency": 2, "prefetch_multiplier": 1},
+    "maintenance": {"concurrency": 1, "prefetch_multiplier": 1},
+}
+
+# Port for a worker-side /metrics exporter (0 disables it). Domain task
+# metrics are recorded in the worker, not in the web process.
+CELERY_METRICS_PORT = env.int("CELERY_METRICS_PORT", default=0)
+
 # Celery Beat (scheduled tasks)
 CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
 
@@ -0,0 +1,9 @@
+"""Shared fixtures for the app test modules (domain/tests.py, ...)."""
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def strict_query_budgets(settings):
+    """Fail tests whose views/services exceed their declared query budgets."""
+    settings.QUERY_BUDGET_STRICT = True
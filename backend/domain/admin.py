@@ -1,19 +1,90 @@
 """Domain admin configuration."""
 
 from django.contrib import admin
+from shared.admin import (
+    CachedChoicesFilter,
+    EstimatedCountPaginator,
+    KeysetChangeList,
+    RecentPeriodFilter,
+)
 
 from .models import (
     AnalysisReport,
     MarketPrice,
+    MarketPriceDailyRollup,
     OpeningAverage,
+    PortfolioDailyRollup,
     PortfolioLog,
     PortfolioResult,
     Prediction,
+    TrackedSymbol,
 )
+from .services import PortfolioService, PriceHistoryBuffer, SymbolRegistry
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Changelist for large, append-only tables.
+
+    Counts are exact only up to EstimatedCountPaginator.exact_limit rows,
+    page links stop at max_pages, and "Older" links page further by primary
+    key (``?before=<pk>``), so ordering is by ``-id`` (insertion order, which
+    is also date order for these tables). Subclasses add a
+    RecentPeriodFilter so a changelist opens on a recent window.
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    change_list_template = "admin/large_table_change_list.html"
+    ordering = ["-id"]
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+
+class SymbolFilter(CachedChoicesFilter):
+    """Symbols from the registry and the (small) rollup tables, cached."""
+
+    title = "symbol"
+    parameter_name = "symbol"
+    field = "symbol"
+
+    def get_choices(self, request, model_admin):
+        symbols = set(TrackedSymbol.objects.values_list("symbol", flat=True))
+        for rollup in (PortfolioDailyRollup, MarketPriceDailyRollup):
+            symbols.update(rollup.objects.values_list("symbol", flat=True).distinct())
+        return sorted(symbols)
+
+
+class ResultPeriodFilter(RecentPeriodFilter):
+    field = "generation_date"
+
+
+class LogPeriodFilter(RecentPeriodFilter):
+    field = "created_at"
+
+
+class PricePeriodFilter(RecentPeriodFilter):
+    field = "timestamp"
+
+
+class RiskLevelFilter(admin.SimpleListFilter):
+    """Filter results by derived risk level (growth factor ranges in SQL)."""
+
+    title = "risk level"
+    parameter_name = "risk_level"
+
+    def lookups(self, request, model_admin):
+        return [(level, level.title()) for level in ("LOW", "MEDIUM", "HIGH")]
+
+    def queryset(self, request, queryset):
+        if self.value() in ("LOW", "MEDIUM", "HIGH"):
+            return queryset.filter_derived(risk_level=self.value())
+        return queryset
 
 
 @admin.register(PortfolioResult)
-class PortfolioResultAdmin(admin.ModelAdmin):
+class PortfolioResultAdmin(LargeTableAdmin):
     """Admin interface for Portfolio Results."""
 
     list_display = [
@@ -21,11 +92,12 @@ class PortfolioResultAdmin(admin.ModelAdmin):
         "symbol",
         "investment",
         "profit",
-        "roi_percentage",
+        "roi",
         "generation_date",
     ]
-    list_filter = ["symbol", "generation_date"]
-    search_fields = ["symbol"]
+    list_filter = [ResultPeriodFilter, SymbolFilter, RiskLevelFilter]
+    date_hierarchy = "generation_date"
+    search_fields = ["=symbol"]
     readonly_fields = [
         "id",
         "generation_date",
@@ -34,18 +106,38 @@ class PortfolioResultAdmin(admin.ModelAdmin):
         "can_buy_lambo",
         "risk_level",
     ]
-    ordering = ["-generation_date"]
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_derived()
+
+    @admin.display(description="ROI %", ordering="roi_percentage")
+    def roi(self, obj):
+        return f"{obj.roi_percentage:.2f}"
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        PortfolioService().invalidate_results([obj.pk])
+
+    def delete_model(self, request, obj):
+        pk = obj.pk
+        super().delete_model(request, obj)
+        PortfolioService().invalidate_results([pk])
+
+    def delete_queryset(self, request, queryset):
+        pks = list(queryset.values_list("pk", flat=True))
+        super().delete_queryset(request, queryset)
+        PortfolioService().invalidate_results(pks)
 
 
 @admin.register(PortfolioLog)
-class PortfolioLogAdmin(admin.ModelAdmin):
+class PortfolioLogAdmin(LargeTableAdmin):
     """Admin interface for Portfolio Logs."""
 
     list_display = ["id", "symbol", "action", "level", "created_at"]
-    list_filter = ["level", "symbol", "created_at"]
-    search_fields = ["symbol", "action"]
+    list_filter = [LogPeriodFilter, "level", SymbolFilter]
+    date_hierarchy = "created_at"
+    search_fields = ["=symbol", "action"]
     readonly_fields = ["id", "created_at", "metadata"]
-    ordering = ["-created_at"]
 
 
 @admin.register(OpeningAverage)
@@ -60,14 +152,34 @@ class OpeningAverageAdmin(admin.ModelAdmin):
 
 
 @admin.register(MarketPrice)
-class MarketPriceAdmin(admin.ModelAdmin):
+class MarketPriceAdmin(LargeTableAdmin):
     """Admin interface for Market Prices."""
 
-    list_display = ["id", "symbol", "price", "volume", "timestamp"]
-    list_filter = ["symbol", "timestamp"]
-    search_fields = ["symbol"]
-    readonly_fields = ["id", "timestamp"]
-    ordering = ["-timestamp"]
+    list_display = [
+        "id",
+        "symbol",
+        "price",
+        "volume",
+        "candle_timestamp",
+        "timestamp",
+        "updated_at",
+    ]
+    list_filter = [PricePeriodFilter, SymbolFilter]
+    date_hierarchy = "timestamp"
+    search_fields = ["=symbol"]
+    readonly_fields = ["id", "timestamp", "updated_at"]
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        PriceHistoryBuffer.invalidate()
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        PriceHistoryBuffer.invalidate()
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        PriceHistoryBuffer.invalidate()
 
 
 @admin.register(Prediction)
@@ -90,3 +202,65 @@ class AnalysisReportAdmin(admin.ModelAdmin):
     search_fields = ["report_type", "summary"]
     readonly_fields = ["id", "created_at", "data"]
     ordering = ["-created_at"]
+
+
+@admin.register(PortfolioDailyRollup)
+class PortfolioDailyRollupAdmin(admin.ModelAdmin):
+    """Admin interface for daily portfolio rollups."""
+
+    list_display = [
+        "day",
+        "symbol",
+        "calculations",
+        "total_investment",
+        "total_profit",
+        "profitable_count",
+        "updated_at",
+    ]
+    list_filter = ["symbol", "day"]
+    search_fields = ["symbol"]
+    readonly_fields = ["id", "updated_at"]
+    ordering = ["-day", "symbol"]
+
+
+@admin.register(MarketPriceDailyRollup)
+class MarketPriceDailyRollupAdmin(admin.ModelAdmin):
+    """Admin interface for daily market price rollups."""
+
+    list_display = ["day", "symbol", "open", "high", "low", "close", "samples"]
+    list_filter = ["symbol", "day"]
+    search_fields = ["symbol"]
+    readonly_fields = ["id", "updated_at"]
+    ordering = ["-day", "symbol"]
+
+
+@admin.register(TrackedSymbol)
+class TrackedSymbolAdmin(admin.ModelAdmin):
+    """Admin interface for the tracked-symbol registry."""
+
+    list_display = [
+        "symbol",
+        "enabled",
+        "priority",
+        "refresh_interval",
+        "auto_promoted",
+        "last_refreshed_at",
+    ]
+    list_editable = ["enabled", "priority", "refresh_interval"]
+    list_filter = ["enabled", "auto_promoted"]
+    search_fields = ["symbol"]
+    readonly_fields = ["auto_promoted", "last_refreshed_at", "created_at", "updated_at"]
+    ordering = ["-priority", "symbol"]
+
+    def save_model(self, request, obj, form, change):
+        obj.symbol = obj.symbol.upper().strip()
+        super().save_model(request, obj, form, change)
+        SymbolRegistry.invalidate()
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        SymbolRegistry.invalidate()
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        SymbolRegistry.invalidate()
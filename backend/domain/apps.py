@@ -1,6 +1,18 @@
 """Domain app configuration."""
 
+import logging
+import os
+import sys
+import threading
+
 from django.apps import AppConfig
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Processes that serve traffic. Anything else (migrate, shell, tests, other
+# management commands) skips the startup warm-up.
+_SERVERS = {"gunicorn", "uvicorn", "daphne"}
 
 
 class DomainConfig(AppConfig):
@@ -9,3 +21,39 @@ class DomainConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "domain"
     verbose_name = "DWML Domain"
+
+    def ready(self):
+        # Register domain metrics and their Celery signal handlers.
+        from . import metrics  # noqa: F401
+
+        if settings.CACHE_WARMUP_ON_STARTUP:
+            self._schedule_cache_warmup()
+
+    def _schedule_cache_warmup(self):
+        program = os.path.basename(sys.argv[0]) if sys.argv else ""
+        if program == "celery":
+            # Prefork children do not inherit threads, so each warms itself.
+            from celery.signals import worker_process_init
+
+            worker_process_init.connect(_start_cache_warmup, weak=False)
+        elif program in _SERVERS or sys.argv[1:2] == ["runserver"]:
+            _start_cache_warmup()
+
+
+def _start_cache_warmup(**kwargs):
+    """Warm this process's cache without delaying startup."""
+    threading.Thread(target=_warm_cache, name="cache-warmup", daemon=True).start()
+
+
+def _warm_cache():
+    from django.db import connections
+
+    from .services import CacheWarmupService
+
+    try:
+        stats = CacheWarmupService().warm()
+        logger.info("Cache warm-up finished: %s", stats)
+    except Exception as e:  # noqa: BLE001 - warm-up must never break startup
+        logger.warning("Cache warm-up failed: %s", e)
+    finally:
+        connections.close_all()
@@ -0,0 +1,59 @@
+"""Show how many messages are waiting in each Celery queue."""
+
+import time
+
+from config.celery import app
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from kombu.exceptions import ChannelError
+
+
+def queue_depths(connection, names):
+    """
+    {queue: (messages, consumers)}; queues never created count as empty.
+
+    The Redis transport does not track consumers and always reports 0.
+    """
+    errors = (ChannelError,) + tuple(connection.channel_errors)
+    depths = {}
+    for name in names:
+        # A failed passive declare can close the channel, so use one each.
+        channel = connection.channel()
+        try:
+            _, messages, consumers = channel.queue_declare(queue=name, passive=True)
+        except errors:
+            messages, consumers = 0, 0
+        finally:
+            try:
+                channel.close()
+            except errors:
+                pass
+        depths[name] = (messages, consumers)
+    return depths
+
+
+class Command(BaseCommand):
+    help = "Show the number of waiting messages per Celery queue."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--watch",
+            type=float,
+            metavar="SECONDS",
+            help="refresh every SECONDS until interrupted",
+        )
+
+    def handle(self, *args, **options):
+        names = [queue.name for queue in settings.CELERY_TASK_QUEUES]
+        with app.connection_for_read() as connection:
+            while True:
+                self.report(queue_depths(connection, names))
+                if not options["watch"]:
+                    break
+                time.sleep(options["watch"])
+
+    def report(self, depths):
+        self.stdout.write(f"{'queue':<14} {'messages':>9} {'consumers':>10}")
+        for name, (messages, consumers) in depths.items():
+            line = f"{name:<14} {messages:>9} {consumers:>10}"
+            self.stdout.write(self.style.WARNING(line) if messages else line)
@@ -0,0 +1,54 @@
+"""Preload the read caches, e.g. right after a deploy."""
+
+from django.core.management.base import BaseCommand
+from domain.services import CacheWarmupService
+
+
+class Command(BaseCommand):
+    help = (
+        "Preload opening averages, latest prices and recent results for the "
+        "tracked symbols into the cache."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--symbols",
+            nargs="+",
+            help="symbols to warm (default: TRACKED_SYMBOLS)",
+        )
+        parser.add_argument(
+            "--max-seconds",
+            type=float,
+            help="time cap for the whole run (default: CACHE_WARMUP_MAX_SECONDS)",
+        )
+        parser.add_argument(
+            "--results",
+            type=int,
+            help="number of recent results to preload "
+            "(default: CACHE_WARMUP_HOT_RESULTS)",
+        )
+        parser.add_argument(
+            "--fetch-missing",
+            action="store_true",
+            help="fetch values missing from the database from Kraken",
+        )
+
+    def handle(self, *args, **options):
+        stats = CacheWarmupService().warm(
+            symbols=options["symbols"],
+            max_seconds=options["max_seconds"],
+            hot_results=options["results"],
+            fetch_missing=options["fetch_missing"],
+        )
+        counts = ", ".join(
+            f"{name}={stats[name]}"
+            for name in ("opening_averages", "prices", "results", "fetched")
+            if name in stats
+        )
+        self.stdout.write(self.style.SUCCESS(f"Warmed {counts} in {stats['seconds']}s"))
+        if stats["timed_out"]:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Time cap reached; skipped: {', '.join(stats['skipped'])}"
+                )
+            )
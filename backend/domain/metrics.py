@@ -0,0 +1,140 @@
+"""
+Domain-level Prometheus metrics.
+
+Registered in the default registry next to django_prometheus' HTTP/DB
+metrics and exported by the same ``/metrics/`` endpoint. Under gunicorn
+(and Celery prefork) set ``PROMETHEUS_MULTIPROC_DIR`` so every worker
+process writes its samples to a shared directory that the exporter
+aggregates; see ``gunicorn.conf.py``.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+from celery.signals import (
+    before_task_publish,
+    task_postrun,
+    task_prerun,
+    worker_ready,
+)
+from django.conf import settings
+from prometheus_client import Counter, Histogram
+
+# Header stamped on every published task to measure time spent queued.
+PUBLISHED_AT_HEADER = "published_at"
+
+CACHE_LOOKUPS = Counter(
+    "domain_cache_lookups_total",
+    "Cache lookups by key family and result (hit/miss).",
+    ["family", "result"],
+)
+
+KRAKEN_REQUEST_SECONDS = Histogram(
+    "domain_kraken_request_seconds",
+    "Latency of Kraken API requests.",
+    ["endpoint"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+KRAKEN_ERRORS = Counter(
+    "domain_kraken_errors_total",
+    "Failed Kraken API requests by endpoint and reason.",
+    ["endpoint", "reason"],
+)
+
+PROCESS_REQUEST_PHASE_SECONDS = Histogram(
+    "domain_process_request_phase_seconds",
+    "Time spent in each phase of PortfolioService.process_request.",
+    ["phase"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+
+CELERY_TASK_RUNTIME_SECONDS = Histogram(
+    "domain_celery_task_runtime_seconds",
+    "Execution time of domain Celery tasks.",
+    ["task", "state"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 1800),
+)
+
+CELERY_TASK_QUEUE_WAIT_SECONDS = Histogram(
+    "domain_celery_task_queue_wait_seconds",
+    "Time domain Celery tasks waited between publish and start.",
+    ["task"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300),
+)
+
+
+def record_cache_lookup(family: str, hit: bool) -> None:
+    """Count a cache lookup for a key family (e.g. ``opening_avg``)."""
+    CACHE_LOOKUPS.labels(family=family, result="hit" if hit else "miss").inc()
+
+
+@contextmanager
+def time_phase(phase: str) -> Iterator[None]:
+    """Observe the duration of a ``process_request`` phase."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        PROCESS_REQUEST_PHASE_SECONDS.labels(phase=phase).observe(
+            time.perf_counter() - started
+        )
+
+
+# -----------------------------------------------------------------------------
+# Celery task timings
+# -----------------------------------------------------------------------------
+
+_task_started: Dict[str, float] = {}
+
+
+def _is_domain_task(name) -> bool:
+    return bool(name) and name.startswith("domain.")
+
+
+@before_task_publish.connect
+def _stamp_publish_time(sender=None, headers=None, **kwargs):
+    if headers is not None and _is_domain_task(sender):
+        headers[PUBLISHED_AT_HEADER] = time.time()
+
+
+@task_prerun.connect
+def _task_started_handler(task_id=None, task=None, **kwargs):
+    if task is None or not _is_domain_task(task.name):
+        return
+    _task_started[task_id] = time.perf_counter()
+
+    published_at = getattr(task.request, PUBLISHED_AT_HEADER, None)
+    if published_at is not None:
+        CELERY_TASK_QUEUE_WAIT_SECONDS.labels(task=task.name).observe(
+            max(time.time() - float(published_at), 0.0)
+        )
+
+
+@task_postrun.connect
+def _task_finished_handler(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is None or task is None:
+        return
+    CELERY_TASK_RUNTIME_SECONDS.labels(
+        task=task.name, state=state or "UNKNOWN"
+    ).observe(time.perf_counter() - started)
+
+
+@worker_ready.connect
+def _start_worker_exporter(**kwargs):
+    """Serve worker metrics when ``CELERY_METRICS_PORT`` is set."""
+    port = settings.CELERY_METRICS_PORT
+    if not port:
+        return
+
+    from prometheus_client import CollectorRegistry, multiprocess, start_http_server
+
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        start_http_server(port, registry=registry)
+    else:
+        start_http_server(port)
@@ -0,0 +1,147 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:40
+
+from decimal import Decimal
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("domain", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RollupWatermark",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=50, unique=True)),
+                ("last_id", models.BigIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "rollup_watermarks",
+            },
+        ),
+        migrations.CreateModel(
+            name="MarketPriceDailyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("symbol", models.CharField(max_length=10)),
+                ("day", models.DateField()),
+                ("open", models.DecimalField(decimal_places=8, max_digits=20)),
+                ("high", models.DecimalField(decimal_places=8, max_digits=20)),
+                ("low", models.DecimalField(decimal_places=8, max_digits=20)),
+                ("close", models.DecimalField(decimal_places=8, max_digits=20)),
+                ("samples", models.PositiveIntegerField(default=0)),
+                (
+                    "price_sum",
+                    models.DecimalField(
+                        decimal_places=8, default=Decimal("0"), max_digits=30
+                    ),
+                ),
+                (
+                    "volume_sum",
+                    models.DecimalField(
+                        decimal_places=8, default=Decimal("0"), max_digits=30
+                    ),
+                ),
+                (
+                    "price_volume_sum",
+                    models.DecimalField(
+                        decimal_places=8, default=Decimal("0"), max_digits=40
+                    ),
+                ),
+                ("first_timestamp", models.DateTimeField()),
+                ("last_timestamp", models.DateTimeField()),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "market_price_daily_rollups",
+                "ordering": ["-day", "symbol"],
+                "indexes": [
+                    models.Index(
+                        fields=["day", "symbol"], name="market_pric_day_012067_idx"
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("symbol", "day"), name="uniq_price_rollup_symbol_day"
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="PortfolioDailyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("symbol", models.CharField(max_length=10)),
+                ("day", models.DateField()),
+                ("calculations", models.PositiveIntegerField(default=0)),
+                (
+                    "total_investment",
+                    models.DecimalField(
+                        decimal_places=2, default=Decimal("0"), max_digits=24
+                    ),
+                ),
+                (
+                    "total_profit",
+                    models.DecimalField(
+                        decimal_places=2, default=Decimal("0"), max_digits=24
+                    ),
+                ),
+                (
+                    "total_growth_factor",
+                    models.DecimalField(
+                        decimal_places=4, default=Decimal("0"), max_digits=20
+                    ),
+                ),
+                ("profitable_count", models.PositiveIntegerField(default=0)),
+                ("lambo_count", models.PositiveIntegerField(default=0)),
+                ("low_risk_count", models.PositiveIntegerField(default=0)),
+                ("medium_risk_count", models.PositiveIntegerField(default=0)),
+                ("high_risk_count", models.PositiveIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "portfolio_daily_rollups",
+                "ordering": ["-day", "symbol"],
+                "indexes": [
+                    models.Index(
+                        fields=["day", "symbol"], name="portfolio_d_day_4beeb8_idx"
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("symbol", "day"),
+                        name="uniq_portfolio_rollup_symbol_day",
+                    )
+                ],
+            },
+        ),
+    ]
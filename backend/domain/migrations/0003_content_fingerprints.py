@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("domain", "0002_daily_rollups"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="analysisreport",
+            name="fingerprint",
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="prediction",
+            name="fingerprint",
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.7 on 2026-10-19 12:07
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def seed_tracked_symbols(apps, schema_editor):
+    TrackedSymbol = apps.get_model("domain", "TrackedSymbol")
+    TrackedSymbol.objects.bulk_create(
+        [TrackedSymbol(symbol=symbol.upper()) for symbol in settings.TRACKED_SYMBOLS],
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("domain", "0003_content_fingerprints"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TrackedSymbol",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("symbol", models.CharField(max_length=10, unique=True)),
+                ("enabled", models.BooleanField(default=True)),
+                (
+                    "priority",
+                    models.PositiveSmallIntegerField(
+                        default=0, help_text="Higher priorities are refreshed first."
+                    ),
+                ),
+                (
+                    "refresh_interval",
+                    models.PositiveIntegerField(
+                        default=300,
+                        help_text="Seconds between current-price refreshes.",
+                    ),
+                ),
+                (
+                    "auto_promoted",
+                    models.BooleanField(
+                        default=False,
+                        help_text="Added automatically after frequent requests.",
+                    ),
+                ),
+                ("last_refreshed_at", models.DateTimeField(blank=True, null=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "tracked_symbols",
+                "ordering": ["-priority", "symbol"],
+            },
+        ),
+        migrations.RunPython(seed_tracked_symbols, migrations.RunPython.noop),
+    ]
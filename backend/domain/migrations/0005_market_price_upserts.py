@@ -0,0 +1,41 @@
+# Generated by Django 5.2.7 on 2026-10-19 12:14
+
+from django.db import migrations, models
+
+
+def backfill_updated_at(apps, schema_editor):
+    """Existing snapshots were last written when they were taken."""
+    MarketPrice = apps.get_model("domain", "MarketPrice")
+    MarketPrice.objects.update(updated_at=models.F("timestamp"))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("domain", "0004_tracked_symbols"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="marketprice",
+            name="candle_timestamp",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="marketprice",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name="rollupwatermark",
+            name="last_updated_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name="marketprice",
+            constraint=models.UniqueConstraint(
+                fields=("symbol", "candle_timestamp"),
+                name="uniq_market_price_symbol_candle",
+            ),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-19 12:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("domain", "0005_market_price_upserts"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="portfolioresult",
+            index=models.Index(
+                fields=["symbol", "growth_factor"], name="portfolio_r_symbol_ac5464_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="portfolioresult",
+            index=models.Index(
+                fields=["symbol", "profit"], name="portfolio_r_symbol_d13185_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="portfolioresult",
+            index=models.Index(
+                fields=["symbol", "lambos"], name="portfolio_r_symbol_d84a5a_idx"
+            ),
+        ),
+    ]
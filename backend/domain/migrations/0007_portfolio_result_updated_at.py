@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-19 12:59
+
+from django.db import migrations, models
+
+
+def backfill_updated_at(apps, schema_editor):
+    """Existing results were last written when they were generated."""
+    PortfolioResult = apps.get_model("domain", "PortfolioResult")
+    PortfolioResult.objects.update(updated_at=models.F("generation_date"))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("domain", "0006_derived_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="portfolioresult",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+    ]
@@ -4,6 +4,116 @@ from decimal import Decimal
 
 from django.core.validators import MinValueValidator
 from django.db import models
+from django.db.models import (
+    BooleanField,
+    Case,
+    CharField,
+    DecimalField,
+    ExpressionWrapper,
+    F,
+    Q,
+    Value,
+    When,
+)
+
+
+class PortfolioResultQuerySet(models.QuerySet):
+    """
+    QuerySet computing PortfolioResult's derived fields in the database.
+
+    ``with_derived()`` exposes them to ``filter``/``order_by`` and
+    ``aggregate_derived()`` to aggregates::
+
+        results.with_derived().order_by("-roi_percentage")
+        results.aggregate_derived(avg_roi=Avg("roi_percentage"))
+
+    Filtering on a CASE expression cannot use an index, so
+    ``filter_derived()`` turns equality on the boolean/risk fields into
+    plain column ranges instead, served by the ``(symbol, <column>)``
+    indexes for per-symbol queries::
+
+        results.filter_derived(risk_level="HIGH")  # WHERE growth_factor > 2
+    """
+
+    # Column predicates equivalent to each derived value.
+    DERIVED_FILTERS = {
+        "is_profitable": {True: Q(profit__gt=0), False: Q(profit__lte=0)},
+        "can_buy_lambo": {True: Q(lambos__gte=1), False: Q(lambos__lt=1)},
+        "risk_level": {
+            "HIGH": Q(growth_factor__gt=2),
+            "MEDIUM": Q(growth_factor__gt=Decimal("0.5"), growth_factor__lte=2),
+            "LOW": Q(growth_factor__lte=Decimal("0.5")),
+        },
+    }
+
+    @staticmethod
+    def derived_expressions():
+        """SQL equivalents of roi_percentage, is_profitable, can_buy_lambo, risk_level."""
+        return {
+            "roi_percentage": Case(
+                When(investment=0, then=Value(Decimal("0"))),
+                default=F("profit") * 100 / F("investment"),
+                output_field=DecimalField(max_digits=30, decimal_places=10),
+            ),
+            "is_profitable": ExpressionWrapper(
+                Q(profit__gt=0), output_field=BooleanField()
+            ),
+            "can_buy_lambo": ExpressionWrapper(
+                Q(lambos__gte=1), output_field=BooleanField()
+            ),
+            "risk_level": Case(
+                When(growth_factor__gt=2, then=Value("HIGH")),
+                When(growth_factor__gt=Decimal("0.5"), then=Value("MEDIUM")),
+                default=Value("LOW"),
+                output_field=CharField(),
+            ),
+        }
+
+    def with_derived(self):
+        """
+        Make the derived fields usable in filter/order_by.
+
+        They are aliases, not annotations: instances keep the model's
+        methods and properties, and SQL only computes what is referenced.
+        """
+        return self.alias(**self.derived_expressions())
+
+    def aggregate_derived(self, **aggregates):
+        """``aggregate()`` that may reference the derived fields."""
+        return self.annotate(**self.derived_expressions()).aggregate(**aggregates)
+
+    def filter_derived(self, **lookups):
+        """
+        Filter on derived values through index-friendly column predicates.
+
+        Accepts ``<field>=<value>`` and ``<field>__in=[...]`` for
+        is_profitable, can_buy_lambo and risk_level.
+        """
+        queryset = self
+        for lookup, value in lookups.items():
+            field, _, operator = lookup.partition("__")
+            values = value if operator == "in" else [value]
+            if field not in self.DERIVED_FILTERS or operator not in ("", "in"):
+                raise ValueError(f"Unsupported derived lookup: {lookup}")
+            choices = self.DERIVED_FILTERS[field]
+            if not values:
+                return queryset.none()
+            condition = Q()
+            for item in values:
+                if item not in choices:
+                    raise ValueError(f"Invalid {field}: {item!r}")
+                condition |= choices[item]
+            queryset = queryset.filter(condition)
+        return queryset
+
+    def derived_values(self, *fields: str):
+        """
+        ``.values()`` rows with the derived fields annotated in SQL.
+
+        No model instances are built, so this is the fast path for
+        list endpoints and exports.
+        """
+        return self.annotate(**self.derived_expressions()).values(*fields)
 
 
 class PortfolioResult(models.Model):
@@ -25,12 +135,19 @@ class PortfolioResult(models.Model):
     growth_factor = models.DecimalField(max_digits=10, decimal_places=4)
     lambos = models.DecimalField(max_digits=10, decimal_places=2)
     generation_date = models.DateTimeField(auto_now_add=True, db_index=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = PortfolioResultQuerySet.as_manager()
 
     class Meta:
         db_table = "portfolio_results"
         ordering = ["-generation_date"]
         indexes = [
             models.Index(fields=["symbol", "generation_date"]),
+            # Column ranges behind PortfolioResultQuerySet.DERIVED_FILTERS.
+            models.Index(fields=["symbol", "growth_factor"]),
+            models.Index(fields=["symbol", "profit"]),
+            models.Index(fields=["symbol", "lambos"]),
         ]
 
     def __str__(self) -> str:
@@ -106,7 +223,14 @@ class OpeningAverage(models.Model):
 
 
 class MarketPrice(models.Model):
-    """Current market price snapshot."""
+    """
+    Current market price snapshot.
+
+    Snapshots ingested from exchange candles carry the candle's open time
+    and are unique per (symbol, candle_timestamp): re-fetching a candle
+    updates its row (price, volume, updated_at) instead of adding one.
+    ``timestamp`` is when the candle was first observed.
+    """
 
     symbol = models.CharField(max_length=10, db_index=True)
     price = models.DecimalField(
@@ -115,11 +239,19 @@ class MarketPrice(models.Model):
         validators=[MinValueValidator(Decimal("0"))],
     )
     volume = models.DecimalField(max_digits=20, decimal_places=8, null=True, blank=True)
+    candle_timestamp = models.DateTimeField(null=True, blank=True)
     timestamp = models.DateTimeField(auto_now_add=True, db_index=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         db_table = "market_prices"
         ordering = ["-timestamp"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["symbol", "candle_timestamp"],
+                name="uniq_market_price_symbol_candle",
+            ),
+        ]
         indexes = [
             models.Index(fields=["symbol", "timestamp"]),
         ]
@@ -135,6 +267,7 @@ class Prediction(models.Model):
     prediction_type = models.CharField(max_length=50)
     prediction_data = models.JSONField(default=dict)
     confidence = models.DecimalField(max_digits=5, decimal_places=2)
+    fingerprint = models.CharField(max_length=64, blank=True, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
     class Meta:
@@ -151,6 +284,7 @@ class AnalysisReport(models.Model):
     report_type = models.CharField(max_length=50)
     data = models.JSONField(default=dict)
     summary = models.TextField(blank=True)
+    fingerprint = models.CharField(max_length=64, blank=True, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
     class Meta:
@@ -159,3 +293,131 @@ class AnalysisReport(models.Model):
 
     def __str__(self) -> str:
         return f"{self.report_type} - {self.created_at}"
+
+
+class PortfolioDailyRollup(models.Model):
+    """Per-symbol, per-day aggregate of portfolio results."""
+
+    symbol = models.CharField(max_length=10)
+    day = models.DateField()
+    calculations = models.PositiveIntegerField(default=0)
+    total_investment = models.DecimalField(
+        max_digits=24, decimal_places=2, default=Decimal("0")
+    )
+    total_profit = models.DecimalField(
+        max_digits=24, decimal_places=2, default=Decimal("0")
+    )
+    total_growth_factor = models.DecimalField(
+        max_digits=20, decimal_places=4, default=Decimal("0")
+    )
+    profitable_count = models.PositiveIntegerField(default=0)
+    lambo_count = models.PositiveIntegerField(default=0)
+    low_risk_count = models.PositiveIntegerField(default=0)
+    medium_risk_count = models.PositiveIntegerField(default=0)
+    high_risk_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "portfolio_daily_rollups"
+        ordering = ["-day", "symbol"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["symbol", "day"], name="uniq_portfolio_rollup_symbol_day"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["day", "symbol"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.symbol} {self.day}: {self.calculations} calculations"
+
+
+class MarketPriceDailyRollup(models.Model):
+    """Per-symbol, per-day OHLC/VWAP aggregate of market price snapshots."""
+
+    symbol = models.CharField(max_length=10)
+    day = models.DateField()
+    open = models.DecimalField(max_digits=20, decimal_places=8)
+    high = models.DecimalField(max_digits=20, decimal_places=8)
+    low = models.DecimalField(max_digits=20, decimal_places=8)
+    close = models.DecimalField(max_digits=20, decimal_places=8)
+    samples = models.PositiveIntegerField(default=0)
+    price_sum = models.DecimalField(
+        max_digits=30, decimal_places=8, default=Decimal("0")
+    )
+    volume_sum = models.DecimalField(
+        max_digits=30, decimal_places=8, default=Decimal("0")
+    )
+    price_volume_sum = models.DecimalField(
+        max_digits=40, decimal_places=8, default=Decimal("0")
+    )
+    first_timestamp = models.DateTimeField()
+    last_timestamp = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "market_price_daily_rollups"
+        ordering = ["-day", "symbol"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["symbol", "day"], name="uniq_price_rollup_symbol_day"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["day", "symbol"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.symbol} {self.day}: O {self.open} C {self.close}"
+
+    @property
+    def vwap(self) -> Decimal:
+        """Volume-weighted average price (plain mean when no volume recorded)."""
+        if self.volume_sum > 0:
+            return self.price_volume_sum / self.volume_sum
+        if self.samples:
+            return self.price_sum / self.samples
+        return Decimal("0")
+
+
+class RollupWatermark(models.Model):
+    """Highest source row id (and update time) already folded into a rollup."""
+
+    name = models.CharField(max_length=50, unique=True)
+    last_id = models.BigIntegerField(default=0)
+    # For sources whose rows are updated in place (upserted market prices).
+    last_updated_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "rollup_watermarks"
+
+    def __str__(self) -> str:
+        return f"{self.name} @ {self.last_id}"
+
+
+class TrackedSymbol(models.Model):
+    """Symbol whose market data is refreshed in the background."""
+
+    symbol = models.CharField(max_length=10, unique=True)
+    enabled = models.BooleanField(default=True)
+    priority = models.PositiveSmallIntegerField(
+        default=0, help_text="Higher priorities are refreshed first."
+    )
+    refresh_interval = models.PositiveIntegerField(
+        default=300, help_text="Seconds between current-price refreshes."
+    )
+    auto_promoted = models.BooleanField(
+        default=False, help_text="Added automatically after frequent requests."
+    )
+    last_refreshed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "tracked_symbols"
+        ordering = ["-priority", "symbol"]
+
+    def __str__(self) -> str:
+        return f"{self.symbol} (every {self.refresh_interval}s)"
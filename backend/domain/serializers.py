@@ -1,8 +1,18 @@
 """Domain serializers - all API serialization in one place."""
 
+import csv
+import datetime
+import decimal
+import io
+import json
 from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
 
+from django.conf import settings
+from django.utils import timezone
 from rest_framework import serializers
+from rest_framework.settings import api_settings
+from shared import fastjson
 
 from .models import (
     AnalysisReport,
@@ -62,6 +72,107 @@ class PortfolioResultSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
 
+class PortfolioResultFastSerializer:
+    """
+    Fast-path list serializer for portfolio results.
+
+    Consumes ``PortfolioResult.objects.derived_values(*FIELDS)`` rows (the
+    boolean/risk fields are computed in SQL) and produces exactly the same
+    representation as ``PortfolioResultSerializer(many=True)``, without
+    building model instances or running DRF fields per row.
+
+    ``roi_percentage`` is still derived in Python from the row's Decimals so
+    rounding stays identical to the model property.
+    """
+
+    FIELDS = [
+        "id",
+        "symbol",
+        "investment",
+        "number_coins",
+        "profit",
+        "growth_factor",
+        "lambos",
+        "is_profitable",
+        "can_buy_lambo",
+        "risk_level",
+        "generation_date",
+    ]
+    OUTPUT_FIELDS = PortfolioResultSerializer.Meta.fields
+    ROI_FIELD = serializers.DecimalField(max_digits=10, decimal_places=2)
+
+    def __init__(self, rows: Iterable[Dict[str, Any]]):
+        self.rows = rows
+        self._tz = timezone.get_current_timezone()
+        self._coerce = api_settings.COERCE_DECIMAL_TO_STRING
+        self._formats = {
+            name: self._quantize_args(PortfolioResult._meta.get_field(name))
+            for name in (
+                "investment",
+                "number_coins",
+                "profit",
+                "growth_factor",
+                "lambos",
+            )
+        }
+        self._formats["roi_percentage"] = self._quantize_args(self.ROI_FIELD)
+
+    @staticmethod
+    def _quantize_args(field):
+        """(exponent, context) pair matching DRF's DecimalField.quantize."""
+        context = decimal.getcontext().copy()
+        context.prec = field.max_digits
+        return Decimal(".1") ** field.decimal_places, context
+
+    def to_representation(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        # Hot loop: quantize/format inline rather than through helper calls.
+        formats = self._formats
+        investment = row["investment"]
+        profit = row["profit"]
+        roi = Decimal("0") if investment == 0 else (profit / investment) * 100
+
+        values = {
+            "investment": investment,
+            "number_coins": row["number_coins"],
+            "profit": profit,
+            "growth_factor": row["growth_factor"],
+            "lambos": row["lambos"],
+            "roi_percentage": roi,
+        }
+        for name, (exponent, context) in formats.items():
+            quantized = values[name].quantize(exponent, context=context)
+            values[name] = format(quantized, "f") if self._coerce else quantized
+
+        generated = row["generation_date"]
+        if generated is not None:
+            generated = generated.astimezone(self._tz).isoformat()
+            if generated.endswith("+00:00"):
+                generated = generated[:-6] + "Z"
+
+        return {
+            "id": row["id"],
+            "symbol": row["symbol"],
+            "investment": values["investment"],
+            "number_coins": values["number_coins"],
+            "profit": values["profit"],
+            "growth_factor": values["growth_factor"],
+            "lambos": values["lambos"],
+            "roi_percentage": values["roi_percentage"],
+            "is_profitable": bool(row["is_profitable"]),
+            "can_buy_lambo": bool(row["can_buy_lambo"]),
+            "risk_level": row["risk_level"],
+            "generation_date": generated,
+        }
+
+    @property
+    def data(self) -> List[Dict[str, Any]]:
+        return [self.to_representation(row) for row in self.rows]
+
+    def render(self) -> bytes:
+        """JSON bytes identical to JSONRenderer's output for the same data."""
+        return fastjson.dumps(self.data)
+
+
 class PortfolioLogSerializer(serializers.ModelSerializer):
     """Serializer for portfolio logs."""
 
@@ -126,6 +237,136 @@ class AnalysisReportSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
 
+class ExportRequestSerializer(serializers.Serializer):
+    """Request serializer for streaming exports."""
+
+    # ``format`` is reserved by DRF for content negotiation.
+    output = serializers.ChoiceField(choices=["ndjson", "csv"], default="ndjson")
+    symbol = serializers.CharField(
+        max_length=10, min_length=2, required=False, help_text="Cryptocurrency symbol"
+    )
+    since = serializers.DateTimeField(
+        required=False, help_text="Inclusive start of the time range"
+    )
+    until = serializers.DateTimeField(
+        required=False, help_text="Exclusive end of the time range"
+    )
+
+    def validate_symbol(self, value: str) -> str:
+        """Uppercase and validate symbol."""
+        return value.upper().strip()
+
+
+class StreamingExportEncoder:
+    """
+    Encodes row dicts as NDJSON lines or CSV records, in batches.
+
+    Rows are pulled lazily from the iterator and written out every
+    ``BATCH_SIZE`` rows, so a StreamingHttpResponse can send the first
+    bytes before the whole query has been read.
+    """
+
+    BATCH_SIZE = 500
+    CONTENT_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+    def __init__(
+        self,
+        export_format: str,
+        fields: List[str],
+        represent: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+    ):
+        self.export_format = export_format
+        self.fields = fields
+        self.represent = represent or self.plain_representation
+
+    @property
+    def content_type(self) -> str:
+        return self.CONTENT_TYPES[self.export_format]
+
+    @staticmethod
+    def plain_representation(row: Dict[str, Any]) -> Dict[str, Any]:
+        """Represent Decimals and datetimes the way DRF does."""
+        data = {}
+        for key, value in row.items():
+            if isinstance(value, Decimal):
+                value = format(value, "f")
+            elif isinstance(value, datetime.datetime):
+                value = value.isoformat()
+                if value.endswith("+00:00"):
+                    value = value[:-6] + "Z"
+            data[key] = value
+        return data
+
+    def stream(self, rows: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+        if self.export_format == "csv":
+            return self._stream_csv(rows)
+        return self._stream_ndjson(rows)
+
+    def _stream_ndjson(self, rows: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+        batch = []
+        for row in rows:
+            batch.append(fastjson.dumps(self.represent(row)))
+            if len(batch) >= self.BATCH_SIZE:
+                yield b"\n".join(batch) + b"\n"
+                batch = []
+        if batch:
+            yield b"\n".join(batch) + b"\n"
+
+    def _stream_csv(self, rows: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        writer.writerow(self.fields)
+        yield self._drain(buffer)
+
+        pending = 0
+        for row in rows:
+            data = self.represent(row)
+            writer.writerow([self._csv_value(data[field]) for field in self.fields])
+            pending += 1
+            if pending >= self.BATCH_SIZE:
+                yield self._drain(buffer)
+                pending = 0
+        if pending:
+            yield self._drain(buffer)
+
+    @staticmethod
+    def _csv_value(value: Any) -> Any:
+        if isinstance(value, (dict, list)):
+            return json.dumps(value, separators=(",", ":"))
+        return value
+
+    @staticmethod
+    def _drain(buffer: io.StringIO) -> bytes:
+        content = buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate(0)
+        return content
+
+
+class BatchJobRequestSerializer(serializers.Serializer):
+    """Request serializer for batch jobs (items are validated by the task)."""
+
+    portfolios = serializers.ListField(
+        child=serializers.DictField(),
+        min_length=1,
+        max_length=settings.JOB_BATCH_MAX_ITEMS,
+        help_text='List of {"symbol": str, "investment": number} objects',
+    )
+
+
+class JobSerializer(serializers.Serializer):
+    """Job submission/status response serializer."""
+
+    task_id = serializers.CharField()
+    state = serializers.CharField(required=False)
+    status_url = serializers.URLField(required=False)
+    progress = serializers.DictField(required=False)
+    chunks = serializers.IntegerField(required=False)
+    result = serializers.JSONField(required=False)
+    error = serializers.CharField(required=False)
+
+
 class ErrorResponseSerializer(serializers.Serializer):
     """Error response serializer."""
 
@@ -1,31 +1,82 @@
 """Domain services - all business logic in one place."""
 
 import logging
+import threading
+import time
 from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
 from decimal import Decimal
-from typing import Any, Dict, List, Optional
+from functools import lru_cache
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+)
 
 import requests
-from django.core.cache import cache
-from django.db import transaction
+from celery.result import AsyncResult
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.db import DatabaseError, transaction
+from django.db.models import (
+    Count,
+    DecimalField,
+    ExpressionWrapper,
+    F,
+    Max,
+    Min,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+)
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from shared import instrumentation
+from shared.broadcast import get_broadcaster
 from shared.exceptions.custom_exceptions import (
     ExternalServiceError,
     NotFoundError,
     ValidationError,
 )
+from shared.http_cache import content_fingerprint
+from shared.ohlc import Candle, OHLCSeries
+from shared.query_budget import query_budget
+from shared.ring_buffer import RingBuffer
 
+from . import metrics
 from .models import (
     AnalysisReport,
     MarketPrice,
+    MarketPriceDailyRollup,
     OpeningAverage,
+    PortfolioDailyRollup,
     PortfolioLog,
     PortfolioResult,
+    PortfolioResultQuerySet,
     Prediction,
+    RollupWatermark,
+    TrackedSymbol,
 )
 
 logger = logging.getLogger(__name__)
 
 
+def _cache_get(key: str, family: str) -> Any:
+    """cache.get() that reports hit/miss for the key family."""
+    value = cache.get(key)
+    hit = value is not None
+    instrumentation.record_cache(family, hit)
+    metrics.record_cache_lookup(family, hit)
+    return value
+
+
 class KrakenClient:
     """
     Client for Kraken cryptocurrency exchange API.
@@ -34,25 +85,54 @@ class KrakenClient:
 
     BASE_URL = "https://api.kraken.com/0/public"
     TIMEOUT = 30
+    # OHLC rows are [time, open, high, low, close, vwap, volume, count].
+    OHLC_LAYOUT = {
+        "timestamp": (0, "q", int),
+        "open": (1, "d", float),
+        "high": (2, "d", float),
+        "low": (3, "d", float),
+        "close": (4, "d", float),
+        "volume": (6, "d", float),
+    }
+    # Minutes per candle for the latest price. Snapshots are upserted per
+    # candle, so this is also the resolution of the stored price history.
+    LATEST_CANDLE_INTERVAL = 1
+
+    def __init__(self, base_url: Optional[str] = None):
+        # KRAKEN_BASE_URL points the client at a stub server for load tests.
+        base_url = base_url or settings.KRAKEN_BASE_URL or self.BASE_URL
+        self.base_url = base_url.rstrip("/")
 
     def get_historical_ohlc(
-        self, symbol: str, days: int = 30, interval: int = 21600  # 6 hours
-    ) -> Optional[List[Dict]]:
-        """Get historical OHLC data."""
+        self, symbol: str, days: int = 30, interval: int = 360
+    ) -> Optional[OHLCSeries]:
+        """
+        Get historical OHLC data.
+
+        ``interval`` is the candle length in minutes, as Kraken expects
+        (1, 5, 15, 30, 60, 240, 1440, 10080 or 21600); the default gives
+        6-hour candles.
+
+        Candles are parsed lazily: see ``shared.ohlc`` for the series and
+        its dict-compatible candles.
+        """
         try:
             # Calculate timestamp
             since = int((datetime.now() - timedelta(days=days)).timestamp())
 
-            url = f"{self.BASE_URL}/OHLC"
+            url = f"{self.base_url}/OHLC"
             params = {"pair": f"{symbol}USD", "interval": interval, "since": since}
 
-            response = requests.get(url, params=params, timeout=self.TIMEOUT)
+            with instrumentation.track_upstream("kraken"):
+                with metrics.KRAKEN_REQUEST_SECONDS.labels("OHLC").time():
+                    response = requests.get(url, params=params, timeout=self.TIMEOUT)
             response.raise_for_status()
 
             data = response.json()
 
             if "error" in data and data["error"]:
                 logger.error("Kraken API error: %s", data["error"])
+                metrics.KRAKEN_ERRORS.labels("OHLC", "api").inc()
                 return None
 
             if "result" not in data:
@@ -64,42 +144,39 @@ class KrakenClient:
                 return None
 
             ohlc_key = result_keys[0]
-            ohlc_data = data["result"][ohlc_key]
-
-            parsed = []
-            for candle in ohlc_data:
-                parsed.append(
-                    {
-                        "timestamp": candle[0],
-                        "open": float(candle[1]),
-                        "high": float(candle[2]),
-                        "low": float(candle[3]),
-                        "close": float(candle[4]),
-                        "volume": float(candle[6]),
-                    }
-                )
-
-            return parsed
+            return OHLCSeries(data["result"][ohlc_key], self.OHLC_LAYOUT)
 
         except requests.RequestException as e:
             logger.error("Kraken API request failed: %s", str(e))
+            metrics.KRAKEN_ERRORS.labels("OHLC", "request").inc()
             return None
         except Exception as e:
             logger.error("Error parsing Kraken response: %s", str(e))
+            metrics.KRAKEN_ERRORS.labels("OHLC", "parse").inc()
             return None
 
-    def get_current_price(self, symbol: str) -> Optional[float]:
-        """Get current price for symbol."""
+    def get_latest_candle(self, symbol: str) -> Optional[Candle]:
+        """Get the most recent (possibly still forming) OHLC candle."""
         try:
-            # Use recent OHLC data
-            data = self.get_historical_ohlc(symbol, days=1)
+            data = self.get_historical_ohlc(
+                symbol, days=1, interval=self.LATEST_CANDLE_INTERVAL
+            )
             if not data:
                 return None
+            return data[-1]
+
+        except Exception as e:
+            logger.error("Error getting latest candle: %s", str(e))
+            return None
 
-            # Get most recent close price
-            return data[-1]["close"]
+    def get_current_price(self, symbol: str) -> Optional[float]:
+        """Get current price for symbol (latest candle close)."""
+        try:
+            candle = self.get_latest_candle(symbol)
+            return candle["close"] if candle else None
 
         except Exception as e:
+            # Candles convert on access: a malformed close raises here.
             logger.error("Error getting current price: %s", str(e))
             return None
 
@@ -109,6 +186,203 @@ class KrakenClient:
         return data is not None and len(data) > 0
 
 
+@lru_cache(maxsize=None)
+def _market_price_fields() -> List[str]:
+    """MarketPrice column attnames in model order, as from_db() expects."""
+    return [field.attname for field in MarketPrice._meta.concrete_fields]
+
+
+class _BufferedSymbol:
+    __slots__ = ("ring", "version")
+
+    def __init__(self, ring: RingBuffer, version: Tuple[int, int]):
+        self.ring = ring
+        self.version = version
+
+
+class PriceHistoryBuffer:
+    """
+    Per-process ring buffers of the latest price snapshots of tracked symbols.
+
+    Rows are kept as (id, timestamp µs, price, volume) in typed arrays, with
+    prices and volumes as integers scaled by 1e8 so the Decimal values round
+    trip exactly, and are served as MarketPrice instances (without
+    candle_timestamp and updated_at, which are not buffered). A buffer
+    is loaded from the database on first use and then updated in place as
+    this process ingests prices.
+
+    Other processes ingest too: each ingest bumps a per-symbol version in
+    the shared cache, and a buffer whose version is behind is reloaded
+    before it is read. ``invalidate()`` bumps a global epoch instead, for
+    bulk deletes.
+    """
+
+    COLUMNS = {"id": "q", "timestamp": "q", "price": "q", "volume": "q"}
+    NO_VOLUME = -1
+    EPOCH_KEY = "price_buffer:epoch"
+    EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+    _buffers: Dict[str, _BufferedSymbol] = {}
+    _lock = threading.Lock()
+
+    @property
+    def capacity(self) -> int:
+        return settings.PRICE_BUFFER_SIZE
+
+    @classmethod
+    def invalidate(cls) -> None:
+        """Make every process reload its buffers (after bulk deletes)."""
+        shared = caches["shared"]
+        shared.add(cls.EPOCH_KEY, 0, timeout=None)
+        shared.incr(cls.EPOCH_KEY)
+
+    @classmethod
+    def clear(cls) -> None:
+        """Drop this process's buffers."""
+        with cls._lock:
+            cls._buffers.clear()
+
+    def history(self, symbol: str, limit: int) -> Optional[List[MarketPrice]]:
+        """Latest ``limit`` snapshots, or None when the buffer cannot serve them."""
+        rows = self._rows(symbol, limit)
+        if rows is None:
+            return None
+        return [self._snapshot(symbol, row) for row in rows]
+
+    def history_version(self, symbol: str, limit: int) -> Optional[str]:
+        """Fingerprint of the rows ``history()`` serves, or None (see there)."""
+        rows = self._rows(symbol, limit)
+        return None if rows is None else content_fingerprint(rows)
+
+    def _rows(self, symbol: str, limit: int) -> Optional[List[Tuple]]:
+        if not 0 < limit <= self.capacity or symbol not in SymbolRegistry().symbols():
+            return None
+
+        version = self._version(symbol)
+        with self._lock:
+            entry = self._buffers.get(symbol)
+            rows = (
+                entry.ring.latest(limit) if entry and entry.version == version else None
+            )
+        if rows is None:
+            rows = self._load(symbol, version).ring.latest(limit)
+        return rows
+
+    def record(self, symbol: str, snapshots: List[MarketPrice]) -> None:
+        """Apply freshly ingested snapshots to this process's buffer."""
+        shared = caches["shared"]
+        key = self._version_key(symbol)
+        shared.add(key, 0, timeout=None)
+        counter = shared.incr(key)
+        epoch = shared.get(self.EPOCH_KEY, 0)
+
+        with self._lock:
+            entry = self._buffers.get(symbol)
+            if entry is None:
+                return
+            if entry.version != (epoch, counter - 1) or not self._apply(
+                entry.ring, snapshots
+            ):
+                # Another process wrote in between; reload on the next read.
+                del self._buffers[symbol]
+                return
+            entry.version = (epoch, counter)
+
+    def _apply(self, ring: RingBuffer, snapshots: List[MarketPrice]) -> bool:
+        newest = ring.latest(1)
+        newest_id = newest[0][0] if newest else 0
+        for snapshot in snapshots:
+            if snapshot.pk is None:
+                return False
+            age = ring.find("id", snapshot.pk)
+            try:
+                if age is not None:
+                    # Upserted row: it keeps its first-seen timestamp.
+                    timestamp = ring.get(age)[1]
+                    ring.replace(age, self._row(snapshot, timestamp))
+                elif snapshot.pk > newest_id:
+                    ring.append(self._row(snapshot))
+                    newest_id = snapshot.pk
+                # else: an update of a row older than the buffer.
+            except OverflowError:
+                return False
+        return True
+
+    def _load(self, symbol: str, version: Tuple[int, int]) -> _BufferedSymbol:
+        rows = (
+            MarketPrice.objects.filter(symbol=symbol)
+            .order_by("-timestamp", "-id")
+            .values_list("id", "timestamp", "price", "volume")[: self.capacity]
+        )
+        ring = RingBuffer(self.capacity, self.COLUMNS)
+        try:
+            for pk, timestamp, price, volume in reversed(rows):
+                ring.append(
+                    (
+                        pk,
+                        self._micros(timestamp),
+                        self._scaled(price),
+                        self.NO_VOLUME if volume is None else self._scaled(volume),
+                    )
+                )
+        except OverflowError:
+            # Values beyond the int64 range: serve this symbol from the DB.
+            ring.clear()
+            version = (-1, -1)
+        entry = _BufferedSymbol(ring, version)
+        with self._lock:
+            self._buffers[symbol] = entry
+        return entry
+
+    def _version(self, symbol: str) -> Tuple[int, int]:
+        values = caches["shared"].get_many([self.EPOCH_KEY, self._version_key(symbol)])
+        return (
+            values.get(self.EPOCH_KEY, 0),
+            values.get(self._version_key(symbol), 0),
+        )
+
+    @staticmethod
+    def _version_key(symbol: str) -> str:
+        return f"price_buffer:{symbol}"
+
+    def _row(self, snapshot: MarketPrice, timestamp: Optional[int] = None) -> Tuple:
+        return (
+            snapshot.pk,
+            self._micros(snapshot.timestamp) if timestamp is None else timestamp,
+            self._scaled(snapshot.price),
+            (
+                self.NO_VOLUME
+                if snapshot.volume is None
+                else self._scaled(snapshot.volume)
+            ),
+        )
+
+    def _snapshot(self, symbol: str, row: Tuple) -> MarketPrice:
+        pk, micros, price, volume = row
+        values = {
+            "id": pk,
+            "symbol": symbol,
+            "price": Decimal(price).scaleb(-8),
+            "volume": None if volume == self.NO_VOLUME else Decimal(volume).scaleb(-8),
+            "timestamp": self.EPOCH + timedelta(microseconds=micros),
+        }
+        # from_db() skips the keyword matching of Model(**kwargs) and is about
+        # twice as fast; unbuffered fields are None.
+        field_names = _market_price_fields()
+        return MarketPrice.from_db(
+            "default", field_names, [values.get(name) for name in field_names]
+        )
+
+    def _micros(self, timestamp: datetime) -> int:
+        delta = timestamp - self.EPOCH
+        return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+    @staticmethod
+    def _scaled(value: Decimal) -> int:
+        # Same rounding as the DecimalField(decimal_places=8) column.
+        return int(Decimal(value).scaleb(8).to_integral_value())
+
+
 class MarketDataService:
     """Service for fetching and managing market data."""
 
@@ -117,6 +391,7 @@ class MarketDataService:
 
     def __init__(self, client: Optional[KrakenClient] = None):
         self.client = client or KrakenClient()
+        self.history_buffer = PriceHistoryBuffer()
 
     def get_opening_average(self, symbol: str) -> Optional[Decimal]:
         """
@@ -132,7 +407,7 @@ class MarketDataService:
         cache_key = f"opening_avg:{symbol}"
 
         # Try cache
-        cached = cache.get(cache_key)
+        cached = _cache_get(cache_key, "opening_avg")
         if cached is not None:
             logger.debug("Cache hit: opening average for %s", symbol)
             return Decimal(str(cached))
@@ -177,40 +452,264 @@ class MarketDataService:
         cache_key = f"current_price:{symbol}"
 
         # Try cache
-        cached = cache.get(cache_key)
+        cached = _cache_get(cache_key, "current_price")
         if cached is not None:
             logger.debug("Cache hit: current price for %s", symbol)
             return Decimal(str(cached))
 
-        # Fetch from API
+        return self.refresh_current_price(symbol)
+
+    def refresh_current_price(self, symbol: str) -> Optional[Decimal]:
+        """Fetch the current price from the API, bypassing the cache."""
+        symbol = symbol.upper()
+        cache_key = f"current_price:{symbol}"
+
         try:
-            price = self.client.get_current_price(symbol)
-            if price is None:
+            candle = self.client.get_latest_candle(symbol)
+            if candle is None:
                 logger.warning("No current price for %s", symbol)
                 return None
 
-            price_decimal = Decimal(str(price))
-
-            # Store snapshot in database
-            MarketPrice.objects.create(symbol=symbol, price=price_decimal)
+            # Store snapshot in database (one row per candle)
+            [snapshot] = self.ingest_candles(symbol, [candle])
+            price_decimal = snapshot.price
 
             # Cache it
             cache.set(cache_key, str(price_decimal), self.CACHE_TTL_CURRENT)
 
+            # Push to streaming subscribers
+            self._publish_price(snapshot)
+
             return price_decimal
 
         except Exception as e:
             logger.error("Error fetching current price: %s", e)
             raise ExternalServiceError(f"Failed to get current price for {symbol}")
 
+    def ingest_candles(
+        self, symbol: str, candles: Iterable[Mapping[str, Any]]
+    ) -> List[MarketPrice]:
+        """
+        Upsert price snapshots from OHLC candles in one statement.
+
+        Rows are keyed on (symbol, candle open time): a candle seen again
+        (e.g. the still-forming latest one) overwrites its close price and
+        volume, so the table grows with distinct candles rather than with
+        fetch frequency. Returns the snapshots in input order.
+        """
+        symbol = symbol.upper()
+        if isinstance(candles, OHLCSeries):
+            # Whole typed columns: no per-candle lookups for long backfills.
+            values = zip(
+                candles.column("close"),
+                candles.column("volume"),
+                candles.column("timestamp"),
+            )
+        else:
+            values = (
+                (candle["close"], candle["volume"], candle["timestamp"])
+                for candle in candles
+            )
+        snapshots = [
+            MarketPrice(
+                symbol=symbol,
+                price=Decimal(str(close)),
+                volume=Decimal(str(volume)),
+                candle_timestamp=datetime.fromtimestamp(
+                    int(timestamp), tz=dt_timezone.utc
+                ),
+            )
+            for close, volume, timestamp in values
+        ]
+        if snapshots:
+            MarketPrice.objects.bulk_create(
+                snapshots,
+                update_conflicts=True,
+                unique_fields=["symbol", "candle_timestamp"],
+                update_fields=["price", "volume", "updated_at"],
+            )
+            self.history_buffer.record(symbol, snapshots)
+        return snapshots
+
+    def _publish_price(self, snapshot: MarketPrice) -> None:
+        """Broadcast a fresh price; streaming must never break price fetches."""
+        try:
+            get_broadcaster().publish(
+                "prices",
+                {
+                    "symbol": snapshot.symbol,
+                    "price": str(snapshot.price),
+                    "timestamp": snapshot.updated_at.isoformat(),
+                },
+            )
+        except Exception as e:  # noqa: BLE001
+            logger.warning("Failed to broadcast price for %s: %s", snapshot.symbol, e)
+
     def get_price_history(self, symbol: str, limit: int = 100) -> List[MarketPrice]:
-        """Get historical price snapshots."""
+        """Get historical price snapshots (recent ones from the ring buffer)."""
+        symbol = symbol.upper()
+        history = self.history_buffer.history(symbol, limit)
+        if history is not None:
+            return history
         return list(
-            MarketPrice.objects.filter(symbol=symbol.upper()).order_by("-timestamp")[
-                :limit
-            ]
+            MarketPrice.objects.filter(symbol=symbol).order_by("-timestamp")[:limit]
         )
 
+    def peek_current_price(self, symbol: str) -> Optional[str]:
+        """Cached current price, without touching the database or API."""
+        return _cache_get(f"current_price:{symbol.upper().strip()}", "current_price")
+
+    def peek_opening_average(self, symbol: str) -> Optional[str]:
+        """Cached opening average, without touching the database or API."""
+        return _cache_get(f"opening_avg:{symbol.upper().strip()}", "opening_avg")
+
+    def get_price_history_version(
+        self, symbol: str, limit: Optional[int] = None
+    ) -> str:
+        """
+        Cheap version stamp of a symbol's latest ``limit`` snapshots.
+
+        Windows the ring buffer serves are stamped from the buffered rows
+        without querying; others from the id range and last update.
+        """
+        symbol = symbol.upper()
+        if limit is not None:
+            buffered = self.history_buffer.history_version(symbol, limit)
+            if buffered is not None:
+                return f"buffer-{buffered}"
+        bounds = MarketPrice.objects.filter(symbol=symbol).aggregate(
+            low=Min("id"), high=Max("id"), updated=Max("updated_at")
+        )
+        updated = bounds["updated"].timestamp() if bounds["updated"] else 0
+        return f"{bounds['low'] or 0}-{bounds['high'] or 0}-{updated}"
+
+
+class SymbolRegistry:
+    """
+    Tracked symbols (``TrackedSymbol`` rows) and their refresh schedule.
+
+    Enabled entries are kept in a per-process snapshot for
+    SYMBOL_REGISTRY_TTL seconds, so hot paths do not query the table.
+    ``process_request`` calls are counted per symbol in the shared cache;
+    a symbol reaching SYMBOL_PROMOTION_THRESHOLD calls within
+    SYMBOL_PROMOTION_WINDOW is added to the registry, and tracked symbols
+    that busy are refreshed at least every SYMBOL_HOT_REFRESH_INTERVAL.
+    """
+
+    _snapshot: Optional[Tuple[float, List[TrackedSymbol]]] = None
+
+    def __init__(self, market_service: Optional[MarketDataService] = None):
+        self.market_service = market_service
+
+    @classmethod
+    def invalidate(cls) -> None:
+        """Drop this process's snapshot (after registry edits)."""
+        cls._snapshot = None
+
+    def entries(self) -> List[TrackedSymbol]:
+        """Enabled entries, highest priority first."""
+        snapshot = SymbolRegistry._snapshot
+        now = time.monotonic()
+        if snapshot is None or snapshot[0] <= now:
+            entries = list(TrackedSymbol.objects.filter(enabled=True))
+            snapshot = (now + settings.SYMBOL_REGISTRY_TTL, entries)
+            SymbolRegistry._snapshot = snapshot
+        return snapshot[1]
+
+    def symbols(self) -> List[str]:
+        return [entry.symbol for entry in self.entries()]
+
+    def record_request(self, symbol: str) -> bool:
+        """Count a calculation for ``symbol``; True if it got promoted."""
+        symbol = symbol.upper().strip()
+        window = settings.SYMBOL_PROMOTION_WINDOW
+        key = self._hits_key(symbol, int(time.time() // window))
+        shared = caches["shared"]
+        shared.add(key, 0, timeout=window * 2)
+        try:
+            hits = shared.incr(key)
+        except ValueError:  # expired between add() and incr()
+            shared.set(key, 1, timeout=window * 2)
+            hits = 1
+
+        # Only the call that crosses the threshold looks at the registry.
+        if hits != settings.SYMBOL_PROMOTION_THRESHOLD:
+            return False
+        # get_or_create never re-enables a symbol an admin switched off.
+        _, created = TrackedSymbol.objects.get_or_create(
+            symbol=symbol, defaults={"auto_promoted": True}
+        )
+        if created:
+            self.invalidate()
+            logger.info(
+                "Auto-promoted %s to tracked symbols (%d requests)", symbol, hits
+            )
+        return created
+
+    def hits(self, symbols: List[str]) -> Dict[str, int]:
+        """Calculations per symbol in the current promotion window."""
+        window = int(time.time() // settings.SYMBOL_PROMOTION_WINDOW)
+        keys = {self._hits_key(symbol, window): symbol for symbol in symbols}
+        counts = caches["shared"].get_many(list(keys))
+        return {keys[key]: count for key, count in counts.items()}
+
+    def due(self) -> List[TrackedSymbol]:
+        """Enabled entries due for a price refresh, most urgent first."""
+        now = timezone.now()
+        entries = list(TrackedSymbol.objects.filter(enabled=True))
+        hits = self.hits([entry.symbol for entry in entries])
+        threshold = settings.SYMBOL_PROMOTION_THRESHOLD
+        hot_interval = settings.SYMBOL_HOT_REFRESH_INTERVAL
+
+        due = []
+        for entry in entries:
+            interval = entry.refresh_interval
+            if hits.get(entry.symbol, 0) >= threshold:
+                interval = min(interval, hot_interval)
+            last = entry.last_refreshed_at
+            if last is None or (now - last).total_seconds() >= interval:
+                due.append(entry)
+        due.sort(key=lambda e: (-e.priority, -hits.get(e.symbol, 0), e.symbol))
+        return due
+
+    def refresh_due(self, budget: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Refresh current prices of due symbols, at most ``budget`` API calls.
+
+        Symbols over budget are reported as ``deferred`` and stay due.
+        """
+        if budget is None:
+            budget = settings.SYMBOL_REFRESH_BUDGET
+        market_service = self.market_service or MarketDataService()
+        due = self.due()
+
+        refreshed, failed = [], {}
+        for entry in due[:budget]:
+            try:
+                price = market_service.refresh_current_price(entry.symbol)
+            except ExternalServiceError as e:
+                failed[entry.symbol] = str(e)
+                continue
+            if price is None:
+                failed[entry.symbol] = "No price returned"
+            else:
+                refreshed.append(entry.symbol)
+
+        if refreshed:
+            TrackedSymbol.objects.filter(symbol__in=refreshed).update(
+                last_refreshed_at=timezone.now()
+            )
+        return {
+            "due": len(due),
+            "refreshed": refreshed,
+            "failed": failed,
+            "deferred": [entry.symbol for entry in due[budget:]],
+        }
+
+    @staticmethod
+    def _hits_key(symbol: str, window: int) -> str:
+        return f"symbol_hits:{symbol}:{window}"
+
 
 class PortfolioCalculator:
     """
@@ -259,6 +758,43 @@ class PortfolioCalculator:
             "lambos": lambos,
         }
 
+    def calculate_many(
+        self,
+        investments: List[Decimal],
+        opening_price: Decimal,
+        current_price: Decimal,
+    ) -> List[Dict[str, Decimal]]:
+        """
+        Calculate portfolio metrics for many investments at the same prices.
+
+        Gives the same results as ``calculate`` for each investment, but the
+        prices are validated once and lookups are hoisted out of the loop.
+        """
+        if opening_price <= 0:
+            raise ValidationError("Opening price must be positive")
+        if current_price <= 0:
+            raise ValidationError("Current price must be positive")
+
+        validate = self.validate_investment
+        lambo_price = self.LAMBO_PRICE
+        zero = Decimal("0")
+        rows = []
+        append = rows.append
+        for investment in investments:
+            validate(investment)
+            number_coins = investment / opening_price
+            current_value = number_coins * current_price
+            profit = current_value - investment
+            append(
+                {
+                    "number_coins": number_coins,
+                    "profit": profit,
+                    "growth_factor": (current_value / investment) - 1,
+                    "lambos": profit / lambo_price if profit > 0 else zero,
+                }
+            )
+        return rows
+
 
 class PortfolioService:
     """
@@ -266,6 +802,9 @@ class PortfolioService:
     This is the primary service for the process_request endpoint.
     """
 
+    CACHE_TTL_RESULT = 300  # results are immutable once written
+    BATCH_CHUNK_SIZE = 1000  # results per bulk insert in process_batch
+
     def __init__(
         self,
         market_service: Optional[MarketDataService] = None,
@@ -274,8 +813,10 @@ class PortfolioService:
         """Initialize with dependencies."""
         self.market_service = market_service or MarketDataService()
         self.calculator = calculator or PortfolioCalculator()
+        self.registry = SymbolRegistry(self.market_service)
 
     @transaction.atomic
+    @query_budget(max_queries=8)
     def process_request(self, symbol: str, investment: Decimal) -> PortfolioResult:
         """
         Main DWML endpoint logic - calculate portfolio value.
@@ -307,23 +848,27 @@ class PortfolioService:
 
         try:
             # Get price data
-            opening_price = self.market_service.get_opening_average(symbol)
-            current_price = self.market_service.get_current_price(symbol)
+            with metrics.time_phase("opening_average"):
+                opening_price = self.market_service.get_opening_average(symbol)
+            with metrics.time_phase("current_price"):
+                current_price = self.market_service.get_current_price(symbol)
 
             if opening_price is None or current_price is None:
                 raise NotFoundError(f"Price data not available for {symbol}")
 
             # Calculate using domain service
-            metrics = self.calculator.calculate(
-                investment=investment,
-                opening_price=opening_price,
-                current_price=current_price,
-            )
+            with metrics.time_phase("calculate"):
+                calculated = self.calculator.calculate(
+                    investment=investment,
+                    opening_price=opening_price,
+                    current_price=current_price,
+                )
 
             # Create result entity
-            result = PortfolioResult.objects.create(
-                symbol=symbol, investment=investment, **metrics
-            )
+            with metrics.time_phase("persist"):
+                result = PortfolioResult.objects.create(
+                    symbol=symbol, investment=investment, **calculated
+                )
 
             # Log success
             self._create_log(
@@ -340,6 +885,8 @@ class PortfolioService:
                 result.roi_percentage,
             )
 
+            self._record_symbol_request(symbol)
+
             return result
 
         except (ValidationError, NotFoundError):
@@ -356,6 +903,183 @@ class PortfolioService:
             logger.exception("Unexpected error processing request: %s", symbol)
             raise
 
+    def resolve_prices(
+        self, symbols: Iterable[str]
+    ) -> Tuple[Dict[str, Tuple[Decimal, Decimal]], Dict[str, str]]:
+        """
+        Opening and current price per symbol, looked up once each.
+
+        Returns ``(prices, errors)``; symbols without price data are in
+        ``errors`` with the reason.
+        """
+        prices: Dict[str, Tuple[Decimal, Decimal]] = {}
+        errors: Dict[str, str] = {}
+        for symbol in sorted(set(symbols)):
+            try:
+                opening_price = self.market_service.get_opening_average(symbol)
+                current_price = self.market_service.get_current_price(symbol)
+            except ExternalServiceError as e:
+                errors[symbol] = str(e)
+                continue
+            if opening_price is None or current_price is None:
+                errors[symbol] = f"Price data not available for {symbol}"
+                continue
+            prices[symbol] = (opening_price, current_price)
+        return prices, errors
+
+    @staticmethod
+    def batch_symbols(configs: List[Dict[str, Any]]) -> set:
+        """Normalized symbols referenced by batch configs."""
+        return {
+            str(config["symbol"]).upper().strip()
+            for config in configs
+            if isinstance(config, dict) and config.get("symbol")
+        }
+
+    def process_batch(
+        self,
+        configs: List[Dict[str, Any]],
+        prices: Optional[Dict[str, Tuple[Decimal, Decimal]]] = None,
+        price_errors: Optional[Dict[str, str]] = None,
+        offset: int = 0,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Calculate and store many portfolios (backtests, bulk jobs).
+
+        Configs are grouped by symbol, prices are resolved once per symbol
+        (or taken from ``prices``/``price_errors``), and results are
+        calculated and bulk-inserted ``BATCH_CHUNK_SIZE`` at a time, each
+        chunk in its own transaction with one audit log per chunk.
+        ``on_progress(done, processed)`` is called after every chunk.
+
+        Invalid configs, and the items of a chunk whose insert fails, are
+        reported per item instead of failing the batch.
+        Entries in ``results`` and ``error_details`` carry the config's
+        ``index`` (plus ``offset``) and are returned in input order.
+        """
+        results: List[Dict[str, Any]] = []
+        errors: List[Dict[str, Any]] = []
+        groups = self._group_batch(configs, offset, errors)
+
+        if prices is None:
+            prices, price_errors = self.resolve_prices(groups)
+        price_errors = price_errors or {}
+
+        done = len(errors)
+        chunk_size = self.BATCH_CHUNK_SIZE
+        for symbol, items in groups.items():
+            if symbol not in prices:
+                reason = price_errors.get(
+                    symbol, f"Price data not available for {symbol}"
+                )
+                errors.extend(
+                    self._batch_error(index, configs[index - offset], reason)
+                    for index, _ in items
+                )
+                done += len(items)
+                continue
+
+            opening_price, current_price = prices[symbol]
+            for start in range(0, len(items), chunk_size):
+                chunk = items[start : start + chunk_size]
+                try:
+                    stored = self._store_batch_chunk(
+                        symbol, chunk, opening_price, current_price
+                    )
+                except DatabaseError as e:
+                    # Only this chunk rolled back; report it and carry on.
+                    logger.error("Batch chunk for %s failed: %s", symbol, e)
+                    reason = f"Failed to store result: {e}"
+                    errors.extend(
+                        self._batch_error(index, configs[index - offset], reason)
+                        for index, _ in chunk
+                    )
+                else:
+                    results.extend(stored)
+                done += len(chunk)
+                if on_progress is not None:
+                    on_progress(done, len(results))
+
+        results.sort(key=lambda row: row["index"])
+        errors.sort(key=lambda row: row["index"])
+        return {
+            "total": len(configs),
+            "processed": len(results),
+            "errors": len(errors),
+            "error_details": errors,
+            "results": results,
+        }
+
+    def _group_batch(
+        self, configs: List[Dict[str, Any]], offset: int, errors: List[Dict]
+    ) -> Dict[str, List[Tuple[int, Decimal]]]:
+        """Valid (index, investment) pairs by symbol; invalid configs to errors."""
+        groups: Dict[str, List[Tuple[int, Decimal]]] = {}
+        for index, config in enumerate(configs, start=offset):
+            try:
+                symbol = str(config["symbol"]).upper().strip()
+                investment = Decimal(str(config["investment"]))
+                self.calculator.validate_investment(investment)
+            except ValidationError as e:
+                errors.append(self._batch_error(index, config, str(e)))
+            except (KeyError, TypeError, ArithmeticError) as e:
+                reason = f"Invalid portfolio config: {e!r}"
+                errors.append(self._batch_error(index, config, reason))
+            else:
+                groups.setdefault(symbol, []).append((index, investment))
+        return groups
+
+    @staticmethod
+    def _batch_error(index: int, config: Any, reason: str) -> Dict[str, Any]:
+        fields = config if isinstance(config, dict) else {}
+        return {
+            "index": index,
+            "symbol": fields.get("symbol"),
+            "investment": fields.get("investment"),
+            "error": reason,
+        }
+
+    @transaction.atomic
+    def _store_batch_chunk(
+        self,
+        symbol: str,
+        chunk: List[Tuple[int, Decimal]],
+        opening_price: Decimal,
+        current_price: Decimal,
+    ) -> List[Dict[str, Any]]:
+        investments = [investment for _, investment in chunk]
+        calculated = self.calculator.calculate_many(
+            investments, opening_price, current_price
+        )
+        created = PortfolioResult.objects.bulk_create(
+            [
+                PortfolioResult(symbol=symbol, investment=investment, **values)
+                for investment, values in zip(investments, calculated)
+            ],
+            batch_size=self.BATCH_CHUNK_SIZE,
+        )
+        self._create_log(
+            symbol,
+            "batch_processed",
+            "INFO",
+            {
+                "count": len(created),
+                "first_result_id": str(created[0].id),
+                "last_result_id": str(created[-1].id),
+            },
+        )
+        return [
+            {
+                "index": index,
+                "symbol": symbol,
+                "result_id": result.id,
+                "profit": float(result.profit),
+                "status": "success",
+            }
+            for (index, _), result in zip(chunk, created)
+        ]
+
     def get_results(
         self, symbol: Optional[str] = None, limit: int = 100
     ) -> List[PortfolioResult]:
@@ -367,12 +1091,84 @@ class PortfolioService:
 
         return list(queryset[:limit])
 
+    def get_result_rows(
+        self,
+        fields: List[str],
+        symbol: Optional[str] = None,
+        limit: int = 100,
+        risk_level: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Get portfolio results as plain rows with derived fields from SQL."""
+        queryset = self._results(symbol, risk_level)
+        return list(queryset.derived_values(*fields)[:limit])
+
+    def get_results_version(
+        self, symbol: Optional[str] = None, risk_level: Optional[str] = None
+    ) -> str:
+        """Cheap version stamp of the result list (row count, max id, last update)."""
+        queryset = self._results(symbol, risk_level)
+        bounds = queryset.aggregate(
+            count=Count("id"), high=Max("id"), updated=Max("updated_at")
+        )
+        updated = bounds["updated"].timestamp() if bounds["updated"] else 0
+        return f"{bounds['count']}-{bounds['high'] or 0}-{updated}"
+
+    @staticmethod
+    def _results(symbol: Optional[str], risk_level: Optional[str]):
+        queryset = PortfolioResult.objects.all()
+        if symbol:
+            queryset = queryset.filter(symbol=symbol.upper())
+        if risk_level:
+            try:
+                queryset = queryset.filter_derived(risk_level=risk_level.upper())
+            except ValueError:
+                raise ValidationError("risk_level must be one of LOW, MEDIUM, HIGH")
+        return queryset
+
+    def get_result_version(self, result_id: int) -> Optional[str]:
+        """Version stamp of a single result, or None if it does not exist."""
+        # Plain cache.get(): get_result() reports the lookup for this request.
+        cached = cache.get(self.result_cache_key(result_id))
+        if cached is not None:
+            generated = cached.generation_date
+        else:
+            generated = (
+                PortfolioResult.objects.filter(id=result_id)
+                .values_list("generation_date", flat=True)
+                .first()
+            )
+        if generated is None:
+            return None
+        return f"{result_id}-{generated.timestamp()}"
+
     def get_result(self, result_id: int) -> PortfolioResult:
-        """Get specific portfolio result."""
+        """Get specific portfolio result (cached)."""
+        cache_key = self.result_cache_key(result_id)
+        cached = _cache_get(cache_key, "portfolio_result")
+        if cached is not None:
+            return cached
+
         try:
-            return PortfolioResult.objects.get(id=result_id)
+            result = PortfolioResult.objects.get(id=result_id)
         except PortfolioResult.DoesNotExist:
             raise NotFoundError(f"Portfolio result {result_id} not found")
+        cache.set(cache_key, result, self.CACHE_TTL_RESULT)
+        return result
+
+    @staticmethod
+    def result_cache_key(result_id: int) -> str:
+        return f"portfolio_result:{result_id}"
+
+    def invalidate_results(self, result_ids: Iterable[int]) -> None:
+        """Drop cached results after they are edited or deleted."""
+        cache.delete_many([self.result_cache_key(pk) for pk in result_ids])
+
+    def _record_symbol_request(self, symbol: str) -> None:
+        """Feed symbol auto-promotion; must never fail the calculation."""
+        try:
+            self.registry.record_request(symbol)
+        except Exception as e:  # noqa: BLE001
+            logger.warning("Failed to record request for %s: %s", symbol, e)
 
     def _create_log(
         self, symbol: str, action: str, level: str, metadata: Dict[str, Any]
@@ -386,6 +1182,309 @@ class PortfolioService:
             logger.error("Failed to create log: %s", e)
 
 
+class JobService:
+    """
+    Submit heavy calculations to Celery and report their progress.
+
+    Job states come from the Celery result backend; a batch split into
+    chunk tasks reports their combined progress until the merge finishes.
+    Status reads are cached
+    for JOB_STATUS_CACHE_TTL seconds while a job runs (so polling clients
+    share one backend read) and until the result expires once it finished.
+    """
+
+    FINAL_STATES = {"SUCCESS", "FAILURE", "REVOKED"}
+
+    def submit_portfolio(self, symbol: str, investment: Decimal) -> str:
+        """Enqueue one calculation; duplicates reuse the pending task."""
+        from .tasks import process_portfolio_async
+
+        result = process_portfolio_async.delay(
+            symbol=symbol, investment=float(investment)
+        )
+        return self._remember(result.id)
+
+    def submit_batch(self, configs: List[Dict[str, Any]]) -> str:
+        """Enqueue a batch; items are validated by the task."""
+        from .tasks import batch_process_portfolios_task
+
+        return self._remember(batch_process_portfolios_task.delay(configs).id)
+
+    def get_status(self, task_id: str) -> Dict[str, Any]:
+        """State, progress and result of a submitted job."""
+        cache_key = f"job_status:{task_id}"
+        cached = _cache_get(cache_key, "job_status")
+        if cached is not None:
+            return cached
+
+        if caches["shared"].get(self._submitted_key(task_id)) is None:
+            raise NotFoundError(f"Job {task_id} not found")
+
+        status = self._read_status(task_id)
+        if status["state"] in self.FINAL_STATES:
+            ttl = settings.CELERY_RESULT_EXPIRES
+        else:
+            ttl = settings.JOB_STATUS_CACHE_TTL
+        cache.set(cache_key, status, ttl)
+        return status
+
+    def _read_status(self, task_id: str) -> Dict[str, Any]:
+        result = AsyncResult(task_id)
+        state = result.state
+        info = result.info
+        status: Dict[str, Any] = {"task_id": task_id, "state": state}
+
+        if state == "PROGRESS":
+            status["progress"] = info
+        elif state == "SUCCESS":
+            if isinstance(info, dict) and info.get("status") == "dispatched":
+                self._read_dispatched(status, info)
+            else:
+                status["result"] = info
+        elif state == "FAILURE":
+            status["error"] = str(info)
+        return status
+
+    def _read_dispatched(self, status: Dict[str, Any], info: Dict[str, Any]) -> None:
+        # Large batches finish in a chord; report the merged result, or the
+        # chunks' combined progress while the merge is still pending.
+        merged = self._read_status(info["result_id"])
+        status.update(state=merged["state"], chunks=info["chunks"])
+        for field in ("result", "error"):
+            if field in merged:
+                status[field] = merged[field]
+        if merged["state"] not in self.FINAL_STATES and info.get("chunk_ids"):
+            status.update(
+                state="PROGRESS",
+                progress=self._chunk_progress(info["chunk_ids"], info["total"]),
+            )
+
+    @staticmethod
+    def _chunk_progress(chunk_ids: List[str], total: int) -> Dict[str, Any]:
+        """Sum of the chunk tasks' PROGRESS meta (finished chunks count whole)."""
+        done = processed = finished = 0
+        for chunk_id in chunk_ids:
+            chunk = AsyncResult(chunk_id)
+            info = chunk.info
+            if not isinstance(info, dict):
+                continue
+            if chunk.state == "PROGRESS":
+                done += info["current"]
+            elif chunk.state == "SUCCESS":
+                done += info["total"]
+                finished += 1
+            else:
+                continue
+            processed += info["processed"]
+        return {
+            "current": done,
+            "total": total,
+            "percent": int(done / total * 100) if total else 100,
+            "processed": processed,
+            "chunks_done": finished,
+        }
+
+    def _remember(self, task_id: str) -> str:
+        # Celery reports unknown ids as PENDING; this tells them apart.
+        caches["shared"].set(
+            self._submitted_key(task_id), 1, settings.CELERY_RESULT_EXPIRES
+        )
+        return task_id
+
+    @staticmethod
+    def _submitted_key(task_id: str) -> str:
+        return f"job_submitted:{task_id}"
+
+
+class ExportService:
+    """
+    Bulk exports of results, logs and prices for a time range.
+
+    Rows are read with ``.iterator(chunk_size=...)`` (server-side cursors on
+    PostgreSQL), so memory stays constant regardless of export size.
+    """
+
+    CHUNK_SIZE = 2000
+
+    LOG_FIELDS = ["id", "symbol", "action", "level", "metadata", "created_at"]
+    PRICE_FIELDS = ["id", "symbol", "price", "volume", "timestamp"]
+
+    def iter_results(
+        self,
+        fields: List[str],
+        symbol: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Portfolio results (derived fields from SQL), oldest first."""
+        queryset = self._filter(
+            PortfolioResult.objects.all(), "generation_date", symbol, since, until
+        )
+        return queryset.derived_values(*fields).iterator(chunk_size=self.CHUNK_SIZE)
+
+    def iter_logs(
+        self,
+        symbol: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Audit log entries, oldest first."""
+        queryset = self._filter(
+            PortfolioLog.objects.all(), "created_at", symbol, since, until
+        )
+        return queryset.values(*self.LOG_FIELDS).iterator(chunk_size=self.CHUNK_SIZE)
+
+    def iter_prices(
+        self,
+        symbol: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Market price snapshots, oldest first."""
+        queryset = self._filter(
+            MarketPrice.objects.all(), "timestamp", symbol, since, until
+        )
+        return queryset.values(*self.PRICE_FIELDS).iterator(chunk_size=self.CHUNK_SIZE)
+
+    def _filter(self, queryset, date_field, symbol, since, until):
+        if symbol:
+            queryset = queryset.filter(symbol=symbol.upper().strip())
+        if since:
+            queryset = queryset.filter(**{f"{date_field}__gte": since})
+        if until:
+            queryset = queryset.filter(**{f"{date_field}__lt": until})
+        return queryset.order_by(date_field, "id")
+
+
+class CacheWarmupService:
+    """
+    Preloads the read caches after a deploy or worker boot.
+
+    Opening averages, the latest prices and the most recent results for the
+    tracked symbols (``SymbolRegistry``) are read from the database in one
+    query each and written with ``set_many``, so the first requests after a
+    restart hit a warm cache instead of queueing on the database and Kraken
+    together.
+
+    ``max_seconds`` caps the whole run: steps that would start after the
+    deadline are skipped and reported in ``skipped``.
+    """
+
+    def __init__(
+        self,
+        market_service: Optional[MarketDataService] = None,
+        clock=time.monotonic,
+    ):
+        self.market_service = market_service or MarketDataService()
+        self.clock = clock
+
+    def warm(
+        self,
+        symbols: Optional[List[str]] = None,
+        max_seconds: Optional[float] = None,
+        hot_results: Optional[int] = None,
+        fetch_missing: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        Warm the caches and return per-step counts.
+
+        With ``fetch_missing``, values still missing afterwards are fetched
+        from Kraken one call at a time until the deadline.
+        """
+        symbols = [
+            s.upper().strip()
+            for s in (symbols or SymbolRegistry(self.market_service).symbols())
+        ]
+        if max_seconds is None:
+            max_seconds = settings.CACHE_WARMUP_MAX_SECONDS
+        if hot_results is None:
+            hot_results = settings.CACHE_WARMUP_HOT_RESULTS
+        deadline = self.clock() + max_seconds
+
+        stats: Dict[str, Any] = {"symbols": symbols, "skipped": []}
+        steps = [
+            ("opening_averages", lambda: self._warm_opening_averages(symbols)),
+            ("prices", lambda: self._warm_prices(symbols)),
+            ("results", lambda: self._warm_results(hot_results)),
+        ]
+        if fetch_missing:
+            steps.append(("fetched", lambda: self._fetch_missing(symbols, deadline)))
+
+        started = self.clock()
+        for name, step in steps:
+            if self.clock() >= deadline:
+                stats["skipped"].append(name)
+                continue
+            stats[name] = step()
+        stats["seconds"] = round(self.clock() - started, 3)
+        stats["timed_out"] = bool(stats["skipped"])
+        return stats
+
+    def _warm_opening_averages(self, symbols: List[str]) -> int:
+        latest = (
+            OpeningAverage.objects.filter(symbol=OuterRef("symbol"))
+            .order_by("-created_at")
+            .values("id")[:1]
+        )
+        rows = OpeningAverage.objects.filter(
+            symbol__in=symbols, id=Subquery(latest)
+        ).values_list("symbol", "average")
+        values = {f"opening_avg:{symbol}": str(average) for symbol, average in rows}
+        cache.set_many(values, self.market_service.CACHE_TTL_OPENING)
+        return len(values)
+
+    def _warm_prices(self, symbols: List[str]) -> int:
+        # Only snapshots still inside the current-price TTL are "current";
+        # each is cached for what is left of its TTL, never longer.
+        ttl = self.market_service.CACHE_TTL_CURRENT
+        now = timezone.now()
+        latest = (
+            MarketPrice.objects.filter(symbol=OuterRef("symbol"))
+            .order_by("-updated_at")
+            .values("id")[:1]
+        )
+        rows = MarketPrice.objects.filter(
+            symbol__in=symbols,
+            id=Subquery(latest),
+            updated_at__gt=now - timedelta(seconds=ttl),
+        ).values_list("symbol", "price", "updated_at")
+        warmed = 0
+        for symbol, price, updated_at in rows:
+            remaining = ttl - (now - updated_at).total_seconds()
+            if remaining >= 1:
+                cache.set(f"current_price:{symbol}", str(price), int(remaining))
+                warmed += 1
+        return warmed
+
+    def _warm_results(self, limit: int) -> int:
+        if limit <= 0:
+            return 0
+        results = PortfolioResult.objects.order_by("-generation_date")[:limit]
+        values = {PortfolioService.result_cache_key(r.id): r for r in results}
+        cache.set_many(values, PortfolioService.CACHE_TTL_RESULT)
+        return len(values)
+
+    def _fetch_missing(self, symbols: List[str], deadline: float) -> int:
+        market = self.market_service
+        lookups = [
+            (market.peek_opening_average, market.get_opening_average),
+            (market.peek_current_price, market.get_current_price),
+        ]
+        fetched = 0
+        for symbol in symbols:
+            for peek, fetch in lookups:
+                if self.clock() >= deadline:
+                    return fetched
+                if peek(symbol) is not None:
+                    continue
+                try:
+                    if fetch(symbol) is not None:
+                        fetched += 1
+                except ExternalServiceError as e:
+                    logger.warning("Cache warm-up could not fetch %s: %s", symbol, e)
+        return fetched
+
+
 class CovidAnalyzer:
     """Domain service for COVID-19 impact analysis."""
 
@@ -435,14 +1534,248 @@ class CovidAnalyzer:
             return "Low COVID impact, normal market conditions expected"
 
 
+class RollupService:
+    """
+    Maintains per-symbol, per-day rollups of results and price snapshots.
+
+    Rollups are refreshed incrementally from a watermark (the highest source
+    row id already folded in). Only the (symbol, day) buckets touched by rows
+    above the watermark are recomputed, so a refresh costs O(new rows) rather
+    than O(table size), and recomputing a whole bucket keeps it idempotent.
+    Market prices are upserted per candle, so their watermark also tracks
+    the latest ``updated_at`` and rows updated after it count as new.
+
+    Ids are assigned at insert, not at commit: a transaction committing
+    after a higher id was folded in leaves a row below the watermark. Rows
+    written within ROLLUP_REPROCESS_WINDOW seconds before the previous
+    refresh are therefore reconsidered as well.
+    """
+
+    PORTFOLIO_WATERMARK = "portfolio_results"
+    PRICE_WATERMARK = "market_prices"
+
+    def refresh(self) -> Dict[str, int]:
+        """Fold all new source rows into the rollup tables."""
+        return {
+            "portfolio_buckets": self.refresh_portfolio_rollups(),
+            "price_buckets": self.refresh_price_rollups(),
+        }
+
+    @transaction.atomic
+    def refresh_portfolio_rollups(self) -> int:
+        """Recompute portfolio rollup buckets touched since the watermark."""
+        watermark = self._lock_watermark(self.PORTFOLIO_WATERMARK)
+        dirty, high_id, _ = self._dirty_buckets(
+            PortfolioResult.objects.all(), "generation_date", watermark
+        )
+        if high_id is None:
+            return 0
+
+        derived = PortfolioResultQuerySet.DERIVED_FILTERS
+        risk = derived["risk_level"]
+        rollups = []
+        for symbol, days in dirty.items():
+            rows = (
+                self._bucket_rows(
+                    PortfolioResult.objects, symbol, days, "generation_date"
+                )
+                .values("day")
+                .annotate(
+                    calculations=Count("id"),
+                    total_investment=Sum("investment"),
+                    total_profit=Sum("profit"),
+                    total_growth_factor=Sum("growth_factor"),
+                    profitable_count=Count("id", filter=derived["is_profitable"][True]),
+                    lambo_count=Count("id", filter=derived["can_buy_lambo"][True]),
+                    high_risk_count=Count("id", filter=risk["HIGH"]),
+                    medium_risk_count=Count("id", filter=risk["MEDIUM"]),
+                    low_risk_count=Count("id", filter=risk["LOW"]),
+                )
+            )
+            for row in rows:
+                if row["day"] in days:
+                    rollups.append(PortfolioDailyRollup(symbol=symbol, **row))
+
+        self._upsert(PortfolioDailyRollup, rollups)
+        self._advance_watermark(watermark, high_id)
+        return len(rollups)
+
+    @transaction.atomic
+    def refresh_price_rollups(self) -> int:
+        """Recompute market price rollup buckets touched since the watermark."""
+        watermark = self._lock_watermark(self.PRICE_WATERMARK)
+        dirty, high_id, high_updated = self._dirty_buckets(
+            MarketPrice.objects.all(), "timestamp", watermark, track_updates=True
+        )
+        if high_id is None:
+            return 0
+
+        price_volume = ExpressionWrapper(
+            F("price") * F("volume"),
+            output_field=DecimalField(max_digits=40, decimal_places=8),
+        )
+        rollups = []
+        for symbol, days in dirty.items():
+            rows = [
+                row
+                for row in self._bucket_rows(
+                    MarketPrice.objects, symbol, days, "timestamp"
+                )
+                .values("day")
+                .annotate(
+                    samples=Count("id"),
+                    high=Max("price"),
+                    low=Min("price"),
+                    price_sum=Sum("price"),
+                    volume_sum=Sum("volume"),
+                    price_volume_sum=Sum(price_volume),
+                    first_timestamp=Min("timestamp"),
+                    last_timestamp=Max("timestamp"),
+                )
+                if row["day"] in days
+            ]
+            prices = self._prices_at(
+                symbol,
+                {
+                    row[key]
+                    for row in rows
+                    for key in ("first_timestamp", "last_timestamp")
+                },
+            )
+            for row in rows:
+                row["volume_sum"] = row["volume_sum"] or Decimal("0")
+                row["price_volume_sum"] = row["price_volume_sum"] or Decimal("0")
+                row["open"] = prices[row["first_timestamp"]]
+                row["close"] = prices[row["last_timestamp"]]
+                rollups.append(MarketPriceDailyRollup(symbol=symbol, **row))
+
+        self._upsert(MarketPriceDailyRollup, rollups)
+        self._advance_watermark(watermark, high_id, high_updated)
+        return len(rollups)
+
+    def _lock_watermark(self, name: str) -> RollupWatermark:
+        """Fetch (creating if needed) and row-lock a watermark."""
+        RollupWatermark.objects.get_or_create(name=name)
+        return RollupWatermark.objects.select_for_update().get(name=name)
+
+    def _dirty_buckets(
+        self,
+        queryset,
+        date_field: str,
+        watermark: RollupWatermark,
+        track_updates: bool = False,
+    ):
+        """
+        Return ({symbol: {day, ...}}, max id, max updated_at) for new rows.
+
+        Rows are new when above the id watermark or written (``date_field``,
+        or ``updated_at`` with ``track_updates``) within the reprocess window
+        of the previous refresh. With ``track_updates`` rows updated since
+        the watermark count as new too; otherwise the returned max
+        updated_at is None.
+        """
+        changed = Q(id__gt=watermark.last_id)
+        written_field = "updated_at" if track_updates else date_field
+        if watermark.last_id:
+            since = watermark.updated_at - timedelta(
+                seconds=settings.ROLLUP_REPROCESS_WINDOW
+            )
+            changed |= Q(**{f"{written_field}__gte": since})
+        if track_updates and watermark.last_updated_at is not None:
+            changed |= Q(updated_at__gt=watermark.last_updated_at)
+        new_rows = queryset.filter(changed)
+        aggregates = {"high": Max("id")}
+        if track_updates:
+            aggregates["updated"] = Max("updated_at")
+        marks = new_rows.aggregate(**aggregates)
+        high_id = marks["high"]
+        if high_id is None:
+            return {}, None, None
+
+        dirty: Dict[str, set] = {}
+        pairs = (
+            new_rows.filter(id__lte=high_id)
+            .order_by()
+            .annotate(day=TruncDate(date_field))
+            .values_list("symbol", "day")
+            .distinct()
+        )
+        for symbol, day in pairs:
+            dirty.setdefault(symbol, set()).add(day)
+        return dirty, high_id, marks.get("updated")
+
+    def _bucket_rows(self, manager, symbol: str, days: set, date_field: str):
+        """Rows for one symbol covering the given days, annotated with ``day``."""
+        tz = timezone.get_current_timezone()
+        start = datetime.combine(min(days), datetime.min.time(), tzinfo=tz)
+        end = datetime.combine(max(days), datetime.min.time(), tzinfo=tz)
+        return (
+            manager.filter(
+                symbol=symbol,
+                **{
+                    f"{date_field}__gte": start,
+                    f"{date_field}__lt": end + timedelta(days=1),
+                },
+            )
+            .order_by()
+            .annotate(day=TruncDate(date_field))
+        )
+
+    def _prices_at(self, symbol: str, timestamps: set) -> Dict[datetime, Decimal]:
+        """Prices of the snapshots taken at ``timestamps`` (latest id wins ties)."""
+        rows = (
+            MarketPrice.objects.filter(symbol=symbol, timestamp__in=timestamps)
+            .order_by("id")
+            .values_list("timestamp", "price")
+        )
+        return dict(rows)
+
+    def _upsert(self, model, rollups: List) -> None:
+        """Insert or overwrite rollup buckets on (symbol, day)."""
+        if not rollups:
+            return
+        update_fields = [
+            f.name
+            for f in model._meta.concrete_fields
+            if f.name not in ("id", "symbol", "day")
+        ]
+        model.objects.bulk_create(
+            rollups,
+            update_conflicts=True,
+            unique_fields=["symbol", "day"],
+            update_fields=update_fields,
+        )
+
+    def _advance_watermark(
+        self,
+        watermark: RollupWatermark,
+        high_id: int,
+        high_updated: Optional[datetime] = None,
+    ) -> None:
+        # Updated rows can all be below the id watermark; never move it back.
+        watermark.last_id = max(watermark.last_id, high_id)
+        if high_updated is not None:
+            watermark.last_updated_at = high_updated
+        watermark.save(update_fields=["last_id", "last_updated_at", "updated_at"])
+
+
 class AnalyticsService:
     """Service for analytics operations."""
 
+    REPORT_DAYS = 30
+    CACHE_TTL_REPORT = 300  # 5 minutes per data version
+    CACHE_TTL_PREDICTION = 300
+
     def __init__(self, covid_analyzer: Optional[CovidAnalyzer] = None):
         self.covid_analyzer = covid_analyzer or CovidAnalyzer()
 
     def get_covid_prediction(self) -> Dict[str, Any]:
-        """Get COVID-19 impact prediction."""
+        """
+        Get COVID-19 impact prediction.
+
+        Results are cached per input fingerprint, and a Prediction row is
+        only stored when the analysed content differs from what is stored.
+        """
         try:
             # Mock data for now
             mock_covid_data = {
@@ -451,50 +1784,252 @@ class AnalyticsService:
                 "timestamp": "2025-10-11T00:00:00Z",
             }
 
-            analysis = self.covid_analyzer.analyze_impact(mock_covid_data)
+            cache_key = f"covid_prediction:{content_fingerprint(mock_covid_data)}"
+            cached = _cache_get(cache_key, "covid_prediction")
+            if cached is not None:
+                logger.debug("Cache hit: covid prediction")
+                return cached
 
-            # Store prediction
-            Prediction.objects.create(
-                prediction_type="covid_impact",
-                prediction_data={**mock_covid_data, **analysis},
-                confidence=Decimal(str(analysis["confidence"])),
-            )
+            analysis = self.covid_analyzer.analyze_impact(mock_covid_data)
+            prediction_data = {**mock_covid_data, **analysis}
+            fingerprint = content_fingerprint(prediction_data)
+
+            # Store prediction only when the content changed
+            prediction = Prediction.objects.filter(
+                prediction_type="covid_impact", fingerprint=fingerprint
+            ).first()
+            if prediction is None:
+                prediction = Prediction.objects.create(
+                    prediction_type="covid_impact",
+                    prediction_data=prediction_data,
+                    confidence=Decimal(str(analysis["confidence"])),
+                    fingerprint=fingerprint,
+                )
 
-            return {
+            result = {
                 "covid_data": mock_covid_data,
                 "analysis": analysis,
                 "timestamp": mock_covid_data["timestamp"],
                 "source": "covid_analyzer",
+                "fingerprint": fingerprint,
+                "created_at": prediction.created_at.isoformat(),
             }
+            cache.set(cache_key, result, self.CACHE_TTL_PREDICTION)
+            return result
 
         except Exception as e:
             logger.exception("Error getting COVID prediction: %s", str(e))
             raise ExternalServiceError("Failed to generate COVID prediction")
 
-    def generate_report(self, symbol: Optional[str] = None) -> Dict[str, Any]:
-        """Generate analytics report."""
+    def generate_report(
+        self, symbol: Optional[str] = None, days: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Generate analytics report from the daily rollups.
+
+        Reports are cached per (symbol, days, data version), where the data
+        version is the rollup watermarks plus the current day. Reports only
+        read the rollups (refreshed by ``domain.refresh_rollups``), at most
+        ``days x symbols`` rows independent of how many raw results and
+        prices exist. A new AnalysisReport row is only stored when the
+        report content changed.
+        """
         try:
-            report_data = {
-                "symbol": symbol,
-                "charts": [],
-                "metrics": {},
-                "recommendations": [],
-            }
+            symbol = symbol.upper().strip() if symbol else None
+            days = days or self.REPORT_DAYS
 
-            report = AnalysisReport.objects.create(
-                report_type="market_analysis",
-                data=report_data,
-                summary=f"Analytics report for {symbol or 'market'}",
+            cache_key = (
+                f"analytics_report:{symbol or '*'}:{days}:{self._data_version()}"
             )
+            cached = _cache_get(cache_key, "analytics_report")
+            if cached is not None:
+                logger.debug("Cache hit: analytics report for %s", symbol or "market")
+                return cached
+
+            report_data = self._build_report_data(symbol, days)
+            fingerprint = content_fingerprint(report_data)
+
+            report = AnalysisReport.objects.filter(
+                report_type="market_analysis", fingerprint=fingerprint
+            ).first()
+            if report is None:
+                report = AnalysisReport.objects.create(
+                    report_type="market_analysis",
+                    data=report_data,
+                    summary=f"Analytics report for {symbol or 'market'}",
+                    fingerprint=fingerprint,
+                )
 
-            return {
+            result = {
                 "id": report.id,
                 "report_type": report.report_type,
-                "data": report_data,
+                "data": report.data,
                 "summary": report.summary,
+                "fingerprint": fingerprint,
                 "created_at": report.created_at.isoformat(),
             }
+            cache.set(cache_key, result, self.CACHE_TTL_REPORT)
+            return result
 
         except Exception as e:
             logger.exception("Error generating report: %s", str(e))
             raise
+
+    @staticmethod
+    def _data_version() -> str:
+        """Version of the report inputs: the day and the rollup watermarks."""
+        watermarks = RollupWatermark.objects.order_by("name").values_list(
+            "name", "updated_at"
+        )
+        stamps = ",".join(f"{name}@{at.timestamp()}" for name, at in watermarks)
+        return f"{timezone.localdate().isoformat()}:{stamps}"
+
+    def _build_report_data(self, symbol: Optional[str], days: int) -> Dict[str, Any]:
+        """Aggregate rollup rows into the report payload."""
+        end = timezone.localdate()
+        start = end - timedelta(days=days - 1)
+
+        portfolio = PortfolioDailyRollup.objects.filter(day__gte=start, day__lte=end)
+        prices = MarketPriceDailyRollup.objects.filter(day__gte=start, day__lte=end)
+        if symbol:
+            portfolio = portfolio.filter(symbol=symbol)
+            prices = prices.filter(symbol=symbol)
+
+        totals: Dict[str, Dict[str, Any]] = {}
+        charts: Dict[tuple, Dict[str, Any]] = {}
+
+        for row in portfolio.order_by("day", "symbol"):
+            bucket = totals.setdefault(row.symbol, self._empty_totals())
+            bucket["total_calculations"] += row.calculations
+            bucket["total_investment"] += row.total_investment
+            bucket["total_profit"] += row.total_profit
+            bucket["total_growth_factor"] += row.total_growth_factor
+            bucket["profitable"] += row.profitable_count
+            bucket["lambos"] += row.lambo_count
+            bucket["risk_distribution"]["LOW"] += row.low_risk_count
+            bucket["risk_distribution"]["MEDIUM"] += row.medium_risk_count
+            bucket["risk_distribution"]["HIGH"] += row.high_risk_count
+
+            point = charts.setdefault((row.day, row.symbol), self._chart_point(row))
+            point["calculations"] = row.calculations
+            point["profit"] = float(row.total_profit)
+
+        market: Dict[str, Dict[str, Any]] = {}
+        for row in prices.order_by("day", "symbol"):
+            point = charts.setdefault((row.day, row.symbol), self._chart_point(row))
+            point["close"] = float(row.close)
+            point["vwap"] = float(row.vwap)
+
+            summary = market.get(row.symbol)
+            if summary is None:
+                market[row.symbol] = {
+                    "open": float(row.open),
+                    "high": float(row.high),
+                    "low": float(row.low),
+                    "close": float(row.close),
+                    "samples": row.samples,
+                    "price_sum": row.price_sum,
+                    "volume_sum": row.volume_sum,
+                    "price_volume_sum": row.price_volume_sum,
+                }
+                continue
+            summary["high"] = max(summary["high"], float(row.high))
+            summary["low"] = min(summary["low"], float(row.low))
+            summary["close"] = float(row.close)
+            summary["samples"] += row.samples
+            summary["price_sum"] += row.price_sum
+            summary["volume_sum"] += row.volume_sum
+            summary["price_volume_sum"] += row.price_volume_sum
+
+        overall = self._empty_totals()
+        for bucket in totals.values():
+            for key in (
+                "total_calculations",
+                "total_investment",
+                "total_profit",
+                "total_growth_factor",
+                "profitable",
+                "lambos",
+            ):
+                overall[key] += bucket[key]
+            for level, count in bucket["risk_distribution"].items():
+                overall["risk_distribution"][level] += count
+
+        symbols = {}
+        for sym in sorted(set(totals) | set(market)):
+            entry = self._finalize_totals(totals.get(sym, self._empty_totals()))
+            if sym in market:
+                entry["market"] = self._finalize_market(market[sym])
+            symbols[sym] = entry
+
+        return {
+            "symbol": symbol,
+            "period": {
+                "start": start.isoformat(),
+                "end": end.isoformat(),
+                "days": days,
+            },
+            "charts": [charts[key] for key in sorted(charts)],
+            "metrics": self._finalize_totals(overall),
+            "symbols": symbols,
+            "recommendations": [],
+        }
+
+    @staticmethod
+    def _empty_totals() -> Dict[str, Any]:
+        return {
+            "total_calculations": 0,
+            "total_investment": Decimal("0"),
+            "total_profit": Decimal("0"),
+            "total_growth_factor": Decimal("0"),
+            "profitable": 0,
+            "lambos": 0,
+            "risk_distribution": {"LOW": 0, "MEDIUM": 0, "HIGH": 0},
+        }
+
+    @staticmethod
+    def _chart_point(row) -> Dict[str, Any]:
+        return {
+            "day": row.day.isoformat(),
+            "symbol": row.symbol,
+            "calculations": 0,
+            "profit": 0.0,
+            "close": None,
+            "vwap": None,
+        }
+
+    @staticmethod
+    def _finalize_totals(totals: Dict[str, Any]) -> Dict[str, Any]:
+        """Turn summed counters into JSON-friendly totals, averages and ratios."""
+        count = totals["total_calculations"]
+        investment = totals["total_investment"]
+        profit = totals["total_profit"]
+        return {
+            "total_calculations": count,
+            "total_investment": float(investment),
+            "total_profit": float(profit),
+            "avg_investment": float(investment / count) if count else 0.0,
+            "avg_profit": float(profit / count) if count else 0.0,
+            "avg_growth_factor": (
+                float(totals["total_growth_factor"] / count) if count else 0.0
+            ),
+            "roi_percentage": float(profit / investment * 100) if investment else 0.0,
+            "profitable_ratio": totals["profitable"] / count if count else 0.0,
+            "lambo_count": totals["lambos"],
+            "risk_distribution": dict(totals["risk_distribution"]),
+        }
+
+    @staticmethod
+    def _finalize_market(summary: Dict[str, Any]) -> Dict[str, Any]:
+        if summary["volume_sum"] > 0:
+            vwap = summary["price_volume_sum"] / summary["volume_sum"]
+        else:
+            vwap = summary["price_sum"] / summary["samples"]
+        return {
+            "open": summary["open"],
+            "high": summary["high"],
+            "low": summary["low"],
+            "close": summary["close"],
+            "vwap": float(vwap),
+            "samples": summary["samples"],
+        }
@@ -23,13 +23,18 @@ EXAMPLE USAGE:
 
 Replace these example tasks with your own domain-specific tasks.
 """
+
+import time
 from datetime import datetime, timedelta
 from decimal import Decimal
 from typing import Optional
 
-from celery import shared_task
+from celery import chord, shared_task
 from celery.utils.log import get_task_logger
+from django.conf import settings
 from shared.exceptions.custom_exceptions import ExternalServiceError, ValidationError
+from shared.profiling import profile_task
+from shared.task_dedup import DeduplicatedTask, single_instance
 
 logger = get_task_logger(__name__)
 
@@ -39,7 +44,13 @@ logger = get_task_logger(__name__)
 # =============================================================================
 
 
-@shared_task(name="domain.process_portfolio_async", bind=True, max_retries=3)
+@shared_task(
+    name="domain.process_portfolio_async",
+    bind=True,
+    max_retries=3,
+    base=DeduplicatedTask,
+)
+@profile_task
 def process_portfolio_async(self, symbol: str, investment: float):
     """
     Process portfolio calculation asynchronously.
@@ -52,6 +63,9 @@ def process_portfolio_async(self, symbol: str, investment: float):
         result = process_portfolio_async.delay(symbol="BTC", investment=1000.0)
         task_id = result.task_id
 
+    Identical submissions within TASK_DEDUP_WINDOW return the queued,
+    running or finished task's result instead of enqueuing new work.
+
     Args:
         self: Task instance (when bind=True)
         symbol: Cryptocurrency symbol (e.g., 'BTC')
@@ -102,6 +116,7 @@ def process_portfolio_async(self, symbol: str, investment: float):
 
 
 @shared_task(name="domain.fetch_market_prices")
+@single_instance(timeout=5 * 60)
 def fetch_market_prices_task():
     """
     Fetch and cache current market prices for all tracked symbols.
@@ -118,10 +133,9 @@ def fetch_market_prices_task():
     Returns:
         dict: Symbol -> price mapping with fetch status
     """
-    from .services import MarketDataService
+    from .services import MarketDataService, SymbolRegistry
 
-    # Define symbols to track (replace with your own)
-    symbols = ["BTC", "ETH", "ADA", "SOL", "XRP"]
+    symbols = SymbolRegistry().symbols()
 
     logger.info(f"Fetching market prices for {len(symbols)} symbols")
 
@@ -150,7 +164,37 @@ def fetch_market_prices_task():
     return results
 
 
+@shared_task(name="domain.refresh_due_symbols")
+@single_instance(timeout=5 * 60)
+def refresh_due_symbols_task():
+    """
+    Refresh current prices of tracked symbols whose interval has elapsed.
+
+    Hot symbols (see SymbolRegistry) are refreshed more often than their
+    configured interval; at most SYMBOL_REFRESH_BUDGET API calls are made
+    per run, highest priority first.
+
+    Schedule in Django admin:
+        - Periodic Task: "Refresh Due Symbols"
+        - Task: domain.refresh_due_symbols
+        - Interval: Every 1 minute
+        - Enabled: ✓
+
+    Returns:
+        dict: Due count and refreshed, failed and deferred symbols
+    """
+    from .services import SymbolRegistry
+
+    summary = SymbolRegistry().refresh_due()
+    logger.info(
+        f"Refreshed {len(summary['refreshed'])}/{summary['due']} due symbols "
+        f"({len(summary['deferred'])} deferred)"
+    )
+    return summary
+
+
 @shared_task(name="domain.update_opening_averages")
+@single_instance(timeout=30 * 60)
 def update_opening_averages_task():
     """
     Calculate and update opening averages for tracked symbols.
@@ -166,9 +210,9 @@ def update_opening_averages_task():
     Returns:
         dict: Update results for each symbol
     """
-    from .services import MarketDataService
+    from .services import MarketDataService, SymbolRegistry
 
-    symbols = ["BTC", "ETH", "ADA", "SOL", "XRP"]
+    symbols = SymbolRegistry().symbols()
 
     logger.info(f"Updating opening averages for {len(symbols)} symbols")
 
@@ -197,6 +241,7 @@ def update_opening_averages_task():
 
 
 @shared_task(name="domain.generate_analytics_report")
+@profile_task
 def generate_analytics_report_task(symbol: Optional[str] = None):
     """
     Generate comprehensive analytics report.
@@ -224,12 +269,45 @@ def generate_analytics_report_task(symbol: Optional[str] = None):
     report = service.generate_report(symbol=symbol)
 
     logger.info(
-        f"Report generated: {report['total_calculations']} calculations analyzed"
+        "Report generated: "
+        f"{report['data']['metrics']['total_calculations']} calculations analyzed"
     )
 
     return report
 
 
+@shared_task(name="domain.refresh_rollups")
+@single_instance(timeout=30 * 60)
+@profile_task
+def refresh_rollups_task():
+    """
+    Fold new portfolio results and price snapshots into the daily rollups.
+
+    Refreshes are incremental (only rows above the stored watermark, or
+    written within ROLLUP_REPROCESS_WINDOW of the previous run, are read),
+    so this can run frequently without scanning the raw tables.
+
+    Schedule in Django admin:
+        - Periodic Task: "Refresh Rollups"
+        - Task: domain.refresh_rollups
+        - Interval: Every 5 minutes
+        - Enabled: ✓
+
+    Returns:
+        dict: Number of rollup buckets recomputed per table
+    """
+    from .services import RollupService
+
+    stats = RollupService().refresh()
+
+    logger.info(
+        f"Rollups refreshed: {stats['portfolio_buckets']} portfolio buckets, "
+        f"{stats['price_buckets']} price buckets"
+    )
+
+    return stats
+
+
 @shared_task(name="domain.analyze_covid_impact")
 def analyze_covid_impact_task():
     """
@@ -258,6 +336,7 @@ def analyze_covid_impact_task():
 
 
 @shared_task(name="domain.cleanup_old_data")
+@single_instance(timeout=30 * 60)
 def cleanup_old_data_task(days: int = 90):
     """
     Clean up old portfolio results and market data.
@@ -278,6 +357,7 @@ def cleanup_old_data_task(days: int = 90):
         dict: Cleanup statistics
     """
     from .models import MarketPrice, PortfolioLog, PortfolioResult
+    from .services import PriceHistoryBuffer
 
     threshold = datetime.now() - timedelta(days=days)
 
@@ -290,6 +370,8 @@ def cleanup_old_data_task(days: int = 90):
 
     # Delete old market prices
     deleted_prices = MarketPrice.objects.filter(timestamp__lt=threshold).delete()
+    if deleted_prices[0]:
+        PriceHistoryBuffer.invalidate()
 
     # Delete old logs (keep for shorter period - 30 days)
     log_threshold = datetime.now() - timedelta(days=30)
@@ -353,7 +435,35 @@ def log_system_event_task(action: str, level: str = "INFO", metadata: dict = Non
 # =============================================================================
 
 
+class _ProgressReporter:
+    """Publishes PROGRESS state at most once per BATCH_PROGRESS_INTERVAL."""
+
+    def __init__(self, task, total: int, offset: int = 0):
+        self.task = task
+        self.total = total
+        self.offset = offset
+        self.interval = settings.BATCH_PROGRESS_INTERVAL
+        self.last = time.monotonic()
+
+    def __call__(self, done: int, processed: int) -> None:
+        now = time.monotonic()
+        if now - self.last < self.interval and done < self.total:
+            return
+        self.last = now
+        self.task.update_state(
+            state="PROGRESS",
+            meta={
+                "current": done,
+                "total": self.total,
+                "percent": int(done / self.total * 100) if self.total else 100,
+                "processed": processed,
+                "offset": self.offset,
+            },
+        )
+
+
 @shared_task(name="domain.batch_process_portfolios", bind=True)
+@profile_task
 def batch_process_portfolios_task(self, portfolio_configs: list):
     """
     Process multiple portfolio calculations in batch.
@@ -368,6 +478,13 @@ def batch_process_portfolios_task(self, portfolio_configs: list):
         ]
         task = batch_process_portfolios_task.delay(configs)
 
+    Prices are resolved once per symbol and results are bulk-inserted (see
+    PortfolioService.process_batch). Batches larger than
+    PORTFOLIO_BATCH_TASK_SIZE are split into chunk subtasks that run in
+    parallel; the task then returns immediately with ``status="dispatched"``
+    and the chunk task ids (``chunk_ids``), and the merged summary becomes
+    the result of ``result_id``.
+
     Args:
         self: Task instance
         portfolio_configs: List of {"symbol": str, "investment": float} dicts
@@ -381,56 +498,96 @@ def batch_process_portfolios_task(self, portfolio_configs: list):
     logger.info(f"Starting batch processing for {total} portfolios")
 
     service = PortfolioService()
-    processed = 0
-    errors = []
-    results = []
+    task_size = settings.PORTFOLIO_BATCH_TASK_SIZE
 
-    for idx, config in enumerate(portfolio_configs):
-        try:
-            result = service.process_request(
-                symbol=config["symbol"], investment=Decimal(str(config["investment"]))
+    if total > task_size:
+        prices, price_errors = service.resolve_prices(
+            service.batch_symbols(portfolio_configs)
+        )
+        encoded = {
+            symbol: [str(opening), str(current)]
+            for symbol, (opening, current) in prices.items()
+        }
+        header = [
+            process_portfolio_chunk_task.s(
+                portfolio_configs[offset : offset + task_size],
+                encoded,
+                price_errors,
+                offset,
             )
+            for offset in range(0, total, task_size)
+        ]
+        # Ids up front, so job status can read each chunk's progress.
+        chunk_ids = [signature.freeze().id for signature in header]
+        result = chord(header)(merge_batch_results_task.s())
+        logger.info(f"Batch of {total} split into {len(header)} chunk tasks")
+        return {
+            "total": total,
+            "chunks": len(header),
+            "status": "dispatched",
+            "result_id": result.id,
+            "chunk_ids": chunk_ids,
+        }
 
-            results.append(
-                {
-                    "symbol": config["symbol"],
-                    "result_id": result.id,
-                    "profit": float(result.profit),
-                    "status": "success",
-                }
-            )
+    summary = service.process_batch(
+        portfolio_configs, on_progress=_ProgressReporter(self, total)
+    )
+    logger.info(
+        f"Batch processing completed: {summary['processed']}/{total} successful"
+    )
+    return summary
 
-            processed += 1
-
-            # Update task progress
-            self.update_state(
-                state="PROGRESS",
-                meta={
-                    "current": idx + 1,
-                    "total": total,
-                    "percent": int((idx + 1) / total * 100),
-                    "processed": processed,
-                },
-            )
 
-        except Exception as e:  # noqa: BLE001 - Catch all to continue batch
-            logger.error(f"Failed to process {config['symbol']}: {e}")
-            errors.append(
-                {
-                    "symbol": config["symbol"],
-                    "investment": config["investment"],
-                    "error": str(e),
-                }
-            )
+@shared_task(name="domain.process_portfolio_chunk", bind=True)
+@profile_task
+def process_portfolio_chunk_task(
+    self, portfolio_configs: list, prices: dict, price_errors: dict, offset: int
+):
+    """
+    Process one chunk of a split batch with prices resolved by the parent.
 
-    summary = {
-        "total": total,
-        "processed": processed,
+    Args:
+        portfolio_configs: The chunk's configs
+        prices: Symbol -> [opening, current] as strings
+        price_errors: Symbol -> reason for symbols without prices
+        offset: Index of the chunk's first config in the whole batch
+    """
+    from .services import PortfolioService
+
+    summary = PortfolioService().process_batch(
+        portfolio_configs,
+        prices={
+            symbol: (Decimal(opening), Decimal(current))
+            for symbol, (opening, current) in prices.items()
+        },
+        price_errors=price_errors,
+        offset=offset,
+        on_progress=_ProgressReporter(self, len(portfolio_configs), offset),
+    )
+    logger.info(
+        f"Batch chunk at {offset} completed: "
+        f"{summary['processed']}/{summary['total']} successful"
+    )
+    return summary
+
+
+@shared_task(name="domain.merge_batch_results")
+def merge_batch_results_task(summaries: list):
+    """Combine chunk summaries into one batch summary, in input order."""
+    results = [row for summary in summaries for row in summary["results"]]
+    errors = [row for summary in summaries for row in summary["error_details"]]
+    results.sort(key=lambda row: row["index"])
+    errors.sort(key=lambda row: row["index"])
+
+    merged = {
+        "total": sum(summary["total"] for summary in summaries),
+        "processed": len(results),
         "errors": len(errors),
         "error_details": errors,
         "results": results,
     }
-
-    logger.info(f"Batch processing completed: {processed}/{total} successful")
-
-    return summary
+    logger.info(
+        f"Batch processing completed: {merged['processed']}/{merged['total']} "
+        "successful"
+    )
+    return merged
@@ -1,18 +1,49 @@
 """Tests for domain app."""
 
+import asyncio
+import io
+import json
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
 from decimal import Decimal
+from unittest import mock
 
-from django.test import TestCase
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.db.models import Avg, Count
+from django.test import AsyncClient, TestCase, override_settings
+from django.utils import timezone
+from shared.admin import EstimatedCountPaginator
+from shared.broadcast import Broadcaster, get_broadcaster
+from shared.ohlc import OHLCSeries
 
+from .admin import PortfolioResultAdmin, SymbolFilter
 from .models import (
     AnalysisReport,
     MarketPrice,
+    MarketPriceDailyRollup,
     OpeningAverage,
+    PortfolioDailyRollup,
     PortfolioLog,
     PortfolioResult,
     Prediction,
+    RollupWatermark,
+    TrackedSymbol,
+)
+from .services import (
+    AnalyticsService,
+    CacheWarmupService,
+    KrakenClient,
+    MarketDataService,
+    PortfolioCalculator,
+    PortfolioService,
+    PriceHistoryBuffer,
+    RollupService,
+    SymbolRegistry,
 )
-from .services import MarketDataService, PortfolioCalculator, PortfolioService
 
 
 class PortfolioCalculatorTests(TestCase):
@@ -106,6 +137,68 @@ class PortfolioResultModelTests(TestCase):
         self.assertTrue(result.can_buy_lambo())
 
 
+class PortfolioResultQuerySetTests(TestCase):
+    """Test derived fields computed in SQL."""
+
+    def setUp(self):
+        for symbol, investment, profit, growth, lambos in (
+            ("BTC", "1000", "200", "0.2", "0"),
+            ("BTC", "100", "500", "5.0", "1.5"),
+            ("ETH", "1000", "-100", "-0.1", "0"),
+            ("ETH", "400", "400", "1.0", "0"),
+        ):
+            PortfolioResult.objects.create(
+                symbol=symbol,
+                investment=Decimal(investment),
+                number_coins=Decimal("1"),
+                profit=Decimal(profit),
+                growth_factor=Decimal(growth),
+                lambos=Decimal(lambos),
+            )
+
+    def test_filter_derived_matches_model_methods(self):
+        """Test column-range filters agree with the Python behaviour."""
+        results = list(PortfolioResult.objects.all())
+        for level in ("LOW", "MEDIUM", "HIGH"):
+            self.assertEqual(
+                set(PortfolioResult.objects.filter_derived(risk_level=level)),
+                {r for r in results if r.risk_level() == level},
+            )
+        self.assertEqual(
+            set(PortfolioResult.objects.filter_derived(is_profitable=False)),
+            {r for r in results if not r.is_profitable()},
+        )
+        self.assertEqual(
+            PortfolioResult.objects.filter_derived(
+                risk_level__in=["HIGH", "MEDIUM"], can_buy_lambo=True
+            ).count(),
+            1,
+        )
+        with self.assertRaises(ValueError):
+            PortfolioResult.objects.filter_derived(risk_level="EXTREME")
+
+    def test_with_derived_orders_and_aggregates(self):
+        """Test aliases sort and aggregate without hiding model methods."""
+        results = PortfolioResult.objects.with_derived()
+
+        ordered = list(results.order_by("-roi_percentage"))
+        self.assertEqual(
+            [r.roi_percentage for r in ordered],
+            sorted((r.roi_percentage for r in ordered), reverse=True),
+        )
+        self.assertEqual(ordered[0].risk_level(), "HIGH")
+
+        totals = results.filter(risk_level="LOW").aggregate_derived(
+            roi=Avg("roi_percentage"), count=Count("id")
+        )
+        self.assertEqual(totals["count"], 2)
+        self.assertAlmostEqual(float(totals["roi"]), 5.0)
+        self.assertEqual(
+            results.filter(roi_percentage__gt=100).values_list("symbol", flat=True)[0],
+            "BTC",
+        )
+
+
 class PortfolioLogModelTests(TestCase):
     """Test PortfolioLog model."""
 
@@ -145,6 +238,208 @@ class MarketDataModelTests(TestCase):
         self.assertEqual(price.price, Decimal("3000.5"))
 
 
+class MarketPriceIngestionTests(TestCase):
+    """Test candle upserts into market price snapshots."""
+
+    def setUp(self):
+        self.client = mock.Mock()
+        self.market = MarketDataService(client=self.client)
+
+    def candle(self, timestamp, close, volume=1.0):
+        return {"timestamp": timestamp, "close": close, "volume": volume}
+
+    def test_ingest_upserts_per_candle(self):
+        """Test re-fetched candles update their row instead of appending."""
+        self.market.ingest_candles(
+            "btc", [self.candle(1700000000, 100.0), self.candle(1700021600, 110.0)]
+        )
+        self.market.ingest_candles("BTC", [self.candle(1700021600, 115.0, volume=7.5)])
+
+        rows = MarketPrice.objects.order_by("candle_timestamp")
+        self.assertEqual(
+            [(row.price, row.volume) for row in rows],
+            [(Decimal("100"), Decimal("1")), (Decimal("115"), Decimal("7.5"))],
+        )
+        self.assertEqual(
+            rows[1].candle_timestamp,
+            datetime.fromtimestamp(1700021600, tz=dt_timezone.utc),
+        )
+
+    def test_ingest_parsed_ohlc_series(self):
+        """Test a Kraken OHLC series is ingested from its typed columns."""
+        series = OHLCSeries(
+            [
+                [1700000000, "99.5", "101", "99", "100.25", "100", "3.5", 4],
+                [1700021600, "100.25", "111", "100", "110.5", "105", "1", 2],
+            ],
+            KrakenClient.OHLC_LAYOUT,
+        )
+
+        snapshots = self.market.ingest_candles("BTC", series)
+
+        self.assertEqual(
+            [(row.price, row.volume) for row in snapshots],
+            [(Decimal("100.25"), Decimal("3.5")), (Decimal("110.5"), Decimal("1"))],
+        )
+        self.assertEqual(
+            snapshots[1].candle_timestamp,
+            datetime.fromtimestamp(1700021600, tz=dt_timezone.utc),
+        )
+        self.assertEqual(series[-1]["close"], 110.5)
+
+    def test_client_current_price_tolerates_malformed_close(self):
+        """Test a close Kraken sent as a non-number yields None, not ValueError."""
+        client = KrakenClient()
+        series = OHLCSeries(
+            [[1700000000, "1", "1", "1", "n/a", "1", "1", 1]], KrakenClient.OHLC_LAYOUT
+        )
+
+        with mock.patch.object(client, "get_historical_ohlc", return_value=series):
+            self.assertIsNone(client.get_current_price("BTC"))
+
+    def test_refresh_current_price_deduplicates_snapshots(self):
+        """Test repeated cache misses on one candle keep a single row."""
+        self.client.get_latest_candle.return_value = self.candle(1700000000, 50000.0)
+
+        for _ in range(3):
+            price = self.market.refresh_current_price("BTC")
+
+        self.assertEqual(price, Decimal("50000"))
+        self.assertEqual(MarketPrice.objects.count(), 1)
+        self.assertEqual(MarketPrice.objects.get().volume, Decimal("1"))
+
+    def test_refreshes_in_different_minutes_keep_separate_rows(self):
+        """Test the latest candle is a one-minute candle, so history is kept."""
+        clock = [1700000030]
+
+        def kraken_ohlc(url, params, timeout):
+            step = params["interval"] * 60
+            opened = clock[0] // step * step
+            response = mock.Mock()
+            response.json.return_value = {
+                "error": [],
+                "result": {
+                    "XXBTZUSD": [[opened, "1", "1", "1", str(clock[0]), "1", "1", 1]],
+                    "last": opened,
+                },
+            }
+            return response
+
+        market = MarketDataService(client=KrakenClient())
+        with mock.patch("domain.services.requests.get", side_effect=kraken_ohlc):
+            market.refresh_current_price("BTC")
+            clock[0] += 60
+            market.refresh_current_price("BTC")
+
+        self.assertEqual(MarketPrice.objects.filter(symbol="BTC").count(), 2)
+
+    def test_history_version_changes_on_update(self):
+        """Test the history ETag source sees in-place updates."""
+        self.market.ingest_candles("BTC", [self.candle(1700000000, 100.0)])
+        before = self.market.get_price_history_version("BTC")
+
+        with mock.patch(
+            "django.utils.timezone.now",
+            return_value=timezone.now() + timedelta(seconds=5),
+        ):
+            self.market.ingest_candles("BTC", [self.candle(1700000000, 101.0)])
+
+        self.assertNotEqual(self.market.get_price_history_version("BTC"), before)
+
+
+class PriceHistoryBufferTests(TestCase):
+    """Test recent price history served from the per-process ring buffer."""
+
+    def setUp(self):
+        caches["shared"].clear()
+        PriceHistoryBuffer.clear()
+        SymbolRegistry.invalidate()
+        self.market = MarketDataService(client=mock.Mock())
+        self.ts = 1700000000
+
+    def ingest(self, symbol, close, volume=1.0, step=0):
+        return self.market.ingest_candles(
+            symbol,
+            [{"timestamp": self.ts + step * 60, "close": close, "volume": volume}],
+        )
+
+    def test_history_matches_database(self):
+        """Test buffered rows equal the ORM rows, newest first."""
+        for step, close in enumerate((100.5, 101.25, 99.12345678)):
+            self.ingest("BTC", close, step=step)
+        MarketPrice.objects.create(symbol="BTC", price=Decimal("98"))
+        expected = list(MarketPrice.objects.filter(symbol="BTC")[:3])
+
+        history = self.market.get_price_history("btc", limit=3)
+
+        self.assertEqual(
+            [(p.id, p.price, p.volume, p.timestamp) for p in history],
+            [(p.id, p.price, p.volume, p.timestamp) for p in expected],
+        )
+        self.assertIsNone(history[0].volume)
+        with self.assertNumQueries(0):
+            self.market.get_price_history("BTC", limit=3)
+
+    def test_ingest_updates_buffer_in_place(self):
+        """Test this process's ingests need no reload."""
+        self.ingest("ETH", 3000.0)
+        self.market.get_price_history("ETH", limit=10)
+
+        with self.assertNumQueries(2):
+            self.ingest("ETH", 3010.0, volume=4.0)  # same candle: upsert
+            self.ingest("ETH", 3020.0, step=1)
+        with self.assertNumQueries(0):
+            history = self.market.get_price_history("ETH", limit=10)
+
+        self.assertEqual(
+            [(p.price, p.volume) for p in history],
+            [(Decimal("3020"), Decimal("1")), (Decimal("3010"), Decimal("4"))],
+        )
+
+    def test_writes_elsewhere_trigger_reload(self):
+        """Test a version bump from another process reloads the buffer."""
+        self.ingest("BTC", 100.0)
+        self.market.get_price_history("BTC", limit=5)
+
+        MarketPrice.objects.create(symbol="BTC", price=Decimal("105"))
+        PriceHistoryBuffer.invalidate()
+
+        history = self.market.get_price_history("BTC", limit=5)
+        self.assertEqual(history[0].price, Decimal("105"))
+
+    def test_history_version_served_from_buffer(self):
+        """Test buffered windows are stamped from the buffer, without queries."""
+        self.ingest("BTC", 100.0)
+        before = self.market.get_price_history_version("BTC", limit=5)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                self.market.get_price_history_version("btc", limit=5), before
+            )
+        self.ingest("BTC", 101.0)  # same candle: upserted in place
+
+        self.assertNotEqual(
+            self.market.get_price_history_version("BTC", limit=5), before
+        )
+
+    @override_settings(PRICE_BUFFER_SIZE=2)
+    def test_untracked_symbols_and_large_limits_use_database(self):
+        """Test only windows the buffer can hold are served from it."""
+        for step in range(3):
+            self.ingest("BTC", 100.0 + step, step=step)
+            self.ingest("DOGE", 1.0 + step, step=step)
+
+        self.assertEqual(len(self.market.get_price_history("DOGE", limit=2)), 2)
+        with self.assertNumQueries(1):
+            self.assertEqual(len(self.market.get_price_history("DOGE", limit=2)), 2)
+        with self.assertNumQueries(1):
+            self.assertEqual(len(self.market.get_price_history("BTC", limit=3)), 3)
+        self.market.get_price_history("BTC", limit=2)
+        with self.assertNumQueries(0):
+            history = self.market.get_price_history("BTC", limit=2)
+        self.assertEqual([p.price for p in history], [Decimal("102"), Decimal("101")])
+
+
 class AnalyticsModelTests(TestCase):
     """Test analytics models."""
 
@@ -170,3 +465,826 @@ class AnalyticsModelTests(TestCase):
 
         self.assertEqual(report.report_type, "market_analysis")
         self.assertIn("trend", report.data)
+
+
+class RollupServiceTests(TestCase):
+    """Test incremental daily rollups and the report built on them."""
+
+    def _result(self, symbol, investment, profit, growth_factor, lambos="0"):
+        return PortfolioResult.objects.create(
+            symbol=symbol,
+            investment=Decimal(investment),
+            number_coins=Decimal("1"),
+            profit=Decimal(profit),
+            growth_factor=Decimal(growth_factor),
+            lambos=Decimal(lambos),
+        )
+
+    @override_settings(ROLLUP_REPROCESS_WINDOW=0)
+    def test_portfolio_rollup_is_incremental(self):
+        """Test new rows are folded into the existing bucket."""
+        self._result("BTC", "1000", "200", "0.2")
+        self._result("BTC", "1000", "-100", "-0.1")
+        service = RollupService()
+
+        self.assertEqual(service.refresh()["portfolio_buckets"], 1)
+        rollup = PortfolioDailyRollup.objects.get(symbol="BTC")
+        self.assertEqual(rollup.calculations, 2)
+        self.assertEqual(rollup.total_profit, Decimal("100"))
+        self.assertEqual(rollup.profitable_count, 1)
+
+        # Nothing new - nothing recomputed
+        self.assertEqual(service.refresh()["portfolio_buckets"], 0)
+
+        self._result("BTC", "500", "1500", "3.0")
+        self.assertEqual(service.refresh()["portfolio_buckets"], 1)
+        rollup.refresh_from_db()
+        self.assertEqual(rollup.calculations, 3)
+        self.assertEqual(rollup.total_investment, Decimal("2500"))
+        self.assertEqual(rollup.high_risk_count, 1)
+        self.assertEqual(rollup.low_risk_count, 2)
+
+    def test_portfolio_rollup_reprocesses_late_commits(self):
+        """Test rows committed below the id watermark are still folded in."""
+        self._result("BTC", "1000", "200", "0.2")
+        late = self._result("BTC", "1000", "-100", "-0.1")
+        self._result("BTC", "500", "1500", "3.0")
+        late_id = late.id
+        late.delete()  # not committed yet when the rollup runs
+        service = RollupService()
+        service.refresh()
+        self.assertEqual(PortfolioDailyRollup.objects.get().calculations, 2)
+
+        late.id = late_id
+        late.save(force_insert=True)
+
+        self.assertEqual(service.refresh()["portfolio_buckets"], 1)
+        rollup = PortfolioDailyRollup.objects.get()
+        self.assertEqual(rollup.calculations, 3)
+        self.assertEqual(rollup.total_investment, Decimal("2500"))
+        watermark = RollupWatermark.objects.get(name=service.PORTFOLIO_WATERMARK)
+        self.assertLess(late_id, watermark.last_id)
+
+    def test_price_rollup_ohlc_and_vwap(self):
+        """Test OHLC and VWAP are derived from the day's snapshots."""
+        for price, volume in (("100", "1"), ("120", "3"), ("90", None), ("110", "1")):
+            MarketPrice.objects.create(
+                symbol="ETH",
+                price=Decimal(price),
+                volume=Decimal(volume) if volume else None,
+            )
+
+        RollupService().refresh()
+        rollup = MarketPriceDailyRollup.objects.get(symbol="ETH")
+
+        self.assertEqual(rollup.open, Decimal("100"))
+        self.assertEqual(rollup.close, Decimal("110"))
+        self.assertEqual(rollup.high, Decimal("120"))
+        self.assertEqual(rollup.low, Decimal("90"))
+        self.assertEqual(rollup.samples, 4)
+        self.assertEqual(rollup.vwap, Decimal("114"))
+
+    def test_price_rollup_queries_do_not_scale_with_days(self):
+        """Test open/close prices of all dirty days come from one query."""
+        noon = timezone.localtime().replace(hour=12, minute=0)
+        for offset, price in ((0, "100"), (0, "105"), (1, "90"), (2, "80")):
+            snapshot = MarketPrice.objects.create(symbol="ETH", price=Decimal(price))
+            MarketPrice.objects.filter(id=snapshot.id).update(
+                timestamp=noon - timedelta(days=offset, minutes=int(price))
+            )
+        service = RollupService()
+        service._lock_watermark(service.PRICE_WATERMARK)
+
+        # savepoint, 2x watermark, 2x dirty buckets, bucket rows, prices,
+        # upsert, watermark save, release
+        with self.assertNumQueries(10):
+            self.assertEqual(service.refresh_price_rollups(), 3)
+
+        rollups = MarketPriceDailyRollup.objects.order_by("day")
+        self.assertEqual(
+            [(r.open, r.close) for r in rollups],
+            [
+                (Decimal("80"), Decimal("80")),
+                (Decimal("90"), Decimal("90")),
+                (Decimal("105"), Decimal("100")),
+            ],
+        )
+
+    @override_settings(ROLLUP_REPROCESS_WINDOW=0)
+    def test_price_rollup_picks_up_upserted_candles(self):
+        """Test a candle updated in place re-marks its bucket dirty."""
+        market = MarketDataService(client=mock.Mock())
+        candle = {"timestamp": 1700000000, "close": 100.0, "volume": 1.0}
+        market.ingest_candles("ETH", [candle])
+        service = RollupService()
+        service.refresh()
+
+        market.ingest_candles("ETH", [{**candle, "close": 130.0}])
+
+        self.assertEqual(service.refresh()["price_buckets"], 1)
+        rollup = MarketPriceDailyRollup.objects.get(symbol="ETH")
+        self.assertEqual(rollup.close, Decimal("130"))
+        self.assertEqual(rollup.samples, 1)
+        self.assertEqual(service.refresh()["price_buckets"], 0)
+
+    def test_report_reads_rollups(self):
+        """Test report metrics come from the rollups."""
+        self._result("BTC", "1000", "200", "0.2")
+        self._result("ETH", "1000", "3000", "3.0", lambos="1.5")
+        MarketPrice.objects.create(symbol="BTC", price=Decimal("50000"))
+        RollupService().refresh()
+
+        report = AnalyticsService().generate_report()
+        metrics = report["data"]["metrics"]
+
+        self.assertEqual(metrics["total_calculations"], 2)
+        self.assertEqual(metrics["profitable_ratio"], 1.0)
+        self.assertEqual(metrics["lambo_count"], 1)
+        self.assertEqual(metrics["risk_distribution"]["HIGH"], 1)
+        self.assertEqual(report["data"]["symbols"]["BTC"]["market"]["close"], 50000.0)
+
+        btc_only = AnalyticsService().generate_report(symbol="btc")
+        self.assertEqual(btc_only["data"]["metrics"]["total_calculations"], 1)
+
+
+class AnalyticsCachingTests(TestCase):
+    """Test report/prediction reuse across unchanged data."""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_report_reused_until_data_changes(self):
+        """Test identical reports do not insert new rows."""
+        service = AnalyticsService()
+        first = service.generate_report()
+        cache.clear()
+        second = service.generate_report()
+
+        self.assertEqual(first["id"], second["id"])
+        self.assertEqual(AnalysisReport.objects.count(), 1)
+
+        PortfolioResult.objects.create(
+            symbol="BTC",
+            investment=Decimal("1000"),
+            number_coins=Decimal("0.02"),
+            profit=Decimal("200"),
+            growth_factor=Decimal("0.2"),
+            lambos=Decimal("0"),
+        )
+        self.assertEqual(service.generate_report()["id"], first["id"])
+
+        RollupService().refresh()
+        third = service.generate_report()
+
+        self.assertNotEqual(third["fingerprint"], first["fingerprint"])
+        self.assertEqual(AnalysisReport.objects.count(), 2)
+
+    def test_covid_prediction_persisted_once(self):
+        """Test repeated predictions with identical content share one row."""
+        service = AnalyticsService()
+        service.get_covid_prediction()
+        cache.clear()
+        service.get_covid_prediction()
+
+        self.assertEqual(Prediction.objects.count(), 1)
+
+
+class PriceStreamTests(TestCase):
+    """Test broadcaster fan-out and the SSE price stream."""
+
+    async def test_broadcaster_fans_out_to_all_subscribers(self):
+        """Test one publish reaches every local subscriber."""
+        broadcaster = Broadcaster(queue_size=2)
+        first = broadcaster.subscribe("prices")
+        second = broadcaster.subscribe("prices")
+
+        broadcaster.publish("prices", {"symbol": "BTC", "price": "1"})
+        self.assertEqual((await first.get(timeout=1))["symbol"], "BTC")
+        self.assertEqual((await second.get(timeout=1))["symbol"], "BTC")
+
+        first.close()
+        self.assertEqual(broadcaster.subscriber_count("prices"), 1)
+        second.close()
+
+    async def test_slow_subscriber_keeps_latest_messages(self):
+        """Test a full queue drops the oldest message."""
+        broadcaster = Broadcaster(queue_size=2)
+        subscription = broadcaster.subscribe("prices")
+        for price in ("1", "2", "3"):
+            broadcaster.publish("prices", {"symbol": "BTC", "price": price})
+        await asyncio.sleep(0)
+
+        self.assertEqual((await subscription.get(timeout=1))["price"], "2")
+        self.assertEqual((await subscription.get(timeout=1))["price"], "3")
+        subscription.close()
+
+    async def test_redis_listener_reconnects_after_errors(self):
+        """Test existing subscribers keep receiving after a Redis error."""
+
+        class FakePubSub:
+            def __init__(self, *items):
+                self.items = items
+
+            def psubscribe(self, pattern):
+                pass
+
+            def listen(self):
+                for item in self.items:
+                    if isinstance(item, Exception):
+                        raise item
+                    yield item
+
+            def close(self):
+                pass
+
+        connections = [
+            FakePubSub(ConnectionError("Connection reset by peer")),
+            FakePubSub(
+                {"channel": b"dwml:prices", "data": b'{"symbol": "BTC", "price": "1"}'}
+            ),
+        ]
+        broadcaster = Broadcaster(redis_url="redis://broadcast")
+        broadcaster.reconnect_delay = 0.01
+        broadcaster._client = mock.Mock()
+        broadcaster._client.pubsub.side_effect = lambda **kwargs: (
+            connections.pop(0) if connections else FakePubSub()
+        )
+
+        subscription = broadcaster.subscribe("prices")
+        try:
+            message = await subscription.get(timeout=2)
+        finally:
+            broadcaster.close()
+            subscription.close()
+
+        self.assertEqual(message, {"symbol": "BTC", "price": "1"})
+
+    @override_settings(PRICE_STREAM_HEARTBEAT=1)
+    async def test_stream_pushes_filtered_prices(self):
+        """Test SSE stream sends cached price then matching live updates."""
+        cache.set("current_price:BTC", "50000", 60)
+        response = await AsyncClient().get("/api/price/stream/", {"symbols": "btc"})
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await anext(stream), b"retry: 3000\n\n")
+        self.assertIn(b'"price": "50000"', await anext(stream))
+
+        pending = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0.05)
+        get_broadcaster().publish("prices", {"symbol": "ETH", "price": "1"})
+        get_broadcaster().publish("prices", {"symbol": "BTC", "price": "51000"})
+        event = await asyncio.wait_for(pending, timeout=2)
+
+        data = json.loads(event.decode().split("data: ", 1)[1])
+        self.assertEqual(data, {"symbol": "BTC", "price": "51000"})
+        await response.streaming_content.aclose()
+
+    def test_stream_requires_asgi(self):
+        """Test the stream refuses to pin a sync worker."""
+        response = self.client.get("/api/price/stream/")
+        self.assertEqual(response.status_code, 501)
+
+
+class DomainMetricsTests(TestCase):
+    """Test domain Prometheus metrics are recorded."""
+
+    def setUp(self):
+        cache.clear()
+
+    @staticmethod
+    def sample(name, **labels):
+        from prometheus_client import REGISTRY
+
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    def test_cache_lookups_counted_per_family(self):
+        """Test hits and misses are labelled with the key family."""
+        hits = self.sample(
+            "domain_cache_lookups_total", family="current_price", result="hit"
+        )
+        misses = self.sample(
+            "domain_cache_lookups_total", family="opening_avg", result="miss"
+        )
+
+        cache.set("current_price:BTC", "50000", 60)
+        service = MarketDataService()
+        service.peek_current_price("BTC")
+        service.peek_opening_average("BTC")
+
+        self.assertEqual(
+            self.sample(
+                "domain_cache_lookups_total", family="current_price", result="hit"
+            ),
+            hits + 1,
+        )
+        self.assertEqual(
+            self.sample(
+                "domain_cache_lookups_total", family="opening_avg", result="miss"
+            ),
+            misses + 1,
+        )
+
+    def test_process_request_phases_timed(self):
+        """Test each process_request phase is observed."""
+        before = self.sample(
+            "domain_process_request_phase_seconds_count", phase="persist"
+        )
+        cache.set("opening_avg:BTC", "40000", 60)
+        cache.set("current_price:BTC", "50000", 60)
+
+        PortfolioService().process_request("BTC", Decimal("1000"))
+
+        for phase in ("opening_average", "current_price", "calculate"):
+            self.assertGreater(
+                self.sample("domain_process_request_phase_seconds_count", phase=phase),
+                0,
+            )
+        self.assertEqual(
+            self.sample("domain_process_request_phase_seconds_count", phase="persist"),
+            before + 1,
+        )
+
+    def test_celery_task_runtime_recorded(self):
+        """Test domain task executions observe runtime by final state."""
+        from .tasks import log_system_event_task
+
+        name = "domain.log_system_event"
+        before = self.sample(
+            "domain_celery_task_runtime_seconds_count", task=name, state="SUCCESS"
+        )
+
+        log_system_event_task.apply(args=["metrics_test", "INFO", {}])
+
+        self.assertEqual(
+            self.sample(
+                "domain_celery_task_runtime_seconds_count", task=name, state="SUCCESS"
+            ),
+            before + 1,
+        )
+
+
+class CacheWarmupTests(TestCase):
+    """Test the cache warm-up preloads read caches in bulk."""
+
+    def setUp(self):
+        cache.clear()
+
+    def create_result(self, symbol="BTC"):
+        return PortfolioResult.objects.create(
+            symbol=symbol,
+            investment=Decimal("1000"),
+            number_coins=Decimal("0.02"),
+            profit=Decimal("200"),
+            growth_factor=Decimal("0.2"),
+            lambos=Decimal("0"),
+        )
+
+    def test_warm_preloads_latest_values_and_results(self):
+        """Test latest averages, fresh prices and recent results are cached."""
+        OpeningAverage.objects.create(symbol="BTC", average=Decimal("30000"))
+        OpeningAverage.objects.create(symbol="BTC", average=Decimal("40000"))
+        MarketPrice.objects.create(symbol="BTC", price=Decimal("50000"))
+        stale = MarketPrice.objects.create(symbol="ETH", price=Decimal("3000"))
+        MarketPrice.objects.filter(id=stale.id).update(
+            timestamp=stale.timestamp - timedelta(minutes=10),
+            updated_at=stale.updated_at - timedelta(minutes=10),
+        )
+        result = self.create_result()
+
+        with self.assertNumQueries(3):
+            stats = CacheWarmupService().warm(symbols=["btc", "eth"])
+
+        self.assertEqual(stats["opening_averages"], 1)
+        self.assertEqual(stats["prices"], 1)
+        self.assertEqual(stats["results"], 1)
+        self.assertFalse(stats["timed_out"])
+        self.assertEqual(cache.get("opening_avg:BTC"), "40000.00000000")
+        self.assertIsNone(cache.get("current_price:ETH"))
+        with self.assertNumQueries(0):
+            service = PortfolioService()
+            self.assertIsNotNone(service.get_result_version(result.id))
+            self.assertEqual(service.get_result(result.id).id, result.id)
+            self.assertEqual(
+                MarketDataService().get_current_price("BTC"), Decimal("50000.00000000")
+            )
+
+    def test_time_cap_skips_remaining_steps(self):
+        """Test steps past the deadline are skipped, not run."""
+        ticks = iter(range(0, 100, 5))
+        service = CacheWarmupService(clock=lambda: next(ticks))
+
+        stats = service.warm(symbols=["BTC"], max_seconds=12)
+
+        self.assertIn("opening_averages", stats)
+        self.assertEqual(stats["skipped"], ["prices", "results"])
+        self.assertTrue(stats["timed_out"])
+
+    def test_fetch_missing_uses_client_for_uncached_values(self):
+        """Test only values missing after the bulk load are fetched."""
+        OpeningAverage.objects.create(symbol="BTC", average=Decimal("40000"))
+        client = mock.Mock()
+        client.get_latest_candle.return_value = {
+            "timestamp": 1700000000,
+            "close": 50000.0,
+            "volume": 2.5,
+        }
+        market = MarketDataService(client=client)
+
+        stats = CacheWarmupService(market_service=market).warm(
+            symbols=["BTC"], fetch_missing=True
+        )
+
+        self.assertEqual(stats["fetched"], 1)
+        client.get_historical_ohlc.assert_not_called()
+        client.get_latest_candle.assert_called_once_with("BTC")
+
+    def test_warm_cache_command(self):
+        """Test the management command reports what it warmed."""
+        self.create_result()
+        out = io.StringIO()
+
+        call_command("warm_cache", "--symbols", "BTC", stdout=out)
+
+        self.assertIn("results=1", out.getvalue())
+
+    def test_result_cache_invalidated(self):
+        """Test edited results are not served from a stale cache entry."""
+        result = self.create_result()
+        service = PortfolioService()
+        service.get_result(result.id)
+        PortfolioResult.objects.filter(id=result.id).update(profit=Decimal("1"))
+
+        service.invalidate_results([result.id])
+
+        self.assertEqual(service.get_result(result.id).profit, Decimal("1"))
+
+
+class BatchProcessingTests(TestCase):
+    """Test grouped, bulk-inserted batch portfolio processing."""
+
+    def setUp(self):
+        cache.clear()
+        self.market = mock.Mock()
+        self.market.get_opening_average.return_value = Decimal("40000")
+        self.market.get_current_price.return_value = Decimal("50000")
+        self.service = PortfolioService(market_service=self.market)
+
+    def test_calculate_many_matches_calculate(self):
+        """Test the batch calculation gives the per-item results."""
+        calculator = PortfolioCalculator()
+        investments = [Decimal("100"), Decimal("1234.56"), Decimal("99999")]
+
+        rows = calculator.calculate_many(
+            investments, Decimal("40000"), Decimal("30000")
+        )
+
+        self.assertEqual(
+            rows,
+            [
+                calculator.calculate(investment, Decimal("40000"), Decimal("30000"))
+                for investment in investments
+            ],
+        )
+
+    def test_prices_resolved_once_per_symbol(self):
+        """Test configs are grouped and results kept in input order."""
+        configs = [
+            {"symbol": "btc", "investment": 1000},
+            {"symbol": "ETH", "investment": 2000},
+            {"symbol": "BTC", "investment": 0},
+            {"symbol": "BTC", "investment": 3000},
+            {"investment": 100},
+        ]
+
+        with mock.patch.object(PortfolioService, "BATCH_CHUNK_SIZE", 1):
+            summary = self.service.process_batch(configs)
+
+        self.assertEqual(self.market.get_opening_average.call_count, 2)
+        self.assertEqual(self.market.get_current_price.call_count, 2)
+        self.assertEqual(summary["processed"], 3)
+        self.assertEqual([row["index"] for row in summary["results"]], [0, 1, 3])
+        self.assertEqual([row["index"] for row in summary["error_details"]], [2, 4])
+        self.assertEqual(PortfolioResult.objects.count(), 3)
+        self.assertEqual(
+            PortfolioLog.objects.filter(action="batch_processed").count(), 3
+        )
+
+    def test_failed_chunk_reported_per_item(self):
+        """Test a chunk whose insert fails is reported; other chunks are kept."""
+        configs = [{"symbol": "BTC", "investment": 100 + i} for i in range(5)]
+        bulk_create = PortfolioResult.objects.bulk_create
+        calls = []
+
+        def flaky_bulk_create(objs, **kwargs):
+            calls.append(objs)
+            if len(calls) == 2:
+                raise DatabaseError("disk full")
+            return bulk_create(objs, **kwargs)
+
+        with (
+            mock.patch.object(PortfolioService, "BATCH_CHUNK_SIZE", 2),
+            mock.patch.object(
+                PortfolioResult.objects, "bulk_create", side_effect=flaky_bulk_create
+            ),
+        ):
+            summary = self.service.process_batch(configs)
+
+        self.assertEqual(summary["processed"], 3)
+        self.assertEqual([row["index"] for row in summary["results"]], [0, 1, 4])
+        self.assertEqual([row["index"] for row in summary["error_details"]], [2, 3])
+        self.assertEqual(
+            summary["error_details"][0]["error"], "Failed to store result: disk full"
+        )
+        self.assertEqual(PortfolioResult.objects.count(), 3)
+        self.assertEqual(
+            PortfolioLog.objects.filter(action="batch_processed").count(), 2
+        )
+
+    def test_bulk_insert_query_count(self):
+        """Test a chunk costs a bulk insert and one audit log."""
+        configs = [{"symbol": "BTC", "investment": 100 + i} for i in range(50)]
+
+        with self.assertNumQueries(4):  # savepoint, insert, log, release
+            summary = self.service.process_batch(configs)
+
+        self.assertEqual(summary["processed"], 50)
+        result = PortfolioResult.objects.get(id=summary["results"][0]["result_id"])
+        self.assertEqual(result.investment, Decimal("100"))
+
+    def test_unresolved_symbol_fails_its_items(self):
+        """Test items of a symbol without prices are reported, not raised."""
+        self.market.get_current_price.side_effect = lambda symbol: (
+            None if symbol == "XRP" else Decimal("50000")
+        )
+
+        summary = self.service.process_batch(
+            [{"symbol": "XRP", "investment": 100}, {"symbol": "BTC", "investment": 100}]
+        )
+
+        self.assertEqual(summary["processed"], 1)
+        self.assertEqual(
+            summary["error_details"][0]["error"], "Price data not available for XRP"
+        )
+
+    @override_settings(PORTFOLIO_BATCH_TASK_SIZE=2)
+    def test_large_batch_split_into_chunk_tasks(self):
+        """Test large batches fan out with prices resolved by the parent."""
+        from .tasks import batch_process_portfolios_task
+
+        configs = [{"symbol": "BTC", "investment": 100 + i} for i in range(5)]
+        with (
+            mock.patch("domain.services.MarketDataService", return_value=self.market),
+            mock.patch("domain.tasks.chord") as chord,
+        ):
+            chord.return_value.return_value.id = "merged"
+            summary = batch_process_portfolios_task.apply(args=[configs]).get()
+
+        header = chord.call_args.args[0]
+        self.assertEqual(summary["chunks"], 3)
+        self.assertEqual(summary["result_id"], "merged")
+        self.assertEqual(summary["chunk_ids"], [sig.id for sig in header])
+        self.assertEqual(len(set(summary["chunk_ids"])), 3)
+        self.assertEqual([sig.args[3] for sig in header], [0, 2, 4])
+        self.assertEqual(header[0].args[1], {"BTC": ["40000", "50000"]})
+        self.assertEqual(PortfolioResult.objects.count(), 0)
+
+    def test_chunk_results_merged_in_order(self):
+        """Test chunk subtasks keep global indexes through the merge."""
+        from .tasks import merge_batch_results_task, process_portfolio_chunk_task
+
+        prices = {"BTC": ["40000", "50000"]}
+        with mock.patch.object(process_portfolio_chunk_task, "update_state"):
+            chunks = [
+                process_portfolio_chunk_task.apply(
+                    args=[[{"symbol": "BTC", "investment": 100}] * 2, prices, {}, i]
+                ).get()
+                for i in (2, 0)
+            ]
+
+        merged = merge_batch_results_task.apply(args=[chunks]).get()
+
+        self.assertEqual(merged["total"], 4)
+        self.assertEqual([row["index"] for row in merged["results"]], [0, 1, 2, 3])
+
+    def test_progress_updates_rate_limited(self):
+        """Test progress is published per interval, plus on completion."""
+        from .tasks import _ProgressReporter
+
+        task = mock.Mock()
+        reporter = _ProgressReporter(task, total=3)
+        for done in (1, 2, 3):
+            reporter(done, done)
+
+        task.update_state.assert_called_once()
+        self.assertEqual(task.update_state.call_args.kwargs["meta"]["percent"], 100)
+
+
+class SymbolRegistryTests(TestCase):
+    """Test the tracked-symbol registry, promotion and refresh schedule."""
+
+    def setUp(self):
+        cache.clear()
+        caches["shared"].clear()
+        SymbolRegistry.invalidate()
+        self.market = mock.Mock()
+        self.market.refresh_current_price.return_value = Decimal("50000")
+        self.registry = SymbolRegistry(self.market)
+
+    def test_seeded_symbols_served_from_snapshot(self):
+        """Test the migration seeds the registry and reads are cached."""
+        TrackedSymbol.objects.filter(symbol="XRP").update(priority=5)
+        TrackedSymbol.objects.filter(symbol="ADA").update(enabled=False)
+
+        self.assertEqual(self.registry.symbols(), ["XRP", "BTC", "ETH", "SOL"])
+        with self.assertNumQueries(0):
+            self.assertEqual(SymbolRegistry().symbols()[0], "XRP")
+
+    @override_settings(SYMBOL_PROMOTION_THRESHOLD=3)
+    def test_frequent_symbol_promoted_once(self):
+        """Test a symbol is added when it crosses the request threshold."""
+        promoted = [self.registry.record_request("doge") for _ in range(4)]
+
+        self.assertEqual(promoted, [False, False, True, False])
+        entry = TrackedSymbol.objects.get(symbol="DOGE")
+        self.assertTrue(entry.auto_promoted)
+        self.assertIn("DOGE", self.registry.symbols())
+
+    @override_settings(SYMBOL_PROMOTION_THRESHOLD=1)
+    def test_promotion_keeps_disabled_symbols_disabled(self):
+        """Test promotion never overrides an admin's decision."""
+        TrackedSymbol.objects.filter(symbol="ADA").update(enabled=False)
+
+        self.assertFalse(self.registry.record_request("ADA"))
+        self.assertFalse(TrackedSymbol.objects.get(symbol="ADA").enabled)
+
+    @override_settings(SYMBOL_PROMOTION_THRESHOLD=1)
+    def test_process_request_feeds_promotion(self):
+        """Test successful calculations count towards promotion."""
+        cache.set("opening_avg:DOGE", "0.1", 60)
+        cache.set("current_price:DOGE", "0.2", 60)
+
+        PortfolioService().process_request("DOGE", Decimal("100"))
+
+        self.assertTrue(TrackedSymbol.objects.filter(symbol="DOGE").exists())
+
+    @override_settings(SYMBOL_PROMOTION_THRESHOLD=2, SYMBOL_HOT_REFRESH_INTERVAL=60)
+    def test_hot_symbols_refreshed_first_and_more_often(self):
+        """Test due selection honours hotness, priority and the budget."""
+        recently = timezone.now() - timedelta(seconds=120)
+        TrackedSymbol.objects.update(last_refreshed_at=recently)
+        TrackedSymbol.objects.filter(symbol="SOL").update(last_refreshed_at=None)
+        for _ in range(2):
+            self.registry.record_request("ETH")
+
+        self.assertEqual([e.symbol for e in self.registry.due()], ["ETH", "SOL"])
+
+        summary = self.registry.refresh_due(budget=1)
+
+        self.assertEqual(summary["refreshed"], ["ETH"])
+        self.assertEqual(summary["deferred"], ["SOL"])
+        self.market.refresh_current_price.assert_called_once_with("ETH")
+        self.assertEqual([e.symbol for e in self.registry.due()], ["SOL"])
+
+
+class CeleryRoutingTests(TestCase):
+    """Test task routing, priorities and per-queue worker pools."""
+
+    def test_tasks_routed_by_latency_class(self):
+        """Test price refreshes and bulk jobs land on different queues."""
+        from config.celery import app
+
+        router = app.amqp.router
+        realtime = router.route({}, "domain.refresh_due_symbols")
+        batch = router.route({}, "domain.batch_process_portfolios")
+
+        self.assertEqual(realtime["queue"].name, "realtime")
+        self.assertEqual(realtime["priority"], 0)
+        self.assertEqual(batch["queue"].name, "batch")
+        self.assertEqual(router.route({}, "debug_task")["queue"].name, "maintenance")
+
+    def test_single_queue_worker_gets_pool_settings(self):
+        """Test pool defaults apply unless given on the command line."""
+        from config.celery import configure_worker_pool
+
+        conf = mock.Mock(worker_concurrency=None, worker_prefetch_multiplier=4)
+        configure_worker_pool(
+            conf=conf, options={"queues": ["batch"], "concurrency": 8}
+        )
+
+        self.assertIsNone(conf.worker_concurrency)
+        self.assertEqual(conf.worker_prefetch_multiplier, 1)
+
+        conf = mock.Mock(worker_concurrency=None)
+        configure_worker_pool(conf=conf, options={"queues": "realtime,batch"})
+        self.assertIsNone(conf.worker_concurrency)
+
+    def test_queue_depths_command(self):
+        """Test waiting messages are counted per queue."""
+        from kombu import Connection
+
+        connection = Connection("memory://")
+        queue = settings.CELERY_TASK_QUEUES[1]
+        with connection.Producer() as producer:
+            for _ in range(3):
+                producer.publish(
+                    {},
+                    exchange=queue.exchange,
+                    routing_key=queue.routing_key,
+                    declare=[queue],
+                )
+        out = io.StringIO()
+
+        with mock.patch(
+            "domain.management.commands.queue_depths.app.connection_for_read",
+            return_value=connection,
+        ):
+            call_command("queue_depths", stdout=out)
+
+        lines = {
+            line.split()[0]: line.split()[1:] for line in out.getvalue().splitlines()
+        }
+        self.assertEqual(lines["batch"][0], "3")
+        self.assertEqual(lines["realtime"][0], "0")
+
+
+class LargeTableAdminTests(TestCase):
+    """Test the bounded changelists of the time-series tables."""
+
+    url = "/admin/domain/portfolioresult/"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = User.objects.create_superuser("ops", "ops@example.com", "pw")
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin_user)
+        self.results = [
+            PortfolioResult.objects.create(
+                symbol=("BTC", "ETH")[i % 2],
+                investment=Decimal("100"),
+                number_coins=Decimal("1"),
+                profit=Decimal(i),
+                growth_factor=Decimal("0.1"),
+                lambos=Decimal("0"),
+            )
+            for i in range(5)
+        ]
+
+    def changelist(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.context["cl"]
+
+    @mock.patch.object(EstimatedCountPaginator, "exact_limit", 3)
+    def test_count_is_capped(self):
+        """Test large result sets are not counted exactly."""
+        with mock.patch.object(PortfolioResultAdmin, "list_per_page", 2):
+            cl = self.changelist()
+
+        self.assertEqual(cl.result_count, 4)
+        self.assertTrue(cl.paginator.estimated)
+        self.assertIsNone(cl.full_result_count)
+
+    def test_keyset_paging(self):
+        """Test Older links page by primary key."""
+        with mock.patch.object(PortfolioResultAdmin, "list_per_page", 2):
+            first = self.changelist()
+            self.assertEqual(first.older_url(), f"?before={self.results[3].pk}")
+            second = self.changelist(before=self.results[3].pk)
+
+        self.assertEqual(
+            [r.pk for r in second.result_list],
+            [self.results[2].pk, self.results[1].pk],
+        )
+        self.assertEqual(second.newest_url(), "?")
+        response = self.client.get(self.url, {"before": "abc"})
+        self.assertEqual(response.status_code, 302)  # admin's ?e=1 redirect
+
+    def test_period_filter_defaults_to_recent_rows(self):
+        """Test old rows need an explicit period or date drill-down."""
+        old = self.results[0]
+        old_date = timezone.now() - timedelta(days=30)
+        PortfolioResult.objects.filter(pk=old.pk).update(generation_date=old_date)
+
+        self.assertNotIn(old, self.changelist().result_list)
+        self.assertIn(old, self.changelist(period="all").result_list)
+        drill_down = self.changelist(
+            generation_date__year=old_date.year,
+            generation_date__month=old_date.month,
+        )
+        self.assertIn(old, drill_down.result_list)
+
+    def test_symbol_filter_choices_are_cached(self):
+        """Test symbol choices come from small tables, once per TTL."""
+        RollupService().refresh()
+        self.changelist()
+
+        with self.assertNumQueries(0):
+            choices = SymbolFilter(None, {}, PortfolioResult, None).lookup_choices
+        self.assertIn(("ETH", "ETH"), choices)
+        self.assertEqual(
+            [r.symbol for r in self.changelist(symbol="ETH").result_list],
+            ["ETH", "ETH"],
+        )
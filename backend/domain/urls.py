@@ -12,12 +12,21 @@ urlpatterns = [
     # Portfolio results
     path("results/", views.result_list, name="result-list"),
     path("results/<int:result_id>/", views.result_detail, name="result-detail"),
+    # Background jobs (submit returns 202, then poll the status URL)
+    path("jobs/portfolio/", views.submit_portfolio_job, name="job-portfolio"),
+    path("jobs/batch/", views.submit_batch_job, name="job-batch"),
+    path("jobs/<uuid:task_id>/", views.job_status, name="job-status"),
     # Logs
     path("logs/", views.log_list, name="log-list"),
     # Market data
     path("price/current/", views.current_price, name="current-price"),
     path("price/opening/", views.opening_average, name="opening-average"),
     path("price/history/", views.price_history, name="price-history"),
+    path("price/stream/", views.price_stream, name="price-stream"),
+    # Bulk exports (streaming NDJSON/CSV)
+    path("export/results/", views.export_results, name="export-results"),
+    path("export/logs/", views.export_logs, name="export-logs"),
+    path("export/prices/", views.export_prices, name="export-prices"),
     # Analytics
     path("analytics/covid/", views.covid_prediction, name="covid-prediction"),
     path("analytics/report/", views.analytics_report, name="analytics-report"),
@@ -1,21 +1,115 @@
 """Domain views - all API endpoints in one place."""
 
+import json
+import re
+import time
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.dateparse import parse_datetime
 from drf_spectacular.utils import extend_schema
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
+from shared.broadcast import get_broadcaster
+from shared.http_cache import conditional, conditional_response, content_fingerprint
+from shared.query_budget import query_budget
 
 from .serializers import (
+    BatchJobRequestSerializer,
     CalculationRequestSerializer,
     ErrorResponseSerializer,
+    ExportRequestSerializer,
+    JobSerializer,
     MarketPriceSerializer,
     OpeningAverageSerializer,
     PortfolioLogSerializer,
+    PortfolioResultFastSerializer,
     PortfolioResultSerializer,
     PriceRequestSerializer,
+    StreamingExportEncoder,
 )
-from .services import AnalyticsService, MarketDataService, PortfolioService
+from .services import (
+    AnalyticsService,
+    ExportService,
+    JobService,
+    MarketDataService,
+    PortfolioService,
+)
+
+
+def _etag(request, kind: str, **params) -> str:
+    """ETag from the negotiated media type, normalized parameters and version."""
+    media_type = getattr(request, "accepted_media_type", None)
+    return f"{kind}:{content_fingerprint([media_type, params])}"
+
+
+def _symbol_param(request, default: str = "") -> Optional[str]:
+    symbol = request.query_params.get("symbol", default).upper().strip()
+    return symbol or None
+
+
+def _risk_level_param(request) -> Optional[str]:
+    return request.query_params.get("risk_level", "").upper().strip() or None
+
+
+def _limit_param(request) -> Optional[int]:
+    try:
+        return int(request.query_params.get("limit", 100))
+    except ValueError:
+        return None  # the view rejects it
+
+
+def _result_list_etag(request):
+    symbol = _symbol_param(request)
+    risk_level = _risk_level_param(request)
+    version = PortfolioService().get_results_version(
+        symbol=symbol, risk_level=risk_level
+    )
+    return _etag(
+        request,
+        "results",
+        symbol=symbol,
+        risk_level=risk_level,
+        limit=_limit_param(request),
+        version=version,
+    )
+
+
+def _result_detail_etag(request, result_id: int):
+    version = PortfolioService().get_result_version(result_id)
+    return _etag(request, "result", version=version) if version else None
+
+
+def _price_history_etag(request):
+    symbol = _symbol_param(request, "BTC")
+    limit = _limit_param(request)
+    version = MarketDataService().get_price_history_version(symbol or "", limit)
+    return _etag(request, "history", symbol=symbol, limit=limit, version=version)
+
+
+def _current_price_etag(request):
+    symbol = _symbol_param(request)
+    price = MarketDataService().peek_current_price(symbol or "")
+    return (
+        _etag(request, "price", symbol=symbol, price=price)
+        if price is not None
+        else None
+    )
+
+
+def _opening_average_etag(request):
+    symbol = _symbol_param(request)
+    average = MarketDataService().peek_opening_average(symbol or "")
+    return (
+        _etag(request, "opening", symbol=symbol, average=average) if average else None
+    )
+
 
 # ============================================================================
 # PORTFOLIO ENDPOINTS (including main process_request)
@@ -54,24 +148,108 @@ def process_request(request):
     return Response(response_serializer.data, status=status.HTTP_200_OK)
 
 
+# ============================================================================
+# BACKGROUND JOBS
+# ============================================================================
+
+
+def _job_accepted(request, task_id: str) -> Response:
+    status_url = request.build_absolute_uri(
+        reverse("domain:job-status", args=[task_id])
+    )
+    return Response(
+        {"task_id": task_id, "status_url": status_url},
+        status=status.HTTP_202_ACCEPTED,
+        headers={"Location": status_url},
+    )
+
+
+@extend_schema(
+    request=CalculationRequestSerializer,
+    responses={202: JobSerializer, 400: ErrorResponseSerializer},
+)
+@api_view(["POST"])
+@permission_classes([AllowAny])
+def submit_portfolio_job(request):
+    """Queue a portfolio calculation; poll the returned status URL."""
+    serializer = CalculationRequestSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+
+    task_id = JobService().submit_portfolio(
+        symbol=serializer.validated_data["symbol"],
+        investment=serializer.validated_data["investment"],
+    )
+    return _job_accepted(request, task_id)
+
+
+@extend_schema(
+    request=BatchJobRequestSerializer,
+    responses={202: JobSerializer, 400: ErrorResponseSerializer},
+)
+@api_view(["POST"])
+@permission_classes([AllowAny])
+def submit_batch_job(request):
+    """Queue a batch of portfolio calculations (backtests, bulk jobs)."""
+    serializer = BatchJobRequestSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+
+    task_id = JobService().submit_batch(serializer.validated_data["portfolios"])
+    return _job_accepted(request, task_id)
+
+
+@extend_schema(responses={200: JobSerializer})
+@api_view(["GET"])
+@permission_classes([AllowAny])
+@query_budget(max_queries=0)
+def job_status(request, task_id):
+    """State of a submitted job, with progress or its result."""
+    job = JobService().get_status(str(task_id))
+    response = Response(job)
+    if job["state"] not in JobService.FINAL_STATES:
+        response["Retry-After"] = str(settings.JOB_STATUS_CACHE_TTL)
+    return response
+
+
+# ============================================================================
+# RESULTS
+# ============================================================================
+
+
 @extend_schema(responses={200: PortfolioResultSerializer(many=True)})
 @api_view(["GET"])
 @permission_classes([AllowAny])
+@query_budget(max_queries=3)
+@conditional(_result_list_etag, max_age=0)
 def result_list(request):
-    """List portfolio calculation results."""
-    symbol = request.query_params.get("symbol")
+    """
+    List portfolio calculation results.
+
+    Uses the fast path: ``.values()`` rows with SQL-derived fields, no
+    model instances or DRF fields (same output as
+    PortfolioResultSerializer(many=True)).
+    ``?risk_level=HIGH`` filters on the derived risk level.
+    """
+    symbol = _symbol_param(request)
+    risk_level = _risk_level_param(request)
     limit = int(request.query_params.get("limit", 100))
 
     service = PortfolioService()
-    results = service.get_results(symbol=symbol, limit=limit)
+    rows = service.get_result_rows(
+        PortfolioResultFastSerializer.FIELDS,
+        symbol=symbol,
+        limit=limit,
+        risk_level=risk_level,
+    )
 
-    serializer = PortfolioResultSerializer(results, many=True)
+    serializer = PortfolioResultFastSerializer(rows)
     return Response(serializer.data)
 
 
 @extend_schema(responses={200: PortfolioResultSerializer})
 @api_view(["GET"])
 @permission_classes([AllowAny])
+@query_budget(max_queries=3)
+@conditional(_result_detail_etag, max_age=MarketDataService.CACHE_TTL_OPENING)
 def result_detail(request, result_id: int):
     """Get specific portfolio result."""
     service = PortfolioService()
@@ -84,6 +262,7 @@ def result_detail(request, result_id: int):
 @extend_schema(responses={200: PortfolioLogSerializer(many=True)})
 @api_view(["GET"])
 @permission_classes([AllowAny])
+@query_budget(max_queries=2)
 def log_list(request):
     """List portfolio audit logs."""
     from .models import PortfolioLog
@@ -110,6 +289,8 @@ def log_list(request):
 )
 @api_view(["GET"])
 @permission_classes([AllowAny])
+@query_budget(max_queries=3)
+@conditional(_current_price_etag, max_age=MarketDataService.CACHE_TTL_CURRENT)
 def current_price(request):
     """Get current price for a cryptocurrency."""
     serializer = PriceRequestSerializer(data=request.query_params)
@@ -128,6 +309,8 @@ def current_price(request):
 )
 @api_view(["GET"])
 @permission_classes([AllowAny])
+@query_budget(max_queries=3)
+@conditional(_opening_average_etag, max_age=MarketDataService.CACHE_TTL_OPENING)
 def opening_average(request):
     """Get opening average price for a cryptocurrency."""
     serializer = PriceRequestSerializer(data=request.query_params)
@@ -143,9 +326,11 @@ def opening_average(request):
 @extend_schema(responses={200: MarketPriceSerializer(many=True)})
 @api_view(["GET"])
 @permission_classes([AllowAny])
+@query_budget(max_queries=3)
+@conditional(_price_history_etag, max_age=MarketDataService.CACHE_TTL_CURRENT)
 def price_history(request):
     """Get price history for a cryptocurrency."""
-    symbol = request.query_params.get("symbol", "BTC")
+    symbol = _symbol_param(request, "BTC") or ""
     limit = int(request.query_params.get("limit", 100))
 
     service = MarketDataService()
@@ -155,6 +340,73 @@ def price_history(request):
     return Response(serializer.data)
 
 
+SYMBOL_PATTERN = re.compile(r"^[A-Z0-9]{2,10}$")
+
+
+async def price_stream(request):
+    """
+    Stream price updates as Server-Sent Events.
+
+    ``?symbols=BTC,ETH`` filters the stream (all symbols when omitted).
+    Clients first receive the cached prices, then every price published by
+    MarketDataService in any process. Connections are closed after
+    PRICE_STREAM_MAX_SECONDS and clients reconnect via the SSE retry hint.
+    Requires an ASGI server; a sync worker would be pinned per client.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {
+                "error": "Price streaming requires an ASGI server",
+                "code": "ASGIRequired",
+            },
+            status=status.HTTP_501_NOT_IMPLEMENTED,
+        )
+
+    raw = request.GET.get("symbols", "")
+    symbols = {s.strip().upper() for s in raw.split(",") if s.strip()}
+    invalid = sorted(s for s in symbols if not SYMBOL_PATTERN.match(s))
+    if invalid:
+        return JsonResponse(
+            {
+                "error": f"Invalid symbols: {', '.join(invalid)}",
+                "code": "ValidationError",
+            },
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    async def events():
+        deadline = time.monotonic() + settings.PRICE_STREAM_MAX_SECONDS
+        subscription = get_broadcaster().subscribe("prices")
+        try:
+            yield "retry: 3000\n\n"
+
+            if symbols:
+                cached = await cache.aget_many([f"current_price:{s}" for s in symbols])
+                for key, price in sorted(cached.items()):
+                    payload = {"symbol": key.split(":", 1)[1], "price": price}
+                    yield f"event: price\ndata: {json.dumps(payload)}\n\n"
+
+            while time.monotonic() < deadline:
+                message = await subscription.get(
+                    timeout=min(
+                        settings.PRICE_STREAM_HEARTBEAT, deadline - time.monotonic()
+                    )
+                )
+                if message is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                if symbols and message.get("symbol") not in symbols:
+                    continue
+                yield f"event: price\ndata: {json.dumps(message)}\n\n"
+        finally:
+            subscription.close()
+
+    response = StreamingHttpResponse(events(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
 # ============================================================================
 # ANALYTICS ENDPOINTS
 # ============================================================================
@@ -164,22 +416,108 @@ def price_history(request):
 @api_view(["GET"])
 @permission_classes([AllowAny])
 def covid_prediction(request):
-    """Get COVID-19 impact prediction."""
+    """Get COVID-19 impact prediction (supports conditional GET)."""
     service = AnalyticsService()
     prediction = service.get_covid_prediction()
-    return Response(prediction)
+    return conditional_response(
+        request,
+        prediction,
+        etag=prediction["fingerprint"],
+        last_modified=parse_datetime(prediction["created_at"]),
+    )
 
 
 @extend_schema(responses={200: dict})
 @api_view(["GET"])
 @permission_classes([AllowAny])
 def analytics_report(request):
-    """Generate analytics report."""
+    """Generate analytics report (supports conditional GET)."""
     symbol = request.query_params.get("symbol")
 
     service = AnalyticsService()
     report = service.generate_report(symbol=symbol)
-    return Response(report)
+    return conditional_response(
+        request,
+        report,
+        etag=report["fingerprint"],
+        last_modified=parse_datetime(report["created_at"]),
+    )
+
+
+# ============================================================================
+# BULK EXPORT ENDPOINTS
+# ============================================================================
+
+
+def _streaming_export(name, params, fields, rows, represent=None):
+    """Wrap a lazy row iterator in a streaming NDJSON/CSV response."""
+    encoder = StreamingExportEncoder(params["output"], fields, represent=represent)
+    response = StreamingHttpResponse(
+        encoder.stream(rows), content_type=encoder.content_type
+    )
+    response["Content-Disposition"] = (
+        f'attachment; filename="{name}.{params["output"]}"'
+    )
+    return response
+
+
+@extend_schema(parameters=[ExportRequestSerializer], responses={200: bytes})
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def export_results(request):
+    """Stream portfolio results for a time range as NDJSON or CSV."""
+    serializer = ExportRequestSerializer(data=request.query_params)
+    serializer.is_valid(raise_exception=True)
+    params = serializer.validated_data
+
+    rows = ExportService().iter_results(
+        PortfolioResultFastSerializer.FIELDS,
+        symbol=params.get("symbol"),
+        since=params.get("since"),
+        until=params.get("until"),
+    )
+    fast = PortfolioResultFastSerializer(rows)
+    return _streaming_export(
+        "results",
+        params,
+        PortfolioResultFastSerializer.OUTPUT_FIELDS,
+        rows,
+        represent=fast.to_representation,
+    )
+
+
+@extend_schema(parameters=[ExportRequestSerializer], responses={200: bytes})
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def export_logs(request):
+    """Stream portfolio audit logs for a time range as NDJSON or CSV."""
+    serializer = ExportRequestSerializer(data=request.query_params)
+    serializer.is_valid(raise_exception=True)
+    params = serializer.validated_data
+
+    rows = ExportService().iter_logs(
+        symbol=params.get("symbol"),
+        since=params.get("since"),
+        until=params.get("until"),
+    )
+    return _streaming_export("logs", params, ExportService.LOG_FIELDS, rows)
+
+
+@extend_schema(parameters=[ExportRequestSerializer], responses={200: bytes})
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def export_prices(request):
+    """Stream market price snapshots for a time range as NDJSON or CSV."""
+    serializer = ExportRequestSerializer(data=request.query_params)
+    serializer.is_valid(raise_exception=True)
+    params = serializer.validated_data
+
+    rows = ExportService().iter_prices(
+        symbol=params.get("symbol"),
+        since=params.get("since"),
+        until=params.get("until"),
+    )
+    return _streaming_export("prices", params, ExportService.PRICE_FIELDS, rows)
 
 
 # ============================================================================
@@ -0,0 +1,38 @@
+"""
+Gunicorn configuration.
+
+Prometheus multiprocess mode: when PROMETHEUS_MULTIPROC_DIR is set each
+worker writes its metric samples there and /metrics aggregates them, so
+counters and histograms are correct no matter which worker is scraped.
+
+Workers serve the ASGI application (config.asgi) through uvicorn, so the
+async price stream holds no thread per client; sync views still run one
+at a time per worker, as with sync workers.
+"""
+
+import os
+import shutil
+
+bind = "0.0.0.0:8080"
+workers = int(os.environ.get("GUNICORN_WORKERS", 3))
+worker_class = "uvicorn_worker.UvicornWorker"
+timeout = 30
+keepalive = 2
+max_requests = 1000
+max_requests_jitter = 100
+
+
+def on_starting(server):
+    """Start every master with an empty metrics directory."""
+    path = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if path:
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    """Drop live gauges of workers that exited (recycled or crashed)."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
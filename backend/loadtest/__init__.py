@@ -0,0 +1 @@
+"""Load-testing harness: stub Kraken server and load generator."""
@@ -0,0 +1,249 @@
+"""
+Concurrent load generator for the API.
+
+Drives a weighted mix of ``/process_request/``, ``/price/current/`` and
+``/results/`` and reports throughput, latency percentiles and error rates
+per endpoint. Point the API at ``loadtest.stub_kraken`` first so cache
+misses never reach the real exchange.
+
+Usage (from backend/):
+    python -m loadtest.loadgen --url http://127.0.0.1:8000/api \\
+        --concurrency 20 --duration 60 --mix read-heavy
+
+Throttling: the default anonymous rate (100/hour) turns most of a load
+test into 429s; raise it on the server, e.g. THROTTLE_RATE_ANON=100000/min.
+"""
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import requests
+
+SYMBOLS = ["BTC", "ETH", "ADA", "SOL", "XRP"]
+
+# Scenario name -> weight, per mix.
+MIXES: Dict[str, Dict[str, int]] = {
+    # Browsing users: mostly cached reads, occasional calculation.
+    "read-heavy": {"price_current": 60, "results": 30, "process_request": 10},
+    "balanced": {"price_current": 40, "results": 30, "process_request": 30},
+    # Calculation bursts (campaigns): write path and cache misses dominate.
+    "write-heavy": {"price_current": 20, "results": 10, "process_request": 70},
+}
+
+
+def _process_request(session, base_url, rng) -> requests.Response:
+    return session.post(
+        f"{base_url}/process_request/",
+        json={
+            "symbol": rng.choice(SYMBOLS),
+            "investment": rng.choice([100, 500, 1000, 5000, 25000]),
+        },
+        timeout=30,
+    )
+
+
+def _price_current(session, base_url, rng) -> requests.Response:
+    return session.get(
+        f"{base_url}/price/current/", params={"symbol": rng.choice(SYMBOLS)}, timeout=30
+    )
+
+
+def _results(session, base_url, rng) -> requests.Response:
+    return session.get(f"{base_url}/results/", timeout=30)
+
+
+SCENARIOS: Dict[str, Callable] = {
+    "process_request": _process_request,
+    "price_current": _price_current,
+    "results": _results,
+}
+
+
+class Recorder:
+    """Thread-safe latency/outcome collection per scenario."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def record(self, scenario: str, seconds: float, outcome: str) -> None:
+        with self.lock:
+            self.latencies[scenario].append(seconds)
+            self.statuses[scenario][outcome] += 1
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of unsorted ``values``."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = math.ceil(pct / 100 * len(ordered))
+    return ordered[min(max(rank, 1), len(ordered)) - 1]
+
+
+def _worker(
+    base_url: str,
+    weighted: List[Tuple[str, int]],
+    deadline: float,
+    budget: Optional[List[int]],
+    recorder: Recorder,
+    seed: int,
+    think_ms: float,
+) -> None:
+    rng = random.Random(seed)
+    names = [name for name, _ in weighted]
+    weights = [weight for _, weight in weighted]
+    with requests.Session() as session:
+        while time.monotonic() < deadline:
+            if budget is not None:
+                with recorder.lock:
+                    if budget[0] <= 0:
+                        return
+                    budget[0] -= 1
+            scenario = rng.choices(names, weights)[0]
+            started = time.perf_counter()
+            try:
+                response = SCENARIOS[scenario](session, base_url, rng)
+                outcome = str(response.status_code)
+            except requests.RequestException as e:
+                outcome = type(e).__name__
+            recorder.record(scenario, time.perf_counter() - started, outcome)
+            if think_ms:
+                time.sleep(rng.expovariate(1000 / think_ms))
+
+
+def run(
+    base_url: str,
+    mix: Dict[str, int],
+    concurrency: int = 10,
+    duration: float = 30,
+    requests_total: Optional[int] = None,
+    think_ms: float = 0,
+    seed: int = 0,
+) -> Dict:
+    """Run the load test and return the report dictionary."""
+    recorder = Recorder()
+    weighted = [(name, weight) for name, weight in mix.items() if weight > 0]
+    budget = [requests_total] if requests_total else None
+    started = time.monotonic()
+    deadline = started + duration
+    threads = [
+        threading.Thread(
+            target=_worker,
+            args=(
+                base_url.rstrip("/"),
+                weighted,
+                deadline,
+                budget,
+                recorder,
+                seed + i,
+                think_ms,
+            ),
+            daemon=True,
+        )
+        for i in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return build_report(recorder, time.monotonic() - started, concurrency)
+
+
+def _summary(latencies: List[float], statuses: Dict[str, int], elapsed: float):
+    count = len(latencies)
+    errors = sum(n for outcome, n in statuses.items() if not outcome.startswith("2"))
+    return {
+        "requests": count,
+        "throughput_rps": round(count / elapsed, 2) if elapsed else 0.0,
+        "error_rate": round(errors / count, 4) if count else 0.0,
+        "statuses": dict(sorted(statuses.items())),
+        "latency_ms": {
+            "mean": round(sum(latencies) / count * 1000, 2) if count else 0.0,
+            **{
+                f"p{p}": round(percentile(latencies, p) * 1000, 2)
+                for p in (50, 90, 95, 99)
+            },
+            "max": round(max(latencies) * 1000, 2) if count else 0.0,
+        },
+    }
+
+
+def build_report(recorder: Recorder, elapsed: float, concurrency: int) -> Dict:
+    all_latencies: List[float] = []
+    all_statuses: Dict[str, int] = defaultdict(int)
+    endpoints = {}
+    for scenario, latencies in sorted(recorder.latencies.items()):
+        statuses = recorder.statuses[scenario]
+        endpoints[scenario] = _summary(latencies, statuses, elapsed)
+        all_latencies.extend(latencies)
+        for outcome, n in statuses.items():
+            all_statuses[outcome] += n
+    return {
+        "elapsed_s": round(elapsed, 2),
+        "concurrency": concurrency,
+        "total": _summary(all_latencies, all_statuses, elapsed),
+        "endpoints": endpoints,
+    }
+
+
+def print_report(report: Dict) -> None:
+    header = (
+        f"{'endpoint':<18} {'reqs':>7} {'rps':>8} {'err%':>6} "
+        f"{'p50':>8} {'p90':>8} {'p95':>8} {'p99':>8} {'max':>8}"
+    )
+    print(f"\n{report['elapsed_s']}s, concurrency {report['concurrency']}")
+    print(header)
+    rows = list(report["endpoints"].items()) + [("TOTAL", report["total"])]
+    for name, summary in rows:
+        latency = summary["latency_ms"]
+        print(
+            f"{name:<18} {summary['requests']:>7} {summary['throughput_rps']:>8.1f} "
+            f"{summary['error_rate'] * 100:>5.1f}% "
+            f"{latency['p50']:>8.1f} {latency['p90']:>8.1f} {latency['p95']:>8.1f} "
+            f"{latency['p99']:>8.1f} {latency['max']:>8.1f}"
+        )
+    print(f"statuses: {report['total']['statuses']}  (latencies in ms)")
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="API load generator.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000/api")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=30, help="seconds")
+    parser.add_argument(
+        "--requests", type=int, default=None, help="stop after N requests"
+    )
+    parser.add_argument("--mix", choices=sorted(MIXES), default="read-heavy")
+    parser.add_argument(
+        "--think-ms", type=float, default=0, help="mean pause between requests"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="also write the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = run(
+        args.url,
+        MIXES[args.mix],
+        concurrency=args.concurrency,
+        duration=args.duration,
+        requests_total=args.requests,
+        think_ms=args.think_ms,
+        seed=args.seed,
+    )
+    report["mix"] = args.mix
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(report, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
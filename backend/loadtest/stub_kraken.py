@@ -0,0 +1,242 @@
+"""
+Stub Kraken server for load tests.
+
+Serves ``/0/public/OHLC`` and ``/0/public/Ticker`` in Kraken's response
+format with deterministic prices, plus configurable latency, error rate and
+rate limiting, so the API can be load-tested without touching the real
+exchange.
+
+Usage (from backend/):
+    python -m loadtest.stub_kraken --port 8900 --latency-ms 80 --jitter-ms 40 \\
+        --error-rate 0.01 --rate-limit 50
+
+    KRAKEN_BASE_URL=http://127.0.0.1:8900/0/public python manage.py runserver
+
+Injected failures look like Kraken's own: errors are HTTP 500 or an
+``EGeneral:Internal error`` payload, and requests over the rate limit get
+``EAPI:Rate limit exceeded`` (Kraken answers 200 with an error list).
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+KNOWN_PRICES = {
+    "XBT": 40000.0,
+    "BTC": 40000.0,
+    "ETH": 2500.0,
+    "ADA": 0.45,
+    "SOL": 95.0,
+    "XRP": 0.55,
+}
+
+
+class StubConfig:
+    """Behaviour knobs shared by all request handler threads."""
+
+    def __init__(
+        self,
+        latency_ms: float = 0,
+        jitter_ms: float = 0,
+        error_rate: float = 0,
+        rate_limit: float = 0,
+        candles: int = 120,
+        seed: int = 0,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit  # requests/second, 0 = unlimited
+        self.candles = candles
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.tokens = rate_limit
+        self.refilled = time.monotonic()
+        self.stats = {"requests": 0, "errors": 0, "rate_limited": 0}
+
+    def take_token(self) -> bool:
+        """Token bucket holding one second's worth of requests."""
+        if not self.rate_limit:
+            return True
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.rate_limit, self.tokens + (now - self.refilled) * self.rate_limit
+            )
+            self.refilled = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+    def delay(self) -> float:
+        with self.lock:
+            jitter = self.random.uniform(-self.jitter_ms, self.jitter_ms)
+        return max(self.latency_ms + jitter, 0) / 1000
+
+    def should_fail(self) -> bool:
+        with self.lock:
+            return self.random.random() < self.error_rate
+
+
+def _base_price(pair: str) -> float:
+    asset = pair.upper()
+    for suffix in ("ZUSD", "USD"):
+        if asset.endswith(suffix):
+            asset = asset[: -len(suffix)]
+            break
+    asset = asset[1:] if len(asset) == 4 and asset[0] == "X" else asset
+    if asset in KNOWN_PRICES:
+        return KNOWN_PRICES[asset]
+    return 1.0 + zlib.crc32(asset.encode()) % 10000
+
+
+def _price_at(base: float, timestamp: int) -> float:
+    # Slow deterministic oscillation (+-10%) so prices move between calls.
+    step = (timestamp // 60) % 40
+    return round(base * (0.9 + abs(step - 20) / 100), 5)
+
+
+def ohlc_payload(pair: str, interval: int, candles: int) -> dict:
+    """The ``candles`` most recent candles (``since`` is not honoured)."""
+    base = _base_price(pair)
+    interval_seconds = max(interval, 1) * 60
+    now = int(time.time()) // interval_seconds * interval_seconds
+    rows = []
+    for i in range(candles):
+        ts = now - (candles - 1 - i) * interval_seconds
+        close = _price_at(base, ts)
+        rows.append(
+            [
+                ts,
+                f"{close * 0.995:.5f}",
+                f"{close * 1.01:.5f}",
+                f"{close * 0.99:.5f}",
+                f"{close:.5f}",
+                f"{close * 1.001:.5f}",
+                f"{100 + i % 50:.8f}",
+                10 + i % 7,
+            ]
+        )
+    return {"error": [], "result": {pair.upper(): rows, "last": now}}
+
+
+def ticker_payload(pair: str) -> dict:
+    close = _price_at(_base_price(pair), int(time.time()))
+    return {
+        "error": [],
+        "result": {
+            pair.upper(): {
+                "a": [f"{close * 1.0005:.5f}", "1", "1.000"],
+                "b": [f"{close * 0.9995:.5f}", "1", "1.000"],
+                "c": [f"{close:.5f}", "0.01"],
+                "v": ["1000.0", "25000.0"],
+                "p": [f"{close:.5f}", f"{close:.5f}"],
+                "t": [1000, 25000],
+                "l": [f"{close * 0.98:.5f}", f"{close * 0.95:.5f}"],
+                "h": [f"{close * 1.02:.5f}", f"{close * 1.05:.5f}"],
+                "o": f"{close * 0.99:.5f}",
+            }
+        },
+    }
+
+
+class StubKrakenHandler(BaseHTTPRequestHandler):
+    """Handles the public OHLC and Ticker endpoints."""
+
+    config: StubConfig = StubConfig()
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        config = self.config
+        with config.lock:
+            config.stats["requests"] += 1
+
+        time.sleep(config.delay())
+
+        if not config.take_token():
+            with config.lock:
+                config.stats["rate_limited"] += 1
+            return self._send(200, {"error": ["EAPI:Rate limit exceeded"]})
+
+        if config.should_fail():
+            with config.lock:
+                config.stats["errors"] += 1
+            if config.random.random() < 0.5:
+                return self._send(500, {"error": ["EService:Unavailable"]})
+            return self._send(200, {"error": ["EGeneral:Internal error"]})
+
+        pair = params.get("pair", "XBTUSD")
+        if url.path.endswith("/OHLC"):
+            interval = int(params.get("interval", 1))  # minutes, as on Kraken
+            return self._send(200, ohlc_payload(pair, interval, config.candles))
+        if url.path.endswith("/Ticker"):
+            return self._send(200, ticker_payload(pair))
+        return self._send(404, {"error": ["EGeneral:Unknown method"]})
+
+    def _send(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # noqa: A002 - stdlib signature
+        pass
+
+
+def make_server(host: str, port: int, config: StubConfig) -> ThreadingHTTPServer:
+    """Build a threaded stub server (``port=0`` picks a free port)."""
+    handler = type("ConfiguredStubKrakenHandler", (StubKrakenHandler,), {})
+    handler.config = config
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Stub Kraken public API server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--jitter-ms", type=float, default=20)
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="fraction of failed calls"
+    )
+    parser.add_argument(
+        "--rate-limit", type=float, default=0, help="requests/second (0 = off)"
+    )
+    parser.add_argument("--candles", type=int, default=120)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    config = StubConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        candles=args.candles,
+        seed=args.seed,
+    )
+    server = make_server(args.host, args.port, config)
+    host, port = server.server_address[:2]
+    print(f"Stub Kraken listening on http://{host}:{port}/0/public")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Served: {config.stats}")
+
+
+if __name__ == "__main__":
+    main()
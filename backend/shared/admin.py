@@ -0,0 +1,198 @@
+"""
+Admin building blocks for large, append-only tables.
+
+Default changelists run an exact ``COUNT(*)`` per page (twice, with the
+unfiltered "show all" count), allow ``OFFSET`` paging to any depth and
+build filter choices with ``SELECT DISTINCT`` over the whole table. The
+pieces here bound each of those:
+
+- ``EstimatedCountPaginator`` counts exactly only up to ``exact_limit``
+  rows; above that it reports the planner's row estimate (PostgreSQL) or
+  the limit itself, and it caps page links at ``max_pages``.
+- ``KeysetChangeList`` adds ``?before=<pk>`` paging, which stays an
+  index range scan at any depth.
+- ``CachedChoicesFilter`` caches its choices (e.g. distinct symbols).
+- ``RecentPeriodFilter`` limits the changelist to a recent window unless
+  the operator picks "All", which also keeps ``date_hierarchy`` queries
+  within an index range.
+"""
+
+import json
+from datetime import timedelta
+
+from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import PAGE_VAR, ChangeList
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+
+def estimated_count(queryset, exact_limit: int) -> int:
+    """
+    Row count of ``queryset``, exact only when it is at most ``exact_limit``.
+
+    PostgreSQL: the planner's estimate when that exceeds the limit. Other
+    databases: a count capped at ``exact_limit + 1`` rows.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor == "postgresql":
+        estimate = planner_estimate(queryset)
+        if estimate > exact_limit:
+            return estimate
+    return queryset.order_by()[: exact_limit + 1].count()
+
+
+def planner_estimate(queryset) -> int:
+    """Rows the PostgreSQL planner expects ``queryset`` to return."""
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator with a bounded count query and at most ``max_pages`` pages."""
+
+    exact_limit = 10_000
+    max_pages = 100
+
+    @cached_property
+    def count(self):
+        return estimated_count(self.object_list, self.exact_limit)
+
+    @cached_property
+    def estimated(self) -> bool:
+        """Whether ``count`` is an estimate rather than exact."""
+        return self.count > self.exact_limit
+
+    @cached_property
+    def num_pages(self):
+        return min(super().num_pages, self.max_pages)
+
+
+class KeysetChangeList(ChangeList):
+    """
+    ChangeList accepting ``?before=<pk>``: only rows with a lower pk.
+
+    With the changelist ordered by ``-pk`` this pages through any depth as
+    an index range scan instead of an ever larger OFFSET.
+    """
+
+    cursor_param = "before"
+
+    def __init__(self, request, *args, **kwargs):
+        self.cursor = request.GET.get(self.cursor_param)
+        super().__init__(request, *args, **kwargs)
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(self.cursor_param, None)
+        return lookup_params
+
+    def get_queryset(self, request, *args, **kwargs):
+        queryset = super().get_queryset(request, *args, **kwargs)
+        if self.cursor is None:
+            return queryset
+        try:
+            return queryset.filter(pk__lt=int(self.cursor))
+        except ValueError:
+            raise IncorrectLookupParameters(f"Invalid cursor: {self.cursor!r}")
+
+    def older_url(self):
+        """Link to the page after this one, or None on the last page."""
+        rows = list(self.result_list)
+        if len(rows) < self.list_per_page:
+            return None
+        return self.get_query_string({self.cursor_param: rows[-1].pk}, [PAGE_VAR])
+
+    def newest_url(self):
+        """Link back to the first page, or None when already there."""
+        if self.cursor is None:
+            return None
+        return self.get_query_string(remove=[self.cursor_param, PAGE_VAR])
+
+
+class CachedChoicesFilter(admin.SimpleListFilter):
+    """
+    Equality filter whose choices come from ``get_choices()``, cached.
+
+    Subclasses set ``title``, ``parameter_name`` and ``field`` and
+    implement ``get_choices()``; choices are reused for ``cache_timeout``
+    seconds by every admin process sharing the default cache.
+    """
+
+    field = None
+    cache_timeout = 3600
+
+    def get_choices(self, request, model_admin):
+        raise NotImplementedError(".get_choices() must be overridden")
+
+    def lookups(self, request, model_admin):
+        key = f"admin_choices:{type(self).__module__}.{type(self).__qualname__}"
+        choices = cache.get(key)
+        if choices is None:
+            choices = list(self.get_choices(request, model_admin))
+            cache.set(key, choices, self.cache_timeout)
+        return [(value, value) for value in choices]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(**{self.field: self.value()})
+        return queryset
+
+
+class RecentPeriodFilter(admin.SimpleListFilter):
+    """
+    Limit the changelist to the last ``default`` period unless "All" is picked.
+
+    Subclasses set ``field`` (an indexed datetime field). A date_hierarchy
+    selection on that field replaces the default window.
+    """
+
+    title = "period"
+    parameter_name = "period"
+    field = None
+    periods = {
+        "1d": ("Last 24 hours", timedelta(days=1)),
+        "7d": ("Last 7 days", timedelta(days=7)),
+        "30d": ("Last 30 days", timedelta(days=30)),
+        "365d": ("Last year", timedelta(days=365)),
+    }
+    default = "7d"
+    ALL = "all"
+
+    def lookups(self, request, model_admin):
+        return [(key, label) for key, (label, _) in self.periods.items()] + [
+            (self.ALL, "All")
+        ]
+
+    def value(self):
+        value = super().value()
+        if value is None and any(
+            key.startswith(f"{self.field}__") for key in self.request.GET
+        ):
+            return self.ALL  # date_hierarchy drill-down picks the range
+        return value or self.default
+
+    def choices(self, changelist):
+        # No "All" entry from SimpleListFilter: None means the default here.
+        for key, label in self.lookup_choices:
+            yield {
+                "selected": self.value() == key,
+                "query_string": changelist.get_query_string({self.parameter_name: key}),
+                "display": label,
+            }
+
+    def queryset(self, request, queryset):
+        if self.value() == self.ALL:
+            return queryset
+        if self.value() not in self.periods:
+            raise IncorrectLookupParameters(f"Invalid period: {self.value()!r}")
+        since = timezone.now() - self.periods[self.value()][1]
+        return queryset.filter(**{f"{self.field}__gte": since})
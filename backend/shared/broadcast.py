@@ -0,0 +1,179 @@
+"""
+In-process fan-out of published events.
+
+A single ``Broadcaster`` per process delivers each published message to
+every local subscriber (one asyncio queue per connected client). When a
+Redis URL is configured, publishes go through a Redis pub/sub channel and
+one listener thread per process relays them to the local subscribers, so a
+single upstream refresh - in a web or Celery worker - reaches every
+connected client in every process. The listener reconnects with
+exponential backoff when the Redis connection is lost; messages published
+while it is down are not replayed.
+"""
+
+import asyncio
+import contextlib
+import json
+import logging
+import threading
+from typing import Any, Dict, Optional, Set
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """A bounded per-client queue bound to the subscriber's event loop."""
+
+    def __init__(self, broadcaster: "Broadcaster", topic: str, maxsize: int):
+        self.broadcaster = broadcaster
+        self.topic = topic
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+
+    def offer(self, message: Dict[str, Any]) -> None:
+        """Enqueue a message, dropping the oldest one for slow consumers."""
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Next message, or None when ``timeout`` elapses first."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self) -> None:
+        self.broadcaster.unsubscribe(self)
+
+
+class Broadcaster:
+    """Publish/subscribe hub with optional Redis pub/sub bridging."""
+
+    reconnect_delay = 0.5  # seconds before the first reconnect, then doubled
+    max_reconnect_delay = 30.0
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        channel_prefix: str = "dwml",
+        queue_size: int = 100,
+    ):
+        self.redis_url = redis_url
+        self.channel_prefix = channel_prefix
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+        self._client = None
+        self._listener: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def publish(self, topic: str, message: Dict[str, Any]) -> None:
+        """Publish a JSON-serializable message to all subscribers of ``topic``."""
+        if self.redis_url:
+            self._redis().publish(self._channel(topic), json.dumps(message))
+        else:
+            self._deliver(topic, message)
+
+    def subscribe(self, topic: str) -> Subscription:
+        """Register a subscriber; must be called from the client's event loop."""
+        subscription = Subscription(self, topic, self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(topic, set()).add(subscription)
+        if self.redis_url:
+            self._ensure_listener()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers.get(subscription.topic, set()).discard(subscription)
+
+    def close(self) -> None:
+        """Stop the Redis listener after its current message (e.g. at shutdown)."""
+        self._stopped.set()
+
+    def subscriber_count(self, topic: str) -> int:
+        return len(self._subscribers.get(topic, ()))
+
+    def _deliver(self, topic: str, message: Dict[str, Any]) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(topic, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, message)
+            except RuntimeError:
+                # Event loop already closed - client is gone
+                self.unsubscribe(subscription)
+
+    def _channel(self, topic: str) -> str:
+        return f"{self.channel_prefix}:{topic}"
+
+    def _redis(self):
+        if self._client is None:
+            import redis
+
+            self._client = redis.Redis.from_url(self.redis_url)
+        return self._client
+
+    def _ensure_listener(self) -> None:
+        with self._lock:
+            if self._listener is not None and self._listener.is_alive():
+                return
+            self._stopped.clear()
+            self._listener = threading.Thread(
+                target=self._listen, name="broadcast-listener", daemon=True
+            )
+            self._listener.start()
+
+    def _listen(self) -> None:
+        """Relay Redis pub/sub messages to local subscribers (one per process)."""
+        delay = self.reconnect_delay
+        while not self._stopped.is_set():
+            pubsub = None
+            try:
+                pubsub = self._redis().pubsub(ignore_subscribe_messages=True)
+                pubsub.psubscribe(self._channel("*"))
+                delay = self.reconnect_delay
+                self._relay(pubsub)
+            except Exception as e:  # noqa: BLE001 - reconnect below
+                logger.error("Broadcast listener disconnected: %s", e)
+            finally:
+                if pubsub is not None:
+                    with contextlib.suppress(Exception):
+                        pubsub.close()
+            if self._stopped.wait(delay):
+                break
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    def _relay(self, pubsub) -> None:
+        prefix = f"{self.channel_prefix}:"
+        for item in pubsub.listen():
+            if self._stopped.is_set():
+                return
+            channel = item["channel"]
+            if isinstance(channel, bytes):
+                channel = channel.decode()
+            try:
+                message = json.loads(item["data"])
+            except (TypeError, ValueError):
+                logger.warning("Dropping malformed broadcast on %s", channel)
+                continue
+            self._deliver(channel[len(prefix) :], message)
+
+
+_broadcaster: Optional[Broadcaster] = None
+_broadcaster_lock = threading.Lock()
+
+
+def get_broadcaster() -> Broadcaster:
+    """Process-wide broadcaster configured from ``BROADCAST_REDIS_URL``."""
+    global _broadcaster
+    if _broadcaster is None:
+        with _broadcaster_lock:
+            if _broadcaster is None:
+                _broadcaster = Broadcaster(
+                    redis_url=getattr(settings, "BROADCAST_REDIS_URL", "") or None
+                )
+    return _broadcaster
@@ -37,6 +37,12 @@ class BusinessRuleError(DomainException):
     pass
 
 
+class QueryBudgetExceeded(DomainException):
+    """A block of code issued more (or slower) queries than its budget."""
+
+    pass
+
+
 # Legacy exception classes for backwards compatibility
 class CryptoAPIException(DomainException):
     """Base exception for Crypto API (legacy)."""
@@ -0,0 +1,90 @@
+"""HTTP caching helpers - fingerprints, validators and conditional responses."""
+
+import hashlib
+import json
+from datetime import datetime
+from functools import wraps
+from typing import Any, Callable, Optional
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+
+def content_fingerprint(data: Any) -> str:
+    """Stable SHA-256 fingerprint of JSON-like content (key order ignored)."""
+    payload = json.dumps(data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def conditional_response(
+    request,
+    data: Any,
+    etag: Optional[str] = None,
+    last_modified: Optional[datetime] = None,
+    max_age: Optional[int] = None,
+):
+    """
+    Build a response carrying cache validators.
+
+    Returns 304 Not Modified when the request's If-None-Match /
+    If-Modified-Since headers match, otherwise a 200 with ``data``.
+    """
+    quoted = quote_etag(etag) if etag else None
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+
+    response = get_conditional_response(request, etag=quoted, last_modified=timestamp)
+    if response is None:
+        response = Response(data)
+
+    if quoted:
+        response["ETag"] = quoted
+    if timestamp is not None:
+        response["Last-Modified"] = http_date(timestamp)
+    if max_age is not None:
+        patch_cache_control(response, public=True, max_age=max_age)
+    return response
+
+
+def conditional(
+    etag_func: Callable[..., Optional[str]], max_age: Optional[int] = None
+) -> Callable:
+    """
+    Conditional GET decorator for DRF function views.
+
+    ``etag_func(request, *args, **kwargs)`` must return a cheap version
+    string (row ids, max timestamps, a cached value) or ``None`` when no
+    version is known yet. A matching If-None-Match short-circuits the view
+    with 304; otherwise the view runs and its 200 response gets the ETag
+    (re-evaluated after the view if it was unknown, e.g. a cold cache) and
+    a public ``Cache-Control: max-age``.
+
+    Apply it below ``@api_view`` so it receives the DRF request.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            etag = etag_func(request, *args, **kwargs)
+            if etag:
+                not_modified = get_conditional_response(request, etag=quote_etag(etag))
+                if not_modified is not None:
+                    if max_age is not None:
+                        patch_cache_control(not_modified, public=True, max_age=max_age)
+                    return not_modified
+
+            response = view(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+
+            if not etag:
+                etag = etag_func(request, *args, **kwargs)
+            if etag:
+                response["ETag"] = quote_etag(etag)
+            if max_age is not None:
+                patch_cache_control(response, public=True, max_age=max_age)
+            return response
+
+        return wrapper
+
+    return decorator
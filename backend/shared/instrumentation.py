@@ -0,0 +1,133 @@
+"""
+Per-request performance counters.
+
+``PerformanceMiddleware`` opens a ``RequestMetrics`` for every request and
+keeps it in a context variable. Database time is collected automatically
+through ``connection.execute_wrapper``; services report cache lookups with
+``record_cache()`` and upstream API calls with ``track_upstream()``. Outside
+a request (Celery tasks, shell) the recording helpers are no-ops.
+"""
+
+import time
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional
+
+from django.db import connections
+
+
+class RequestMetrics:
+    """Counters collected while handling a single request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.cache_hits: Dict[str, int] = defaultdict(int)
+        self.cache_misses: Dict[str, int] = defaultdict(int)
+        self.upstream_calls: Dict[str, int] = defaultdict(int)
+        self.upstream_time: Dict[str, float] = defaultdict(float)
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the request started."""
+        return time.perf_counter() - self.started
+
+    def as_log_fields(self) -> Dict[str, object]:
+        """Flat fields for the structured (JSON) request log."""
+        fields = {
+            "duration_ms": _ms(self.elapsed),
+            "db_queries": self.db_queries,
+            "db_ms": _ms(self.db_time),
+            "cache_hits": sum(self.cache_hits.values()),
+            "cache_misses": sum(self.cache_misses.values()),
+        }
+        for tier in sorted(set(self.cache_hits) | set(self.cache_misses)):
+            fields[f"cache_{tier}_hits"] = self.cache_hits[tier]
+            fields[f"cache_{tier}_misses"] = self.cache_misses[tier]
+        for service in sorted(self.upstream_calls):
+            fields[f"{service}_calls"] = self.upstream_calls[service]
+            fields[f"{service}_ms"] = _ms(self.upstream_time[service])
+        return fields
+
+    def server_timing(self) -> str:
+        """Value for the ``Server-Timing`` response header."""
+        entries: List[str] = [
+            f'db;dur={_ms(self.db_time)};desc="{self.db_queries} queries"'
+        ]
+        tiers = sorted(set(self.cache_hits) | set(self.cache_misses))
+        for tier in tiers:
+            hits, misses = self.cache_hits[tier], self.cache_misses[tier]
+            entries.append(f'cache-{tier};desc="{hits} hit, {misses} miss"')
+        for service in sorted(self.upstream_calls):
+            calls = self.upstream_calls[service]
+            entries.append(
+                f"{service};dur={_ms(self.upstream_time[service])};"
+                f'desc="{calls} calls"'
+            )
+        entries.append(f"total;dur={_ms(self.elapsed)}")
+        return ", ".join(entries)
+
+
+_current: ContextVar[Optional[RequestMetrics]] = ContextVar(
+    "request_metrics", default=None
+)
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 2)
+
+
+def current() -> Optional[RequestMetrics]:
+    """Metrics of the request being handled, if any."""
+    return _current.get()
+
+
+def record_cache(tier: str, hit: bool) -> None:
+    """Count a cache lookup for ``tier`` (a cache key family)."""
+    metrics = _current.get()
+    if metrics is None:
+        return
+    if hit:
+        metrics.cache_hits[tier] += 1
+    else:
+        metrics.cache_misses[tier] += 1
+
+
+@contextmanager
+def track_upstream(service: str) -> Iterator[None]:
+    """Time a call to an external service (e.g. ``"kraken"``)."""
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.upstream_calls[service] += 1
+        metrics.upstream_time[service] += time.perf_counter() - started
+
+
+@contextmanager
+def collect() -> Iterator[RequestMetrics]:
+    """Collect metrics for the enclosed block, including all DB queries."""
+    metrics = RequestMetrics()
+
+    def execute(execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            metrics.db_queries += 1
+            metrics.db_time += time.perf_counter() - started
+
+    token = _current.set(metrics)
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(execute))
+            yield metrics
+    finally:
+        _current.reset(token)
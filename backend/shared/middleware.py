@@ -1,10 +1,11 @@
-"""Global error handling middleware."""
+"""Global error handling and request instrumentation middleware."""
 
 import logging
 
 from django.http import JsonResponse
 from rest_framework import status
 
+from . import instrumentation
 from .exceptions.custom_exceptions import (
     DomainException,
     ExternalServiceError,
@@ -13,6 +14,7 @@ from .exceptions.custom_exceptions import (
 )
 
 logger = logging.getLogger(__name__)
+request_logger = logging.getLogger("api.requests")
 
 
 class DomainExceptionMiddleware:
@@ -64,3 +66,39 @@ class DomainExceptionMiddleware:
 
         # Let Django handle other exceptions
         return None
+
+
+class PerformanceMiddleware:
+    """
+    Middleware to measure where request time goes.
+
+    Records wall time, DB query count/time, cache hits/misses per tier and
+    upstream (Kraken) calls, then exposes them as a ``Server-Timing`` header
+    and as structured fields on one log record per request. For streaming
+    responses the numbers cover the view up to the first byte.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with instrumentation.collect() as metrics:
+            response = self.get_response(request)
+
+        response["Server-Timing"] = metrics.server_timing()
+
+        match = getattr(request, "resolver_match", None)
+        request_logger.info(
+            "%s %s %s",
+            request.method,
+            request.path,
+            response.status_code,
+            extra={
+                "method": request.method,
+                "path": request.path,
+                "view": match.view_name if match else None,
+                "status": response.status_code,
+                **metrics.as_log_fields(),
+            },
+        )
+        return response
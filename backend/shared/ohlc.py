@@ -0,0 +1,92 @@
+"""
+Compact OHLC candle series, parsed lazily from exchange rows.
+
+Exchanges return candles as rows of strings (Kraken: ``[time, open, high,
+low, close, vwap, volume, count]``). Turning every row into a dict of
+floats costs a dict and six float objects per candle, most of which are
+never read. ``OHLCSeries`` keeps the decoded rows as they are and converts
+a column into an ``array.array`` only when that column is read::
+
+    layout = {"timestamp": (0, "q", int), "close": (4, "d", float)}
+    series = OHLCSeries(rows, layout)
+    series.column("close")  # array('d', [...]), parsed once, then cached
+    series[-1]["close"]     # one candle, converted from its own row only
+    series[:4]              # a series over the first four rows
+
+Items are ``Candle`` mappings keyed like the layout, so code written for
+lists of candle dicts keeps working. Values are converted on access: a
+malformed value raises ``ValueError`` there rather than when the series
+is built.
+"""
+
+from array import array
+from collections.abc import Mapping, Sequence
+from operator import itemgetter
+from typing import Callable, Dict, List, Tuple
+
+# column name -> (position in a row, array typecode, converter)
+Layout = Dict[str, Tuple[int, str, Callable]]
+
+
+class Candle(Mapping):
+    """Read-only, dict-compatible view of one row of an ``OHLCSeries``."""
+
+    __slots__ = ("_row", "_layout")
+
+    def __init__(self, row, layout: Layout):
+        self._row = row
+        self._layout = layout
+
+    def __getitem__(self, key):
+        position, _, convert = self._layout[key]
+        return convert(self._row[position])
+
+    def __iter__(self):
+        return iter(self._layout)
+
+    def __len__(self) -> int:
+        return len(self._layout)
+
+    def __repr__(self) -> str:
+        return f"Candle({dict(self)!r})"
+
+
+class OHLCSeries(Sequence):
+    """Sequence of candles backed by the raw rows and lazily typed columns."""
+
+    __slots__ = ("_rows", "_layout", "_columns")
+
+    def __init__(self, rows: List, layout: Layout):
+        self._rows = rows
+        self._layout = layout
+        self._columns: Dict[str, array] = {}
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            sliced = OHLCSeries(self._rows[index], self._layout)
+            for name, values in self._columns.items():
+                sliced._columns[name] = values[index]
+            return sliced
+        return Candle(self._rows[index], self._layout)
+
+    def __iter__(self):
+        layout = self._layout
+        for row in self._rows:
+            yield Candle(row, layout)
+
+    def __repr__(self) -> str:
+        return f"<OHLCSeries: {len(self._rows)} candles>"
+
+    def column(self, name: str) -> array:
+        """All values of column ``name`` as a typed array (parsed once)."""
+        values = self._columns.get(name)
+        if values is None:
+            position, typecode, convert = self._layout[name]
+            values = array(
+                typecode, map(convert, map(itemgetter(position), self._rows))
+            )
+            self._columns[name] = values
+        return values
@@ -0,0 +1,32 @@
+"""Fast JSON parser for the REST API."""
+
+import io
+import re
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from . import fastjson
+
+# orjson reads integers beyond 64 bits as floats; leave those to the stdlib.
+_LARGE_INTEGER = re.compile(rb"\d{19}")
+
+
+class FastJSONParser(JSONParser):
+    """Drop-in JSONParser backed by orjson (stock parsing without it)."""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if not fastjson.HAS_ORJSON or encoding.lower().replace("-", "") != "utf8":
+            return super().parse(stream, media_type, parser_context)
+
+        body = stream.read()
+        if _LARGE_INTEGER.search(body):
+            return super().parse(io.BytesIO(body), media_type, parser_context)
+
+        try:
+            return fastjson.loads(body)
+        except ValueError as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
@@ -0,0 +1,222 @@
+"""
+On-demand sampling profiler for live requests and Celery tasks.
+
+A background thread samples the profiled thread's stack every
+``PROFILING_INTERVAL_MS`` and writes collapsed stacks (one
+``frame;frame;frame count`` line per distinct stack) to ``PROFILING_DIR``,
+ready for flamegraph.pl, speedscope or inferno.
+
+Profiling is opt-in:
+- ``ProfilingMiddleware`` profiles a random ``PROFILING_SAMPLE_RATE``
+  fraction of requests, plus any request carrying a valid
+  ``X-Profile-Token`` header (see ``make_profile_token``).
+- ``@profile_task`` profiles Celery tasks at ``PROFILING_TASK_SAMPLE_RATE``.
+
+Overhead limits: with both rates at 0 and no ``PROFILING_SECRET`` the
+middleware removes itself and the task decorator costs one attribute
+check. Only ``PROFILING_MAX_CONCURRENT`` profiles run at once, and
+sampling stops after ``PROFILING_MAX_SECONDS``.
+"""
+
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from functools import wraps
+from pathlib import Path
+from typing import Optional
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import MiddlewareNotUsed
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "HTTP_X_PROFILE_TOKEN"
+_TOKEN_SALT = "shared.profiling"
+
+_slots: Optional[threading.BoundedSemaphore] = None
+_slots_lock = threading.Lock()
+
+
+def _acquire_slot() -> bool:
+    global _slots
+    if _slots is None:
+        with _slots_lock:
+            if _slots is None:
+                _slots = threading.BoundedSemaphore(settings.PROFILING_MAX_CONCURRENT)
+    return _slots.acquire(blocking=False)
+
+
+def _release_slot() -> None:
+    _slots.release()
+
+
+def make_profile_token() -> str:
+    """Signed value for the ``X-Profile-Token`` header."""
+    signer = signing.TimestampSigner(key=settings.PROFILING_SECRET, salt=_TOKEN_SALT)
+    return signer.sign("profile")
+
+
+def valid_profile_token(token: str) -> bool:
+    """Whether ``token`` was signed with PROFILING_SECRET and is not expired."""
+    if not settings.PROFILING_SECRET or not token:
+        return False
+    signer = signing.TimestampSigner(key=settings.PROFILING_SECRET, salt=_TOKEN_SALT)
+    try:
+        signer.unsign(token, max_age=settings.PROFILING_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return False
+    return True
+
+
+class SamplingProfiler:
+    """Samples one thread's stack from a helper thread."""
+
+    def __init__(
+        self,
+        thread_id: Optional[int] = None,
+        interval: float = 0.005,
+        max_seconds: float = 30.0,
+    ):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "SamplingProfiler":
+        self._thread = threading.Thread(
+            target=self._run, name="sampling-profiler", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        deadline = time.monotonic() + self.max_seconds
+        while not self._stop.wait(self.interval):
+            if time.monotonic() > deadline:
+                break
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            self.stacks[self._collapse(frame)] += 1
+            self.samples += 1
+
+    @staticmethod
+    def _collapse(frame) -> str:
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            module = frame.f_globals.get("__name__", "?")
+            names.append(f"{module}:{code.co_name}")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+    def collapsed(self) -> str:
+        """Collapsed-stack text (flamegraph.pl input format)."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.items())
+
+    def dump(self, name: str) -> Path:
+        """Write collapsed stacks under PROFILING_DIR and return the path."""
+        directory = Path(settings.PROFILING_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        safe_name = "".join(c if c.isalnum() or c in "-_." else "_" for c in name)
+        path = directory / (
+            f"{safe_name}-{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+            f"-{threading.get_ident()}.collapsed"
+        )
+        path.write_text(self.collapsed())
+        return path
+
+
+class profile_block:
+    """
+    Profile the enclosed block if a profiling slot is free.
+
+    ``path`` is set to the written file on exit (None when skipped).
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.path: Optional[Path] = None
+        self._profiler: Optional[SamplingProfiler] = None
+
+    def __enter__(self):
+        if _acquire_slot():
+            self._profiler = SamplingProfiler(
+                interval=settings.PROFILING_INTERVAL_MS / 1000,
+                max_seconds=settings.PROFILING_MAX_SECONDS,
+            ).start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._profiler is None:
+            return False
+        try:
+            self._profiler.stop()
+            if self._profiler.samples:
+                self.path = self._profiler.dump(self.name)
+                logger.info(
+                    "Profile written: %s (%d samples)",
+                    self.path,
+                    self._profiler.samples,
+                )
+        except OSError as e:
+            logger.warning("Failed to write profile for %s: %s", self.name, e)
+        finally:
+            _release_slot()
+        return False
+
+
+class ProfilingMiddleware:
+    """
+    Middleware to profile sampled or explicitly requested requests.
+
+    Adds an ``X-Profile`` response header naming the written file.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_SAMPLE_RATE and not settings.PROFILING_SECRET:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = settings.PROFILING_SAMPLE_RATE
+
+    def __call__(self, request):
+        if not self._wanted(request):
+            return self.get_response(request)
+
+        with profile_block(f"{request.method}-{request.path}") as profile:
+            response = self.get_response(request)
+        if profile.path is not None:
+            response["X-Profile"] = profile.path.name
+        return response
+
+    def _wanted(self, request) -> bool:
+        if self.sample_rate and random.random() < self.sample_rate:
+            return True
+        return valid_profile_token(request.META.get(PROFILE_HEADER, ""))
+
+
+def profile_task(func):
+    """Profile a task at PROFILING_TASK_SAMPLE_RATE (place under @shared_task)."""
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        rate = settings.PROFILING_TASK_SAMPLE_RATE
+        if not rate or random.random() >= rate:
+            return func(*args, **kwargs)
+        with profile_block(f"task-{func.__module__}.{func.__name__}"):
+            return func(*args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,136 @@
+"""
+Query budgets - cap the queries a view or service may issue.
+
+Usage:
+    @query_budget(max_queries=8)
+    def process_request(...): ...
+
+    with query_budget(max_queries=3, max_time_ms=50) as budget:
+        ...
+    budget.count, budget.duration_ms
+
+Besides the total count and DB time, a budget flags N+1 patterns: the same
+SQL statement (parameters aside) executed more than ``max_repeats`` times.
+Overruns are logged as warnings. They raise QueryBudgetExceeded only when
+strict (``strict=True`` or QUERY_BUDGET_STRICT), which is meant for tests:
+a raise inside ``transaction.atomic`` would roll back a successful request.
+"""
+
+import logging
+import time
+from collections import Counter
+from contextlib import ContextDecorator, ExitStack
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connections
+
+from .exceptions.custom_exceptions import QueryBudgetExceeded
+
+logger = logging.getLogger(__name__)
+
+
+class query_budget(ContextDecorator):
+    """Context manager / decorator enforcing a query budget."""
+
+    DEFAULT_MAX_REPEATS = 5
+
+    def __init__(
+        self,
+        max_queries: Optional[int] = None,
+        max_time_ms: Optional[float] = None,
+        max_repeats: Optional[int] = DEFAULT_MAX_REPEATS,
+        label: Optional[str] = None,
+        strict: Optional[bool] = None,
+    ):
+        self.max_queries = max_queries
+        self.max_time_ms = max_time_ms
+        self.max_repeats = max_repeats
+        self.label = label
+        self.strict = strict
+
+    def __call__(self, func):
+        if self.label is None:
+            self.label = f"{func.__module__}.{func.__qualname__}"
+        return super().__call__(func)
+
+    def _recreate_cm(self):
+        # A fresh instance per call keeps decorated functions reentrant.
+        return type(self)(
+            self.max_queries,
+            self.max_time_ms,
+            self.max_repeats,
+            self.label,
+            self.strict,
+        )
+
+    def __enter__(self):
+        self.statements: Counter = Counter()
+        self.duration = 0.0
+        self._stack = ExitStack()
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self._execute))
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stack.close()
+        if exc_type is None:
+            self.check()
+        return False
+
+    def _execute(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.statements[sql] += 1
+
+    @property
+    def count(self) -> int:
+        """Queries executed so far."""
+        return sum(self.statements.values())
+
+    @property
+    def duration_ms(self) -> float:
+        """Total DB time so far, in milliseconds."""
+        return self.duration * 1000
+
+    def repeated(self) -> List[Tuple[str, int]]:
+        """Statements executed more than ``max_repeats`` times (N+1 suspects)."""
+        if self.max_repeats is None:
+            return []
+        return [
+            (sql, times)
+            for sql, times in self.statements.most_common()
+            if times > self.max_repeats
+        ]
+
+    def violations(self) -> List[str]:
+        """Human-readable list of exceeded limits."""
+        problems = []
+        if self.max_queries is not None and self.count > self.max_queries:
+            problems.append(f"{self.count} queries (budget {self.max_queries})")
+        if self.max_time_ms is not None and self.duration_ms > self.max_time_ms:
+            problems.append(
+                f"{self.duration_ms:.1f}ms DB time (budget {self.max_time_ms}ms)"
+            )
+        for sql, times in self.repeated():
+            problems.append(f"N+1 suspect, {times}x: {sql[:200]}")
+        return problems
+
+    def check(self) -> None:
+        """Raise or log when the budget was exceeded."""
+        problems = self.violations()
+        if not problems:
+            return
+
+        message = f"Query budget exceeded in {self.label or 'block'}: " + "; ".join(
+            problems
+        )
+        strict = self.strict
+        if strict is None:
+            strict = getattr(settings, "QUERY_BUDGET_STRICT", False)
+        if strict:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
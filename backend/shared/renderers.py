@@ -0,0 +1,37 @@
+"""Fast JSON renderer for the REST API."""
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+from . import fastjson
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Drop-in JSONRenderer backed by orjson (stock rendering without it).
+
+    Objects JSON can't represent natively (Decimal, datetime, lazy strings,
+    querysets...) go through DRF's own encoder, so output is byte-identical
+    to the stock renderer. Indented output and anything fastjson can't
+    encode fall back to the stock implementation.
+    """
+
+    _encoder = encoders.JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if (
+            not fastjson.HAS_ORJSON
+            or indent is not None
+            or self.ensure_ascii
+            or not self.compact
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            return fastjson.dumps(data, default=self._encoder.default)
+        except (TypeError, ValueError):
+            return super().render(data, accepted_media_type, renderer_context)
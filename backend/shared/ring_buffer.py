@@ -0,0 +1,94 @@
+"""
+Fixed-capacity ring buffer with column-wise typed storage.
+
+Each column is an ``array.array`` of a single typecode, so a row costs a
+few machine words instead of a Python object per value (a 1000-row
+``(q, d, q, q)`` buffer is ~32 KB). When full, appending overwrites the
+oldest row. Rows are tuples in column order::
+
+    ring = RingBuffer(1000, {"id": "q", "timestamp": "d", "price": "q"})
+    ring.append((1, 1700000000.0, 5000000000000))
+    ring.latest(10)  # newest first
+
+Rows that do not fit a column's type raise (OverflowError, TypeError)
+without modifying the buffer. Not thread-safe; callers sharing a buffer
+across threads must lock.
+"""
+
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+
+class RingBuffer:
+    """Ring of fixed-width rows stored in one typed array per column."""
+
+    def __init__(self, capacity: int, columns: Dict[str, str]):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.columns = tuple(columns)
+        self._arrays = [array(code, [0]) * capacity for code in columns.values()]
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def clear(self) -> None:
+        self._start = 0
+        self._size = 0
+
+    def append(self, row: Tuple) -> None:
+        """Add a row, overwriting the oldest one when full."""
+        full = self._size == self.capacity
+        self._write((self._start + self._size) % self.capacity, row)
+        if full:
+            self._start = (self._start + 1) % self.capacity
+        else:
+            self._size += 1
+
+    def get(self, age: int) -> Tuple:
+        """The row ``age`` places from the newest (0 = newest)."""
+        slot = self._slot(age)
+        return tuple(values[slot] for values in self._arrays)
+
+    def replace(self, age: int, row: Tuple) -> None:
+        """Overwrite the row ``age`` places from the newest (0 = newest)."""
+        self._write(self._slot(age), row)
+
+    def find(self, column: str, value, depth: Optional[int] = None) -> Optional[int]:
+        """Age of the newest row whose ``column`` equals ``value``, or None."""
+        values = self._arrays[self.columns.index(column)]
+        for age in range(min(depth or self._size, self._size)):
+            if values[self._slot(age)] == value:
+                return age
+        return None
+
+    def latest(self, n: int) -> List[Tuple]:
+        """Up to ``n`` rows, newest first."""
+        n = min(n, self._size)
+        end = (self._start + self._size) % self.capacity or self.capacity
+        first = end - n
+        if first >= 0:
+            columns = [values[first:end] for values in self._arrays]
+        else:  # wraps around the end of the arrays
+            columns = [values[first:] + values[:end] for values in self._arrays]
+        rows = list(zip(*columns))
+        rows.reverse()
+        return rows
+
+    def _slot(self, age: int) -> int:
+        if not 0 <= age < self._size:
+            raise IndexError("ring buffer index out of range")
+        return (self._start + self._size - 1 - age) % self.capacity
+
+    def _write(self, slot: int, row: Tuple) -> None:
+        if len(row) != len(self._arrays):
+            raise ValueError(f"expected {len(self._arrays)} values, got {len(row)}")
+        # Convert every value first so a bad one (TypeError, OverflowError)
+        # leaves the buffer untouched.
+        cells = [
+            array(values.typecode, (value,)) for values, value in zip(self._arrays, row)
+        ]
+        for values, cell in zip(self._arrays, cells):
+            values[slot] = cell[0]
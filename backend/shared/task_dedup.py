@@ -0,0 +1,108 @@
+"""
+Celery task deduplication and single-instance locks.
+
+Both keep their state in the ``shared`` cache alias (Redis in production,
+see SHARED_CACHE_URL), so they hold across web and worker processes.
+
+``DeduplicatedTask`` (use as ``base=``) makes ``delay``/``apply_async``
+idempotent within ``dedup_window`` seconds: a submission with the same
+arguments as a queued, running or recently finished one returns that
+task's ``AsyncResult`` (state and result included) instead of enqueuing
+new work. A task that finally fails releases its key so it can be
+resubmitted at once::
+
+    @shared_task(name="domain.work", base=DeduplicatedTask, dedup_window=300)
+    def work(symbol): ...
+
+``@single_instance(timeout)`` (place under ``@shared_task``) skips a run
+while another run of the same task holds the lock, so a beat backlog
+cannot stack overlapping runs. ``timeout`` bounds how long a crashed
+worker can hold the lock.
+"""
+
+import hashlib
+import inspect
+import json
+import logging
+import uuid
+from functools import wraps
+
+from celery import Task
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+SHARED_CACHE_ALIAS = "shared"
+
+
+class DeduplicatedTask(Task):
+    """Task base class whose submissions are deduplicated by arguments."""
+
+    abstract = True
+    dedup_window = None  # seconds; None = settings.TASK_DEDUP_WINDOW
+
+    @property
+    def dedup_cache(self):
+        return caches[SHARED_CACHE_ALIAS]
+
+    def dedup_key(self, args, kwargs) -> str:
+        """Cache key for a call, independent of positional/keyword style."""
+        try:
+            bound = inspect.signature(self.run).bind(*args, **kwargs)
+            bound.apply_defaults()
+            call = bound.arguments
+        except TypeError:
+            call = {"args": list(args), "kwargs": kwargs}
+        payload = json.dumps(call, sort_keys=True, default=str)
+        digest = hashlib.sha1(payload.encode("utf-8")).hexdigest()
+        return f"task_dedup:{self.name}:{digest}"
+
+    def apply_async(self, args=None, kwargs=None, task_id=None, **options):
+        # Explicit ids (retries, replays) are never deduplicated.
+        if task_id is not None:
+            return super().apply_async(args, kwargs, task_id=task_id, **options)
+
+        window = self.dedup_window or settings.TASK_DEDUP_WINDOW
+        key = self.dedup_key(args or (), kwargs or {})
+        task_id = str(uuid.uuid4())
+        if not self.dedup_cache.add(key, task_id, timeout=window):
+            existing = self.dedup_cache.get(key)
+            if existing is not None:
+                logger.info("Duplicate %s submission, reusing %s", self.name, existing)
+                return self.AsyncResult(existing)
+            # Expired between add() and get().
+            self.dedup_cache.set(key, task_id, timeout=window)
+        return super().apply_async(args, kwargs, task_id=task_id, **options)
+
+    def on_failure(self, exc, task_id, args, kwargs, einfo):
+        key = self.dedup_key(args or (), kwargs or {})
+        if self.dedup_cache.get(key) == task_id:
+            self.dedup_cache.delete(key)
+        super().on_failure(exc, task_id, args, kwargs, einfo)
+
+
+def single_instance(timeout: int):
+    """Skip a task run while another run holds its lock (under @shared_task)."""
+
+    def decorator(func):
+        key = f"task_lock:{func.__module__}.{func.__name__}"
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            cache = caches[SHARED_CACHE_ALIAS]
+            token = str(uuid.uuid4())
+            if not cache.add(key, token, timeout=timeout):
+                logger.info("Skipping %s: previous run still in progress", key)
+                return {"status": "skipped", "reason": "already running"}
+            try:
+                return func(*args, **kwargs)
+            finally:
+                # If the lock expired mid-run and another run took it,
+                # leave that run's lock alone.
+                if cache.get(key) == token:
+                    cache.delete(key)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,147 @@
+"""
+Sliding-window API throttles backed by the shared cache.
+
+DRF's stock throttles keep a list of request timestamps per client in the
+local cache, so every worker enforces its own limit and memory grows with
+the rate. These throttles keep two integer counters per client (the
+current and previous fixed window) in the ``shared`` cache alias and
+estimate the sliding-window count as::
+
+    previous * (1 - elapsed / window) + current
+
+Counters are updated with atomic ``incr`` (and ``decr`` to take back a
+refused request), so all workers pointed at the same cache (Redis in
+production, see SHARED_CACHE_URL) enforce one limit.
+
+Rates come from ``REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"]``. A
+``"<scope>.<url_name>"`` entry overrides the scope's rate for one endpoint
+and gets its own counters, e.g.::
+
+    "anon": "100/hour",
+    "anon.health-check": "60/minute",     # cheap
+    "anon.process-request": "20/minute",  # expensive
+"""
+
+import time
+from typing import Optional, Tuple
+
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+SHARED_CACHE_ALIAS = "shared"
+
+
+class SlidingWindowRateThrottle(SimpleRateThrottle):
+    """Base class; subclasses set ``scope`` and implement ``get_ident_key``."""
+
+    cache_format = "throttle:%(scope)s:%(ident)s:%(window)d"
+    timer = time.time
+
+    def __init__(self):
+        # Rate depends on the endpoint, so it is resolved per request.
+        self.rate = None
+        self.num_requests = self.duration = None
+        self.previous = self.current = 0
+        self.estimate = 0.0
+        self.elapsed = 0.0
+
+    @property
+    def cache(self):
+        return caches[SHARED_CACHE_ALIAS]
+
+    def get_ident_key(self, request) -> Optional[str]:
+        """Client identity, or None to skip throttling this request."""
+        raise NotImplementedError(".get_ident_key() must be overridden")
+
+    def get_cache_key(self, request, view):
+        return self.get_ident_key(request)
+
+    def resolve_rate(self, request) -> Tuple[Optional[str], str]:
+        """(rate, counter scope) for this request's endpoint."""
+        rates = api_settings.DEFAULT_THROTTLE_RATES
+        match = getattr(request, "resolver_match", None)
+        if match is not None and match.url_name:
+            endpoint_scope = f"{self.scope}.{match.url_name}"
+            if endpoint_scope in rates:
+                return rates[endpoint_scope], endpoint_scope
+        return rates.get(self.scope), self.scope
+
+    def allow_request(self, request, view):
+        ident = self.get_ident_key(request)
+        if ident is None:
+            return True
+
+        self.rate, counter_scope = self.resolve_rate(request)
+        if self.rate is None:
+            return True
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+
+        now = self.timer()
+        window = int(now // self.duration)
+        self.elapsed = now - window * self.duration
+        current_key = self.cache_format % {
+            "scope": counter_scope,
+            "ident": ident,
+            "window": window,
+        }
+        previous_key = self.cache_format % {
+            "scope": counter_scope,
+            "ident": ident,
+            "window": window - 1,
+        }
+
+        # Keys live two windows so the next window can still weigh this one.
+        self.cache.add(current_key, 0, timeout=self.duration * 2)
+        try:
+            current = self.cache.incr(current_key)
+        except ValueError:  # expired between add() and incr()
+            self.cache.set(current_key, 1, timeout=self.duration * 2)
+            current = 1
+        self.previous = self.cache.get(previous_key, 0)
+        self.current = current
+
+        weight = 1 - self.elapsed / self.duration
+        self.estimate = self.previous * weight + current
+        if self.estimate <= self.num_requests:
+            return True
+        # Refused requests do not count, or a client retrying while
+        # throttled would keep itself locked out into the next window.
+        try:
+            self.cache.decr(current_key)
+        except ValueError:  # expired meanwhile, nothing left to undo
+            pass
+        return False
+
+    def wait(self):
+        """Seconds until the estimate falls back under the limit."""
+        if not self.duration:
+            return None
+        remaining = self.duration - self.elapsed
+        if self.previous and self.current <= self.num_requests:
+            # The previous window's weight decays linearly to zero.
+            excess = self.estimate - self.num_requests
+            return min(max(excess * self.duration / self.previous, 0), remaining)
+        return remaining
+
+
+class AnonSlidingWindowThrottle(SlidingWindowRateThrottle):
+    """Limits unauthenticated clients by IP address."""
+
+    scope = "anon"
+
+    def get_ident_key(self, request):
+        if request.user and request.user.is_authenticated:
+            return None
+        return self.get_ident(request)
+
+
+class UserSlidingWindowThrottle(SlidingWindowRateThrottle):
+    """Limits authenticated users by id (and anonymous clients by IP)."""
+
+    scope = "user"
+
+    def get_ident_key(self, request):
+        if request.user and request.user.is_authenticated:
+            return str(request.user.pk)
+        return self.get_ident(request)
@@ -0,0 +1,42 @@
+"""Shared fixtures for integration tests."""
+
+import pytest
+from django.core.cache import caches
+from domain.services import PriceHistoryBuffer
+from shared.query_budget import query_budget as QueryBudget
+
+
+@pytest.fixture
+def query_budget():
+    """
+    Strict query budget for a block of test code.
+
+    Usage:
+        with query_budget(3):
+            client.get("/api/results/")
+    """
+
+    def budget(max_queries=None, **kwargs):
+        kwargs.setdefault("strict", True)
+        return QueryBudget(max_queries, **kwargs)
+
+    return budget
+
+
+@pytest.fixture(autouse=True)
+def strict_query_budgets(settings):
+    """Fail tests whose views/services exceed their declared query budgets."""
+    settings.QUERY_BUDGET_STRICT = True
+
+
+@pytest.fixture(autouse=True)
+def reset_throttles():
+    """Start every test with fresh API throttle counters."""
+    caches["shared"].clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Start every test with empty caches (result ids repeat across tests)."""
+    caches["default"].clear()
+    PriceHistoryBuffer.clear()
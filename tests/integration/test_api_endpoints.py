@@ -1,6 +1,12 @@
 """Integration tests for API endpoints."""
+
+import json
+from decimal import Decimal
+
 import pytest
+from django.core.cache import cache
 from django.urls import reverse
+from domain.models import MarketPrice, PortfolioLog, PortfolioResult
 from rest_framework.test import APIClient
 
 
@@ -93,9 +99,485 @@ class TestAPIEndpoints:
         assert "id" in data
         assert "report_type" in data
 
+    def test_analytics_report_conditional_get(self):
+        """Test report endpoint emits validators and honours If-None-Match."""
+        response = self.client.get("/api/analytics/report/")
+        assert response.status_code == 200
+        etag = response["ETag"]
+        assert response.has_header("Last-Modified")
+
+        response = self.client.get("/api/analytics/report/", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+    def test_covid_prediction_conditional_get(self):
+        """Test COVID endpoint answers conditional requests with 304."""
+        response = self.client.get("/api/analytics/covid/")
+        etag = response["ETag"]
+
+        response = self.client.get("/api/analytics/covid/", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
     def test_price_history_endpoint(self):
         """Test price history endpoint."""
         response = self.client.get("/api/price/history/", {"symbol": "BTC"})
         assert response.status_code == 200
         data = response.json()
         assert isinstance(data, list)
+
+    def _create_result(self):
+        return PortfolioResult.objects.create(
+            symbol="BTC",
+            investment=Decimal("1000"),
+            number_coins=Decimal("0.02"),
+            profit=Decimal("200"),
+            growth_factor=Decimal("0.2"),
+            lambos=Decimal("0"),
+        )
+
+    def test_result_list_conditional_get(self):
+        """Test result list revalidates with ETag until a new result arrives."""
+        self._create_result()
+        response = self.client.get("/api/results/")
+        etag = response["ETag"]
+        assert "max-age=0" in response["Cache-Control"]
+
+        response = self.client.get("/api/results/", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+        self._create_result()
+        response = self.client.get("/api/results/", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert len(response.json()) == 2
+
+    def test_result_list_etag_changes_on_delete_and_edit(self):
+        """Test deleting or editing a row inside the id range revalidates."""
+        first, middle, last = (self._create_result() for _ in range(3))
+        etag = self.client.get("/api/results/")["ETag"]
+
+        middle.delete()
+        response = self.client.get("/api/results/", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert {row["id"] for row in response.json()} == {first.id, last.id}
+        assert response["ETag"] != etag
+
+        etag = response["ETag"]
+        first.profit = Decimal("300")
+        first.save()
+        response = self.client.get("/api/results/", HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+
+    def test_result_list_negotiates_content(self):
+        """Test the fast path goes through DRF content negotiation."""
+        result = self._create_result()
+
+        response = self.client.get("/api/results/", {"format": "json"})
+        assert response.status_code == 200
+        assert response["Content-Type"] == "application/json"
+        assert response.json()[0]["id"] == result.id
+
+        response = self.client.get("/api/results/", HTTP_ACCEPT="application/xml")
+        assert response.status_code == 406
+
+    def test_result_list_etag_normalizes_parameters(self):
+        """Test equivalent query strings share one ETag."""
+        self._create_result()
+
+        etags = {
+            self.client.get("/api/results/", params)["ETag"]
+            for params in (
+                {"risk_level": "low", "symbol": "btc"},
+                {"risk_level": "LOW", "symbol": " BTC", "limit": "100"},
+            )
+        }
+
+        assert len(etags) == 1
+        other = self.client.get("/api/results/", {"risk_level": "LOW", "limit": 5})
+        assert other["ETag"] not in etags
+
+    def test_results_filtered_by_risk_level(self):
+        """Test ?risk_level filters on the derived risk level."""
+        low = self._create_result()
+        high = PortfolioResult.objects.create(
+            symbol="BTC",
+            investment=Decimal("100"),
+            number_coins=Decimal("1"),
+            profit=Decimal("500"),
+            growth_factor=Decimal("5"),
+            lambos=Decimal("0"),
+        )
+
+        response = self.client.get("/api/results/", {"risk_level": "high"})
+        assert [row["id"] for row in response.json()] == [high.id]
+        response = self.client.get("/api/results/", {"risk_level": "LOW"})
+        assert [row["id"] for row in response.json()] == [low.id]
+        response = self.client.get("/api/results/", {"risk_level": "extreme"})
+        assert response.status_code == 400
+
+    def test_result_detail_conditional_get(self):
+        """Test result detail returns 304 on a matching ETag."""
+        result = self._create_result()
+        url = f"/api/results/{result.id}/"
+        etag = self.client.get(url)["ETag"]
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+
+    def test_current_price_served_from_cache_version(self):
+        """Test current price ETag derives from the cached price."""
+        cache.set("current_price:XBT", "42000.5", 60)
+        response = self.client.get("/api/price/current/", {"symbol": "xbt"})
+        assert response.status_code == 200
+        assert response.json()["price"] == 42000.5
+        assert "max-age=60" in response["Cache-Control"]
+
+        response = self.client.get(
+            "/api/price/current/",
+            {"symbol": "xbt"},
+            HTTP_IF_NONE_MATCH=response["ETag"],
+        )
+        assert response.status_code == 304
+
+    def test_price_history_conditional_get(self):
+        """Test price history ETag changes with new snapshots."""
+        MarketPrice.objects.create(symbol="BTC", price=Decimal("50000"))
+        etag = self.client.get("/api/price/history/", {"symbol": "BTC"})["ETag"]
+
+        response = self.client.get(
+            "/api/price/history/", {"symbol": "BTC"}, HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == 304
+
+    def test_price_history_revalidates_from_buffer(self, query_budget):
+        """Test a buffered window answers If-None-Match without queries."""
+        MarketPrice.objects.create(symbol="BTC", price=Decimal("50000"))
+        etag = self.client.get("/api/price/history/", {"symbol": "BTC"})["ETag"]
+
+        with query_budget(0):
+            response = self.client.get(
+                "/api/price/history/", {"symbol": "BTC"}, HTTP_IF_NONE_MATCH=etag
+            )
+        assert response.status_code == 304
+
+    def test_export_results_ndjson(self):
+        """Test results export streams one JSON document per line."""
+        self._create_result()
+        self._create_result()
+        response = self.client.get("/api/export/results/", {"symbol": "btc"})
+        assert response.status_code == 200
+        assert response.streaming
+        assert response["Content-Type"] == "application/x-ndjson"
+
+        lines = b"".join(response.streaming_content).splitlines()
+        records = [json.loads(line) for line in lines]
+        assert len(records) == 2
+        assert records[0]["roi_percentage"] == "20.00"
+        assert records[0]["risk_level"] == "LOW"
+
+    def test_export_prices_csv(self):
+        """Test price export streams a CSV header followed by rows."""
+        MarketPrice.objects.create(symbol="ETH", price=Decimal("3000.5"))
+        MarketPrice.objects.create(symbol="BTC", price=Decimal("50000"))
+        response = self.client.get(
+            "/api/export/prices/", {"output": "csv", "symbol": "ETH"}
+        )
+        assert response.status_code == 200
+        assert response["Content-Type"] == "text/csv"
+
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        assert lines[0] == "id,symbol,price,volume,timestamp"
+        assert len(lines) == 2
+        assert ",ETH,3000.50000000,," in lines[1]
+
+    def test_export_logs_time_range(self):
+        """Test log export honours the since filter."""
+        PortfolioLog.objects.create(symbol="BTC", action="old", metadata={"a": 1})
+        response = self.client.get(
+            "/api/export/logs/", {"since": "2999-01-01T00:00:00Z"}
+        )
+        assert response.status_code == 200
+        assert b"".join(response.streaming_content) == b""
+
+    def test_export_rejects_unknown_format(self):
+        """Test invalid export format is a validation error."""
+        response = self.client.get("/api/export/logs/", {"output": "xml"})
+        assert response.status_code == 400
+
+    def test_server_timing_header(self):
+        """Test responses report DB, cache and total timings."""
+        cache.set("current_price:XBT", "42000.5", 60)
+        response = self.client.get("/api/price/current/", {"symbol": "xbt"})
+
+        timing = response["Server-Timing"]
+        assert timing.startswith("db;dur=")
+        assert 'cache-current_price;desc="' in timing
+        assert ' 0 miss"' in timing
+        assert "total;dur=" in timing
+
+    def test_server_timing_counts_kraken_calls(self, monkeypatch):
+        """Test upstream Kraken calls are timed per request."""
+
+        class FakeResponse:
+            def raise_for_status(self):
+                pass
+
+            def json(self):
+                return {
+                    "error": [],
+                    "result": {"XXBTZUSD": [[0, "1", "1", "1", "1.5", "1", "10", 5]]},
+                }
+
+        monkeypatch.setattr(
+            "domain.services.requests.get", lambda *args, **kwargs: FakeResponse()
+        )
+        response = self.client.get("/api/price/current/", {"symbol": "NOPE"})
+
+        assert response.status_code == 200
+        assert "kraken;dur=" in response["Server-Timing"]
+        assert 'desc="1 calls"' in response["Server-Timing"]
+
+    def test_read_endpoints_query_budget(self, query_budget):
+        """Test list/detail endpoints do not scale queries with row count."""
+        results = [self._create_result() for _ in range(20)]
+        for _ in range(20):
+            MarketPrice.objects.create(symbol="BTC", price=Decimal("50000"))
+
+        with query_budget(2):
+            assert self.client.get("/api/results/").status_code == 200
+        with query_budget(2):
+            assert self.client.get(f"/api/results/{results[0].id}/").status_code == 200
+        with query_budget(1):
+            assert self.client.get("/api/logs/").status_code == 200
+        with query_budget(2):
+            response = self.client.get("/api/price/history/", {"symbol": "BTC"})
+            assert response.status_code == 200
+
+    def test_process_request_query_budget(self, query_budget):
+        """Test a calculation with cached prices stays within its budget."""
+        cache.set("opening_avg:BTC", "40000", 60)
+        cache.set("current_price:BTC", "50000", 60)
+
+        with query_budget(5):
+            response = self.client.post(
+                "/api/process_request/",
+                {"symbol": "BTC", "investment": 1000},
+                format="json",
+            )
+        assert response.status_code == 200
+
+    def test_query_budget_flags_n_plus_one(self, query_budget):
+        """Test repeated identical statements exceed the budget."""
+        from shared.exceptions.custom_exceptions import QueryBudgetExceeded
+
+        for _ in range(3):
+            self._create_result()
+
+        with pytest.raises(QueryBudgetExceeded, match="N\\+1"):
+            with query_budget(max_repeats=2):
+                for result in PortfolioResult.objects.only("id"):
+                    result.symbol  # deferred field: one query per row
+
+    def test_process_request_budget_overrun_only_logs(
+        self, settings, monkeypatch, caplog
+    ):
+        """Test an overrun in the service is logged, not raised and rolled back."""
+        from shared.query_budget import query_budget as QueryBudget
+
+        settings.QUERY_BUDGET_STRICT = False  # production default
+        cache.set("opening_avg:BTC", "40000", 60)
+        cache.set("current_price:BTC", "50000", 60)
+        monkeypatch.setattr(
+            QueryBudget, "violations", lambda budget: ["9 queries (budget 8)"]
+        )
+
+        with caplog.at_level("WARNING", logger="shared.query_budget"):
+            response = self.client.post(
+                "/api/process_request/",
+                {"symbol": "BTC", "investment": 1000},
+                format="json",
+            )
+
+        assert response.status_code == 200
+        assert PortfolioResult.objects.filter(symbol="BTC").exists()
+        assert "Query budget exceeded" in caplog.text
+
+    def test_signed_profile_header_profiles_request(
+        self, settings, tmp_path, monkeypatch
+    ):
+        """Test a valid X-Profile-Token writes collapsed stacks."""
+        import time
+
+        from domain.services import PortfolioService
+        from shared.profiling import make_profile_token
+
+        settings.PROFILING_SECRET = "profiling-test-secret"
+        settings.PROFILING_DIR = str(tmp_path)
+        settings.PROFILING_INTERVAL_MS = 1
+        get_rows = PortfolioService.get_result_rows
+
+        def slow_get_rows(service, *args, **kwargs):
+            time.sleep(0.05)
+            return get_rows(service, *args, **kwargs)
+
+        monkeypatch.setattr(PortfolioService, "get_result_rows", slow_get_rows)
+        client = APIClient()
+
+        response = client.get("/api/results/", HTTP_X_PROFILE_TOKEN="forged")
+        assert "X-Profile" not in response
+
+        response = client.get(
+            "/api/results/", HTTP_X_PROFILE_TOKEN=make_profile_token()
+        )
+        assert response.status_code == 200
+        profile = (tmp_path / response["X-Profile"]).read_text()
+        assert "slow_get_rows" in profile
+
+
+class FakeAsyncResult:
+    """Stand-in for celery.result.AsyncResult with a fixed state."""
+
+    states = {}
+    reads = 0
+
+    def __init__(self, task_id):
+        self.state, self.info = self.states.get(task_id, ("PENDING", None))
+        FakeAsyncResult.reads += 1
+
+
+@pytest.mark.django_db
+@pytest.mark.integration
+class TestJobEndpoints:
+    """Integration tests for the background job endpoints."""
+
+    task_id = "6f1c1c1e-5a0e-4a8e-9f57-3d2b1f0b7a11"
+
+    def setup_method(self):
+        """Set up test client and fake result backend."""
+        self.client = APIClient()
+        FakeAsyncResult.states = {}
+        FakeAsyncResult.reads = 0
+
+    @pytest.fixture(autouse=True)
+    def fake_celery(self, monkeypatch):
+        """Queue nothing; record submissions instead."""
+        self.submitted = []
+
+        def delay(*args, **kwargs):
+            self.submitted.append((args, kwargs))
+            return type("Result", (), {"id": self.task_id})()
+
+        monkeypatch.setattr("domain.tasks.process_portfolio_async.delay", delay)
+        monkeypatch.setattr("domain.tasks.batch_process_portfolios_task.delay", delay)
+        monkeypatch.setattr("domain.services.AsyncResult", FakeAsyncResult)
+
+    def test_submit_portfolio_job(self):
+        """Test submission returns 202 with a status URL."""
+        response = self.client.post(
+            "/api/jobs/portfolio/",
+            {"symbol": "btc", "investment": 1000},
+            format="json",
+        )
+
+        assert response.status_code == 202
+        data = response.json()
+        assert data["task_id"] == self.task_id
+        assert data["status_url"].endswith(f"/api/jobs/{self.task_id}/")
+        assert response["Location"] == data["status_url"]
+        assert self.submitted == [((), {"symbol": "BTC", "investment": 1000.0})]
+
+    def test_submit_portfolio_job_validates(self):
+        """Test invalid parameters are rejected before queueing."""
+        response = self.client.post(
+            "/api/jobs/portfolio/", {"symbol": "BTC"}, format="json"
+        )
+        assert response.status_code == 400
+        assert self.submitted == []
+
+    def test_submit_batch_job(self):
+        """Test a batch is queued as one task."""
+        portfolios = [{"symbol": "BTC", "investment": 100}] * 3
+        response = self.client.post(
+            "/api/jobs/batch/", {"portfolios": portfolios}, format="json"
+        )
+
+        assert response.status_code == 202
+        assert self.submitted == [((portfolios,), {})]
+
+    def test_job_status_progress_is_cached(self):
+        """Test running jobs report progress and polls share one read."""
+        self.client.post("/api/jobs/batch/", {"portfolios": [{}]}, format="json")
+        FakeAsyncResult.states[self.task_id] = (
+            "PROGRESS",
+            {"current": 50, "total": 200, "percent": 25.0},
+        )
+
+        for _ in range(3):
+            response = self.client.get(f"/api/jobs/{self.task_id}/")
+            assert response.status_code == 200
+            assert response.json()["progress"]["percent"] == 25.0
+            assert response["Retry-After"] == "2"
+        assert FakeAsyncResult.reads == 1
+
+    def test_job_status_follows_dispatched_batch(self):
+        """Test a chunked batch reports its merged result."""
+        self.client.post("/api/jobs/batch/", {"portfolios": [{}]}, format="json")
+        FakeAsyncResult.states = {
+            self.task_id: (
+                "SUCCESS",
+                {"status": "dispatched", "chunks": 4, "result_id": "merge"},
+            ),
+            "merge": ("SUCCESS", {"total": 40000, "processed": 40000}),
+        }
+
+        response = self.client.get(f"/api/jobs/{self.task_id}/")
+
+        data = response.json()
+        assert data["state"] == "SUCCESS"
+        assert data["chunks"] == 4
+        assert data["result"]["processed"] == 40000
+        assert "Retry-After" not in response
+
+    def test_job_status_sums_chunk_progress(self):
+        """Test a chunked batch reports its chunks' progress until merged."""
+        self.client.post("/api/jobs/batch/", {"portfolios": [{}]}, format="json")
+        FakeAsyncResult.states = {
+            self.task_id: (
+                "SUCCESS",
+                {
+                    "total": 30000,
+                    "status": "dispatched",
+                    "chunks": 3,
+                    "result_id": "merge",
+                    "chunk_ids": ["c1", "c2", "c3"],
+                },
+            ),
+            "c1": ("PROGRESS", {"current": 3000, "total": 10000, "processed": 2900}),
+            "c2": ("SUCCESS", {"total": 10000, "processed": 9990, "results": []}),
+        }
+
+        response = self.client.get(f"/api/jobs/{self.task_id}/")
+
+        data = response.json()
+        assert data["state"] == "PROGRESS"
+        assert data["progress"] == {
+            "current": 13000,
+            "total": 30000,
+            "percent": 43,
+            "processed": 12890,
+            "chunks_done": 1,
+        }
+        assert response["Retry-After"] == "2"
+
+    def test_job_status_failure(self):
+        """Test failed jobs report the error."""
+        self.client.post("/api/jobs/batch/", {"portfolios": [{}]}, format="json")
+        FakeAsyncResult.states[self.task_id] = ("FAILURE", ValueError("boom"))
+
+        data = self.client.get(f"/api/jobs/{self.task_id}/").json()
+        assert data == {"task_id": self.task_id, "state": "FAILURE", "error": "boom"}
+
+    def test_unknown_job_returns_404(self):
+        """Test ids that were never submitted are not reported as PENDING."""
+        response = self.client.get("/api/jobs/0b7c2f4e-1111-4f0e-9a3c-2d5e6f7a8b9c/")
+        assert response.status_code == 404
+        assert FakeAsyncResult.reads == 0
@@ -0,0 +1,59 @@
+"""Unit tests for the lazily parsed OHLC series."""
+
+import pytest
+from shared.ohlc import OHLCSeries
+
+LAYOUT = {
+    "timestamp": (0, "q", int),
+    "close": (4, "d", float),
+    "volume": (6, "d", float),
+}
+ROWS = [
+    [1700000000, "1.0", "1.2", "0.9", "1.1", "1.05", "10.5", 3],
+    [1700003600, "1.1", "1.3", "1.0", "1.25", "1.2", "7", 2],
+    [1700007200, "1.25", "1.4", "1.2", "1.3", "1.3", "0.5", 1],
+]
+
+
+@pytest.mark.unit
+class TestOHLCSeries:
+    """Test dict-compatible candles, typed columns and slicing."""
+
+    def setup_method(self):
+        self.series = OHLCSeries([list(row) for row in ROWS], LAYOUT)
+
+    def test_candles_behave_like_dicts(self):
+        candle = self.series[-1]
+
+        assert len(self.series) == 3
+        assert candle["close"] == 1.3
+        assert candle.get("open") is None
+        assert candle == {"timestamp": 1700007200, "close": 1.3, "volume": 0.5}
+        assert [c["timestamp"] for c in self.series] == [row[0] for row in ROWS]
+
+    def test_columns_are_typed_and_parsed_once(self):
+        closes = self.series.column("close")
+
+        assert closes.typecode == "d"
+        assert list(closes) == [1.1, 1.25, 1.3]
+        assert self.series.column("timestamp").typecode == "q"
+        assert self.series.column("close") is closes
+
+    def test_slice_keeps_parsed_columns(self):
+        self.series.column("volume")
+
+        head = self.series[:2]
+
+        assert isinstance(head, OHLCSeries)
+        assert len(head) == 2
+        assert list(head.column("volume")) == [10.5, 7.0]
+        assert list(head.column("close")) == [1.1, 1.25]
+
+    def test_malformed_value_raises_on_access(self):
+        series = OHLCSeries([[1700000000, "1", "1", "1", "n/a", "1", "1", 1]], LAYOUT)
+
+        assert len(series) == 1
+        with pytest.raises(ValueError):
+            series.column("close")
+        with pytest.raises(IndexError):
+            series[1]
@@ -0,0 +1,51 @@
+"""Unit tests for the sampling profiler."""
+
+import time
+
+import pytest
+from shared.profiling import SamplingProfiler, profile_task
+
+
+def _busy(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        sum(range(100))
+
+
+@pytest.mark.unit
+class TestSamplingProfiler:
+    """Test stack sampling and collapsed output."""
+
+    def test_collapsed_stacks_name_the_hot_function(self):
+        """Test samples are attributed to the running function."""
+        profiler = SamplingProfiler(interval=0.001).start()
+        _busy(0.1)
+        profiler.stop()
+
+        assert profiler.samples > 0
+        lines = profiler.collapsed().splitlines()
+        assert any("test_profiling:_busy" in line for line in lines)
+        stack, count = lines[0].rsplit(" ", 1)
+        assert int(count) > 0 and ";" in stack
+
+    def test_profile_task_writes_file_when_sampled(self, settings, tmp_path):
+        """Test the task decorator dumps a profile at sample rate 1."""
+        settings.PROFILING_DIR = str(tmp_path)
+        settings.PROFILING_TASK_SAMPLE_RATE = 1.0
+        settings.PROFILING_INTERVAL_MS = 1
+
+        @profile_task
+        def task():
+            _busy(0.05)
+            return "done"
+
+        assert task() == "done"
+        assert len(list(tmp_path.glob("task-*.collapsed"))) == 1
+
+    def test_profile_task_disabled_by_default(self, settings, tmp_path):
+        """Test nothing is written when task sampling is off."""
+        settings.PROFILING_DIR = str(tmp_path)
+        settings.PROFILING_TASK_SAMPLE_RATE = 0.0
+
+        assert profile_task(lambda: 1)() == 1
+        assert list(tmp_path.iterdir()) == []
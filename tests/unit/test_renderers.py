@@ -0,0 +1,106 @@
+"""Unit tests for the fast JSON renderer and parser."""
+import datetime
+import io
+import uuid
+from decimal import Decimal
+
+import pytest
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from shared import fastjson
+from shared.parsers import FastJSONParser
+from shared.renderers import FastJSONRenderer
+
+
+@pytest.mark.unit
+class TestFastJSONRenderer:
+    """Test FastJSONRenderer output matches JSONRenderer byte for byte."""
+
+    @pytest.mark.parametrize(
+        "data",
+        [
+            {"investment": Decimal("1000.00"), "roi": Decimal("-12.50")},
+            {"date": datetime.datetime(2024, 1, 1, 12, 0, 0, 123456)},
+            {
+                "date": datetime.datetime(
+                    2024, 1, 1, 12, 0, tzinfo=datetime.timezone.utc
+                )
+            },
+            {"day": datetime.date(2024, 1, 1), "at": datetime.time(9, 30)},
+            {"id": uuid.UUID("12345678-1234-5678-1234-567812345678")},
+            {"floats": [0.1, 1e16, 1e-05, 0.00001234, -2.5, 123456.789]},
+            {"big": 2**70, "small": -(2**63)},
+            {"text": 'café     "quoted" </script>'},
+            [],
+            {"nested": [{"a": None, "b": True}, ("tuple", 1)]},
+        ],
+    )
+    def test_output_is_byte_compatible(self, data):
+        """Test rendered bytes equal the stock renderer's."""
+        assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+
+    @pytest.mark.parametrize(
+        "data",
+        [
+            {"value": float("nan")},
+            {"nested": [None, {"value": float("-inf")}]},
+            {"decimal": Decimal("NaN"), "other": None},
+        ],
+    )
+    def test_nan_is_rejected_like_stock_renderer(self, data):
+        """Test non-finite floats still raise under strict JSON."""
+        with pytest.raises(ValueError):
+            JSONRenderer().render(data)
+        with pytest.raises(ValueError):
+            FastJSONRenderer().render(data)
+
+    @pytest.mark.skipif(not fastjson.HAS_ORJSON, reason="orjson not installed")
+    def test_nulls_stay_on_fast_path(self, monkeypatch):
+        """Test payloads with None values are not re-encoded by the stdlib."""
+        data = [{"volume": None, "price": 1.5, "at": None}] * 3
+        expected = JSONRenderer().render(data)
+
+        def stdlib_dumps(*args, **kwargs):
+            raise AssertionError("stdlib encoder used")
+
+        monkeypatch.setattr(fastjson.json, "dumps", stdlib_dumps)
+        assert FastJSONRenderer().render(data) == expected
+
+    def test_indented_output_uses_stock_renderer(self):
+        """Test browsable/indented requests fall back to the stock renderer."""
+        context = {"indent": 4}
+        data = {"symbol": "BTC", "price": Decimal("1.5")}
+        assert FastJSONRenderer().render(
+            data, "application/json", context
+        ) == JSONRenderer().render(data, "application/json", context)
+
+    def test_none_renders_empty(self):
+        """Test None renders as an empty body."""
+        assert FastJSONRenderer().render(None) == b""
+
+
+@pytest.mark.unit
+class TestFastJSONParser:
+    """Test FastJSONParser behaves like JSONParser."""
+
+    @pytest.mark.parametrize(
+        "body",
+        [
+            b'{"symbol": "BTC", "investment": 1000.5}',
+            b'{"big": 123456789012345678901234567890}',
+            '{"text": "café"}'.encode("utf-8"),
+            b"[1, 2, 3]",
+        ],
+    )
+    def test_parses_like_stock_parser(self, body):
+        """Test parsed values equal the stock parser's."""
+        assert FastJSONParser().parse(io.BytesIO(body)) == JSONParser().parse(
+            io.BytesIO(body)
+        )
+
+    @pytest.mark.parametrize("body", [b"{invalid", b'{"value": NaN}'])
+    def test_invalid_json_raises_parse_error(self, body):
+        """Test malformed and non-finite input raises ParseError."""
+        with pytest.raises(ParseError):
+            FastJSONParser().parse(io.BytesIO(body))
@@ -0,0 +1,47 @@
+"""Unit tests for the typed ring buffer."""
+
+import pytest
+from shared.ring_buffer import RingBuffer
+
+
+@pytest.mark.unit
+class TestRingBuffer:
+    """Test wrap-around, lookups and failed writes."""
+
+    def setup_method(self):
+        self.ring = RingBuffer(3, {"id": "q", "price": "d"})
+
+    def test_latest_is_newest_first_and_wraps(self):
+        for i in range(1, 4):
+            self.ring.append((i, i * 1.5))
+        assert self.ring.latest(2) == [(3, 4.5), (2, 3.0)]
+
+        for i in range(4, 6):
+            self.ring.append((i, i * 1.5))
+
+        assert len(self.ring) == 3
+        assert self.ring.latest(10) == [(5, 7.5), (4, 6.0), (3, 4.5)]
+        assert self.ring.latest(1) == [(5, 7.5)]
+
+    def test_find_and_replace(self):
+        for i in range(1, 5):
+            self.ring.append((i, 0.0))
+
+        age = self.ring.find("id", 3)
+        self.ring.replace(age, (3, 9.0))
+
+        assert age == 1
+        assert self.ring.get(1) == (3, 9.0)
+        assert self.ring.find("id", 1) is None
+
+    def test_bad_row_leaves_buffer_untouched(self):
+        self.ring.append((1, 1.0))
+
+        with pytest.raises(OverflowError):
+            self.ring.append((2**63, 2.0))
+        with pytest.raises(ValueError):
+            self.ring.append((2,))
+
+        assert self.ring.latest(3) == [(1, 1.0)]
+        with pytest.raises(IndexError):
+            self.ring.get(1)
@@ -1,7 +1,15 @@
 """Unit tests for API serializers."""
+from decimal import Decimal
+
 import pytest
-from domain.serializers import CalculationRequestSerializer
+from domain.models import PortfolioResult
+from domain.serializers import (
+    CalculationRequestSerializer,
+    PortfolioResultFastSerializer,
+    PortfolioResultSerializer,
+)
 from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
 
 
 @pytest.mark.unit
@@ -79,3 +87,39 @@ class TestCalculationRequestSerializer:
         assert not serializer.is_valid()
         assert "symbol" in serializer.errors
         assert "investment" in serializer.errors
+
+
+@pytest.mark.django_db
+@pytest.mark.unit
+class TestPortfolioResultFastSerializer:
+    """Test the fast path matches PortfolioResultSerializer byte for byte."""
+
+    def test_output_is_byte_compatible(self):
+        """Test rendered JSON is identical to the ModelSerializer output."""
+        rows = [
+            ("BTC", "1000", "200", "0.2", "0.001"),
+            ("ETH", "3", "-1.01", "-0.3367", "0"),
+            ("DOGE", "100", "500", "5.0", "0.0025"),
+            ("SOL", "7", "0.35", "0.5", "0"),
+            ("ADA", "10000", "300000", "30", "1.5"),
+        ]
+        for symbol, investment, profit, growth, lambos in rows:
+            PortfolioResult.objects.create(
+                symbol=symbol,
+                investment=Decimal(investment),
+                number_coins=Decimal("0.12345678"),
+                profit=Decimal(profit),
+                growth_factor=Decimal(growth),
+                lambos=Decimal(lambos),
+            )
+
+        expected = JSONRenderer().render(
+            PortfolioResultSerializer(PortfolioResult.objects.all(), many=True).data
+        )
+        fast = PortfolioResultFastSerializer(
+            PortfolioResult.objects.derived_values(
+                *PortfolioResultFastSerializer.FIELDS
+            )
+        ).render()
+
+        assert fast == expected
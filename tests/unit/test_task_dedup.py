@@ -0,0 +1,90 @@
+"""Unit tests for task deduplication and single-instance locks."""
+from unittest import mock
+
+import pytest
+from celery import Task
+from django.core.cache import caches
+from domain.tasks import fetch_market_prices_task, process_portfolio_async
+from shared.task_dedup import single_instance
+
+
+@pytest.mark.unit
+class TestDeduplicatedTask:
+    """Test duplicate submissions reuse the first task."""
+
+    def setup_method(self):
+        caches["shared"].clear()
+
+    def submit(self, *args, **kwargs):
+        with mock.patch.object(Task, "apply_async") as apply_async:
+            apply_async.side_effect = lambda args, kwargs, task_id, **options: (
+                mock.Mock(id=task_id)
+            )
+            result = process_portfolio_async.apply_async(*args, **kwargs)
+        return result, apply_async
+
+    def test_duplicate_returns_existing_task(self):
+        """Test positional and keyword forms of one call share a task."""
+        first, enqueued = self.submit(args=["BTC", 1000.0])
+        second, duplicate = self.submit(kwargs={"symbol": "BTC", "investment": 1000.0})
+
+        enqueued.assert_called_once()
+        duplicate.assert_not_called()
+        assert second.id == first.id
+
+    def test_different_arguments_enqueue(self):
+        """Test other arguments and explicit task ids are not deduplicated."""
+        first, _ = self.submit(args=["BTC", 1000.0])
+        other, enqueued = self.submit(args=["ETH", 1000.0])
+        retry, retried = self.submit(args=["BTC", 1000.0], task_id=first.id)
+
+        enqueued.assert_called_once()
+        retried.assert_called_once()
+        assert other.id != first.id
+
+    def test_failure_releases_key(self):
+        """Test a failed task can be resubmitted straight away."""
+        first, _ = self.submit(args=["BTC", 1000.0])
+
+        process_portfolio_async.on_failure(
+            Exception("boom"), first.id, ("BTC", 1000.0), {}, None
+        )
+        second, enqueued = self.submit(args=["BTC", 1000.0])
+
+        enqueued.assert_called_once()
+        assert second.id != first.id
+
+
+@pytest.mark.unit
+class TestSingleInstance:
+    """Test overlapping periodic task runs are skipped."""
+
+    def setup_method(self):
+        caches["shared"].clear()
+
+    def test_overlapping_run_skipped(self):
+        """Test a run is skipped while the lock is held."""
+        key = "task_lock:domain.tasks.fetch_market_prices_task"
+        caches["shared"].set(key, "other-run", 60)
+
+        with mock.patch("domain.services.SymbolRegistry.symbols") as symbols:
+            result = fetch_market_prices_task.run()
+
+        symbols.assert_not_called()
+        assert result["status"] == "skipped"
+
+    def test_lock_released_after_run(self):
+        """Test the lock is released when the run finishes or fails."""
+        calls = []
+
+        @single_instance(timeout=60)
+        def job(fail=False):
+            calls.append(fail)
+            if fail:
+                raise RuntimeError("boom")
+            return "done"
+
+        with pytest.raises(RuntimeError):
+            job(fail=True)
+        assert job() == "done"
+        assert calls == [True, False]
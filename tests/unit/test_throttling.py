@@ -0,0 +1,102 @@
+"""Unit tests for the sliding-window throttles."""
+
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from django.urls import resolve
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from shared.throttling import AnonSlidingWindowThrottle
+
+
+class FakeClockThrottle(AnonSlidingWindowThrottle):
+    now = 0.0
+
+    def timer(self):
+        return self.now
+
+
+def _request(path="/api/results/"):
+    request = APIRequestFactory().get(path)
+    request.resolver_match = resolve(path)
+    request.user = AnonymousUser()
+    return Request(request)
+
+
+@pytest.mark.unit
+class TestSlidingWindowThrottle:
+    """Test the two-counter sliding window estimate."""
+
+    def setup_method(self):
+        caches["shared"].clear()
+
+    def test_limits_within_window(self, settings):
+        """Test requests beyond the rate are refused with a wait hint."""
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            "DEFAULT_THROTTLE_RATES": {"anon": "3/minute"},
+        }
+        FakeClockThrottle.now = 600.0
+
+        results = [
+            FakeClockThrottle().allow_request(_request(), None) for _ in range(4)
+        ]
+
+        assert results == [True, True, True, False]
+        throttle = FakeClockThrottle()
+        throttle.allow_request(_request(), None)
+        assert 0 < throttle.wait() <= 60
+
+    def test_previous_window_decays(self, settings):
+        """Test the previous window's count is weighted by overlap."""
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            "DEFAULT_THROTTLE_RATES": {"anon": "4/minute"},
+        }
+        FakeClockThrottle.now = 600.0
+        for _ in range(4):
+            assert FakeClockThrottle().allow_request(_request(), None)
+
+        # 15s into the next window: 4 * 0.75 + 1 = 4 -> allowed, then 5 -> refused
+        FakeClockThrottle.now = 675.0
+        assert FakeClockThrottle().allow_request(_request(), None)
+        assert not FakeClockThrottle().allow_request(_request(), None)
+
+        # 45s in: 4 * 0.25 + 2 = 3 -> allowed again (the refusal did not count)
+        FakeClockThrottle.now = 705.0
+        assert FakeClockThrottle().allow_request(_request(), None)
+
+    def test_refused_requests_are_not_counted(self, settings):
+        """Test retrying while throttled does not extend the lockout."""
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            "DEFAULT_THROTTLE_RATES": {"anon": "2/minute"},
+        }
+        FakeClockThrottle.now = 600.0
+        for _ in range(2):
+            assert FakeClockThrottle().allow_request(_request(), None)
+        for _ in range(10):
+            assert not FakeClockThrottle().allow_request(_request(), None)
+
+        # 30s into the next window: 2 * 0.5 + 1 = 2 -> allowed
+        FakeClockThrottle.now = 690.0
+        assert FakeClockThrottle().allow_request(_request(), None)
+
+    def test_endpoint_rate_uses_own_counters(self, settings):
+        """Test '<scope>.<url name>' rates override and isolate an endpoint."""
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            "DEFAULT_THROTTLE_RATES": {
+                "anon": "1/minute",
+                "anon.health-check": "5/minute",
+            },
+        }
+        FakeClockThrottle.now = 600.0
+
+        assert FakeClockThrottle().allow_request(_request(), None)
+        assert not FakeClockThrottle().allow_request(_request(), None)
+        health = [
+            FakeClockThrottle().allow_request(_request("/api/health/"), None)
+            for _ in range(5)
+        ]
+        assert all(health)